@@ -0,0 +1,75 @@
+"""
+Benchmark sampled approximate metrics against the exact applicants scan.
+
+Fills a scratch schema with a synthetic ``applicants`` table, then times
+:func:`query_data.query_metrics` on the raw rows against
+:func:`query_data.approximate_metrics` at several sample sizes, and
+reports how many exact values fall inside the estimated intervals.
+
+Usage (from module_4/, with the PG* variables from src/.env set)::
+
+    python benchmarks/bench_approximate.py --rows 10000000 --samples 0.1 1 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import load_data as ld                          # noqa: E402
+import query_data as qd                         # noqa: E402
+from psycopg import connect                     # noqa: E402
+from bench_get_results import FILL_SQL          # noqa: E402
+
+SCHEMA = "bench_approximate"
+
+
+def timed(fn, repeat):
+    """
+    Return the last result of ``repeat`` calls of ``fn()`` and their median wall time.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--samples", type=float, nargs="+", default=[0.1, 1, 5])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.execute(f"SET search_path TO {SCHEMA}")
+        conn.execute(ld.CREATE_TABLE_SQL)
+        conn.execute(FILL_SQL, (args.rows,))
+        conn.execute("ANALYZE applicants")
+        conn.commit()
+
+    qd.DSN = f"{ld.DSN} options='-c search_path={SCHEMA}'"
+    exact, exact_time = timed(lambda: qd.query_metrics(source="applicants"), args.repeat)
+    print(f"{args.rows:,} rows; exact scan median {exact_time * 1000:9.1f} ms")
+
+    for pct in args.samples:
+        approx, approx_time = timed(lambda: qd.approximate_metrics(sample_pct=pct, seed=1), args.repeat)
+        covered = sum(1 for name, (low, high) in approx["intervals"].items()
+                      if low is not None and exact[name] is not None and low <= exact[name] <= high)
+        print(f"  {pct:>5}% sample median {approx_time * 1000:9.1f} ms  "
+              f"({exact_time / approx_time:5.1f}x faster), "
+              f"{covered}/{len(approx['intervals'])} exact values inside their interval")
+
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
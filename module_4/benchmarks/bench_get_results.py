@@ -0,0 +1,130 @@
+"""
+Benchmark the single-scan get_results against the original 11-query version.
+
+Fills a scratch schema with a large synthetic ``applicants`` table
+(generated server-side with ``generate_series``), then times
+:func:`query_data.compute_results` against the eleven separate queries the
+dashboard used to run, checking that both give the same answers.
+
+Usage (from module_4/, with the PG* variables from src/.env set)::
+
+    python benchmarks/bench_get_results.py --rows 2000000 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import load_data as ld                          # noqa: E402
+import query_data as qd                         # noqa: E402
+from psycopg import connect                     # noqa: E402
+
+SCHEMA = "bench_get_results"
+
+FILL_SQL = """
+INSERT INTO applicants (p_id, program, comments, date_added, url, status, term,
+                        us_or_international, gpa, gre_q, gre_v, gre_aw, degree,
+                        llm_generated_program, llm_generated_university)
+SELECT i,
+       'Computer Science, University ' || (i %% 200),
+       'synthetic row ' || i,
+       DATE '2019-01-01' + (i %% 2400),
+       'https://www.thegradcafe.com/result/' || i,
+       (ARRAY['Accepted', 'Rejected', 'Wait listed', 'Interview'])[1 + i %% 4],
+       (ARRAY['Fall 2024', 'Fall 2025', 'Spring 2025', 'Fall 2026'])[1 + i %% 4],
+       (ARRAY['International', 'American', 'Other'])[1 + i %% 3],
+       CASE WHEN i %% 5 = 0 THEN NULL ELSE 2.5 + (i %% 15) / 10.0 END,
+       150 + i %% 20, 145 + i %% 25, 3 + (i %% 6) / 2.0,
+       (ARRAY['Masters', 'PhD', 'MFA'])[1 + i %% 3],
+       (ARRAY['Computer Science', 'Physics', 'History'])[1 + i %% 3],
+       (ARRAY['Johns Hopkins University', 'Georgetown University', 'Stanford University'])[1 + i %% 3]
+              || CASE WHEN i %% 7 = 0 THEN '' ELSE ' ' || (i %% 300) END
+FROM generate_series(1, %s) AS i;
+"""
+
+# The dashboard queries as they were before the single-scan rewrite
+LEGACY_QUERIES = [
+    ("SELECT COUNT(*) AS total FROM applicants;", ()),
+    ("SELECT COUNT(*) AS n FROM applicants WHERE term ILIKE %s;", ("%Fall 2025%",)),
+    ("SELECT ROUND(100.0 * COUNT(*) FILTER (WHERE us_or_international ILIKE %s) "
+     "/ NULLIF(COUNT(*), 0), 2) AS pct_international FROM applicants;", ("%internat%",)),
+    ("SELECT ROUND(AVG(gpa)::numeric, 3), ROUND(AVG(gre_q)::numeric, 3), "
+     "ROUND(AVG(gre_v)::numeric, 3), ROUND(AVG(gre_aw)::numeric, 3) FROM applicants;", ()),
+    ("SELECT ROUND(AVG(gpa)::numeric, 3) FROM applicants WHERE term ILIKE %s "
+     "AND us_or_international ILIKE %s;", ("%Fall 2025%", "%American%")),
+    ("SELECT ROUND(100.0 * AVG(CASE WHEN status ILIKE %s THEN 1 ELSE 0 END), 2) "
+     "FROM applicants WHERE term ILIKE %s;", ("%accept%", "%Fall 2025%")),
+    ("SELECT ROUND(AVG(gpa)::numeric, 3) FROM applicants WHERE term ILIKE %s AND status ILIKE %s;",
+     ("%Fall 2025%", "%accept%")),
+    ("SELECT COUNT(*) FROM applicants WHERE llm_generated_university ILIKE %s "
+     "AND llm_generated_program ILIKE %s AND degree ILIKE %s;",
+     ("%johns hopkins%", "%computer science%", "%master%")),
+    ("SELECT COUNT(*) FROM applicants WHERE term ILIKE %s AND status ILIKE %s "
+     "AND llm_generated_university ILIKE %s AND llm_generated_program ILIKE %s AND degree ILIKE %s;",
+     ("%2025%", "%accept%", "%georgetown%", "%computer science%", "%phd%")),
+    ("SELECT degree, COUNT(*) AS n FROM applicants GROUP BY degree ORDER BY n DESC;", ()),
+    ("SELECT llm_generated_university, COUNT(*) AS n FROM applicants "
+     "WHERE llm_generated_university IS NOT NULL GROUP BY llm_generated_university "
+     "ORDER BY n DESC LIMIT 10;", ()),
+]
+
+
+def legacy(conn):
+    """
+    Run the eleven original dashboard queries on ``conn``.
+    """
+    out = []
+    with conn.cursor() as cur:
+        for sql, params in LEGACY_QUERIES:
+            cur.execute(sql, params)
+            out.append(cur.fetchall())
+    return out
+
+
+def timed(fn, conn, repeat):
+    """
+    Return the wall times of ``repeat`` calls of ``fn(conn)``.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(conn)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.execute(f"SET search_path TO {SCHEMA}")
+        conn.execute(ld.CREATE_TABLE_SQL)
+        conn.execute(FILL_SQL, (args.rows,))
+        conn.execute("ANALYZE applicants")
+        conn.commit()
+
+        new = qd.compute_results(conn)
+        old = legacy(conn)
+        assert new["total"] == old[0][0][0] and new["fall_2025"] == old[1][0][0]
+        assert new["jhu_masters_cs"] == old[7][0][0]
+
+        print(f"{args.rows:,} rows, {args.repeat} runs each")
+        for label, fn in (("11 queries", legacy), ("single scan", qd.compute_results)):
+            times = timed(fn, conn, args.repeat)
+            print(f"  {label:<12} median {statistics.median(times) * 1000:9.1f} ms  "
+                  f"best {min(times) * 1000:9.1f} ms")
+
+        conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark the load_data insert backends against a real PostgreSQL server.
+
+Generates synthetic applicant records, runs them through
+:func:`load_data.extract_data` and inserts them with every backend in
+:data:`load_data.INSERT_BACKENDS`. Each run goes into a fresh scratch
+schema, so the real ``applicants`` table is never touched.
+
+Usage (from module_4/, with the PG* variables from src/.env set)::
+
+    python benchmarks/bench_load_backends.py --rows 50000 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import load_data as ld                          # noqa: E402
+from psycopg import connect                     # noqa: E402
+
+SCHEMA = "bench_load_backends"
+
+
+def synthetic_items(n):
+    """
+    Build ``n`` applicant records shaped like the LLM output.
+    """
+    statuses = ["Accepted", "Rejected", "Wait listed", "Interview"]
+    return [
+        {
+            "url": f"https://www.thegradcafe.com/result/{i}",
+            "program": "Computer Science",
+            "comments": f"synthetic row {i}",
+            "date_added": f"{1 + i % 12}/{1 + i % 28}/2025",
+            "status": statuses[i % len(statuses)],
+            "term": "Fall 2025",
+            "US/International": "International" if i % 3 else "American",
+            "gpa": f"{2.5 + (i % 15) / 10:.2f}",
+            "gre_q": str(150 + i % 20),
+            "gre_v": str(145 + i % 25),
+            "gre_aw": f"{3 + (i % 6) / 2:.1f}",
+            "Degree": "PhD" if i % 4 == 0 else "Masters",
+            "llm-generated-program": "Computer Science",
+            "llm-generated-university": f"University {i % 50}",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def run_once(backend, rows):
+    """
+    Insert ``rows`` with one backend into an empty scratch table and
+    return the elapsed wall time of the insert + commit.
+    """
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.execute(f"SET search_path TO {SCHEMA}")
+        conn.execute(ld.CREATE_TABLE_SQL)
+        conn.commit()
+
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            ld.INSERT_BACKENDS[backend](cur, rows)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+
+        conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = [ld.extract_data(item, i + 1) for i, item in enumerate(synthetic_items(args.rows))]
+    print(f"{args.rows} rows, {args.repeat} runs per backend, DSN host={os.getenv('PGHOST')}")
+
+    for backend in ld.INSERT_BACKENDS:
+        times = [run_once(backend, rows) for _ in range(args.repeat)]
+        best = min(times)
+        print(f"  {backend:<12} median {statistics.median(times):7.3f}s  best {best:7.3f}s  "
+              f"({args.rows / best:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
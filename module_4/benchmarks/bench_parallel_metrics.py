@@ -0,0 +1,67 @@
+"""
+Benchmark concurrent against sequential execution of the metric statements.
+
+Fills a scratch schema with a synthetic ``applicants`` table, then times
+:func:`query_data.query_metrics` on the raw rows with ``parallel=True``
+(scalar and grouped statements on two pooled connections at once) and
+``parallel=False`` (both on one connection), checking that both give the
+same answers. The parallel run should take about as long as the slower
+statement rather than their sum.
+
+Usage (from module_4/, with the PG* variables from src/.env set)::
+
+    python benchmarks/bench_parallel_metrics.py --rows 2000000 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import load_data as ld                          # noqa: E402
+import query_data as qd                         # noqa: E402
+from psycopg import connect                     # noqa: E402
+from bench_get_results import FILL_SQL          # noqa: E402
+
+SCHEMA = "bench_parallel_metrics"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.execute(f"SET search_path TO {SCHEMA}")
+        conn.execute(ld.CREATE_TABLE_SQL)
+        conn.execute(FILL_SQL, (args.rows,))
+        conn.execute("ANALYZE applicants")
+        conn.commit()
+
+    # Pooled connections must see the scratch schema too
+    qd.DSN = f"{ld.DSN} options='-c search_path={SCHEMA}'"
+    sequential = qd.query_metrics(source="applicants", parallel=False)
+    assert qd.query_metrics(source="applicants", parallel=True) == sequential
+
+    print(f"{args.rows:,} rows, {args.repeat} runs each")
+    for label, parallel in (("sequential", False), ("parallel", True)):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            qd.query_metrics(source="applicants", parallel=parallel)
+            times.append(time.perf_counter() - start)
+        print(f"  {label:<12} median {statistics.median(times) * 1000:9.1f} ms  "
+              f"best {min(times) * 1000:9.1f} ms")
+
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
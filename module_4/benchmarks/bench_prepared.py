@@ -0,0 +1,151 @@
+"""
+Benchmark psycopg's automatic preparation of the hot statements against
+never preparing them.
+
+Fills a scratch schema with a synthetic ``applicants`` table, then runs
+each hot statement under sustained load, with several threads each on
+its own connection. Every call is sent as a plain ``cur.execute(sql,
+params)``, which psycopg prepares on the connection after
+``prepare_threshold`` runs, and once with ``prepare=False``, parsed and
+planned again each time. The statements are the scraper's duplicate
+check and the dashboard metrics. The planning time PostgreSQL reports in
+``EXPLAIN (ANALYZE, SUMMARY)`` is printed for both forms as well.
+
+Usage (from module_4/, with the PG* variables from src/.env set)::
+
+    python benchmarks/bench_prepared.py --rows 1000000 --threads 8 --calls 2000
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import load_data as ld                          # noqa: E402
+import query_data as qd                         # noqa: E402
+from psycopg import ClientCursor, connect       # noqa: E402
+from bench_get_results import FILL_SQL          # noqa: E402
+
+SCHEMA = "bench_prepared"
+DSN = f"{ld.DSN} options='-c search_path={SCHEMA}'"
+
+
+def url_params(rows):
+    """
+    A random result URL, present in the table about half the time.
+    """
+    return (f"https://www.thegradcafe.com/result/{random.randint(1, rows * 2)}",)
+
+
+# Statement name -> (SQL text, parameter factory, calls per thread relative to --calls)
+HOT = {
+    "url_exists": (qd.URL_EXISTS_SQL, url_params, 1),
+    "dashboard_metrics": (qd.SCALAR_METRICS_SQL, lambda rows: qd.DASHBOARD_PARAMS, 0.01),
+}
+
+
+def worker(name, prepared, calls, rows):
+    """
+    Run ``calls`` calls of statement ``name`` on a fresh connection; return their wall times.
+
+    ``prepared`` runs them as the application does (psycopg's default
+    preparation), otherwise with ``prepare=False``.
+    """
+    sql, params, _ = HOT[name]
+    times = []
+    with connect(DSN) as conn, conn.cursor() as cur:
+        for _ in range(calls):
+            start = time.perf_counter()
+            if prepared:
+                cur.execute(sql, params(rows))
+            else:
+                cur.execute(sql, params(rows), prepare=False)
+            cur.fetchall()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def positional(sql, params):
+    """
+    Values of ``params`` in the order psycopg numbers the placeholders of ``sql``.
+    """
+    if not isinstance(params, dict):
+        return list(params)
+    return [params[key] for key in dict.fromkeys(re.findall(r"%\((\w+)\)s", sql))]
+
+
+def planning_ms(name, prepared, rows, samples=20):
+    """
+    Median planning time PostgreSQL reports for statement ``name``.
+
+    The prepared form is explained as an ``EXECUTE`` of the statement psycopg
+    prepared on the connection, with the values inlined client-side.
+    """
+    sql, params, _ = HOT[name]
+    out = []
+    with connect(DSN) as conn, conn.cursor() as cur, ClientCursor(conn) as explain:
+        if prepared:
+            cur.execute(sql, params(rows), prepare=True)      # Makes sure it is prepared here
+            cur.fetchall()
+            cur.execute("SELECT name FROM pg_prepared_statements WHERE NOT from_sql;")
+            (server_name,), = cur.fetchall()
+        for _ in range(samples):
+            if prepared:
+                values = positional(sql, params(rows))
+                placeholders = ", ".join(["%s"] * len(values))
+                explain.execute(f"EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) EXECUTE {server_name}({placeholders})",
+                                values)
+            else:
+                explain.execute("EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) " + sql.rstrip(";"), params(rows))
+            out.append(explain.fetchone()[0][0]["Planning Time"])
+    return statistics.median(out)
+
+
+def report(label, times):
+    """
+    Print the median, p95 and total of ``times``.
+    """
+    ms = sorted(t * 1000 for t in times)
+    print(f"    {label:<9} calls {len(ms):>7,}  median {statistics.median(ms):8.3f} ms  "
+          f"p95 {ms[int(len(ms) * 0.95) - 1]:8.3f} ms  total {sum(ms) / 1000:7.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=2000, help="duplicate checks per thread")
+    args = parser.parse_args()
+
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.execute(f"SET search_path TO {SCHEMA}")
+        conn.execute(ld.CREATE_TABLE_SQL)
+        conn.execute(FILL_SQL, (args.rows,))
+        conn.execute("CREATE INDEX ON applicants (url)")
+        conn.execute("ANALYZE applicants")
+        conn.commit()
+
+    print(f"{args.rows:,} rows, {args.threads} threads")
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        for name, (_, _, share) in HOT.items():
+            calls = max(1, int(args.calls * share))
+            print(f"  {name}  (planning: never {planning_ms(name, False, args.rows):.3f} ms, "
+                  f"prepared {planning_ms(name, True, args.rows):.3f} ms)")
+            for label, prepared in (("never", False), ("auto", True)):
+                runs = pool.map(lambda _: worker(name, prepared, calls, args.rows), range(args.threads))
+                report(label, [t for run in runs for t in run])
+
+    with connect(ld.DSN) as conn:
+        conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
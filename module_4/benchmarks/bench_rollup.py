@@ -0,0 +1,67 @@
+"""
+Benchmark incremental rollup maintenance against table size.
+
+Builds ``applicants`` (with the rollup trigger from
+:data:`load_data.CREATE_ROLLUP_SQL`) at several sizes in a scratch
+schema, then times loading the same 1000 new rows into each. The cost
+of a load should stay flat as the table grows. After each load the
+rollup-derived metrics are checked against the live
+:func:`query_data.compute_results`.
+
+Usage (from module_4/, with the PG* variables from src/.env set)::
+
+    python benchmarks/bench_rollup.py --sizes 100000 1000000 --batch 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import load_data as ld                          # noqa: E402
+import query_data as qd                         # noqa: E402
+from psycopg import connect                     # noqa: E402
+from bench_get_results import FILL_SQL          # noqa: E402
+
+SCHEMA = "bench_rollup"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    new_rows = [ld.extract_data({"url": f"https://example.invalid/{i}", "term": "Fall 2025",
+                                 "status": "Accepted", "gpa": "3.5", "Degree": "PhD"}, 10**9 + i)
+                for i in range(args.batch)]
+
+    with connect(ld.DSN) as conn:
+        for size in args.sizes:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            conn.execute(f"CREATE SCHEMA {SCHEMA}")
+            conn.execute(f"SET search_path TO {SCHEMA}")
+            conn.execute(ld.CREATE_TABLE_SQL)
+            conn.execute(FILL_SQL, (size,))
+            with conn.cursor() as cur:
+                ld.ensure_table(cur)                    # Backfills the rollup, attaches the trigger
+            conn.commit()
+
+            start = time.perf_counter()
+            with conn.cursor() as cur:
+                ld.insert_executemany(cur, new_rows)
+            conn.commit()
+            elapsed = time.perf_counter() - start
+
+            live, rolled = qd.compute_results(conn), qd.query_metrics(conn=conn, source="rollup")
+            mismatched = [k for k in live if live[k] != rolled[k]]
+            print(f"  {size:>12,} rows: +{args.batch} rows in {elapsed * 1000:8.1f} ms  "
+                  f"{'exact' if not mismatched else 'MISMATCH ' + ', '.join(mismatched)}")
+
+        conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
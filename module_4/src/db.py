@@ -1,6 +1,21 @@
+import os
+import atexit
+import threading
 import psycopg
+from psycopg.conninfo import conninfo_to_dict
+from psycopg_pool import ConnectionPool
 from contextlib import contextmanager
 
+# Pool sizing, configurable through the environment
+POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "30"))
+
+# One pool per (process, DSN). Keying on the pid keeps forked loader workers
+# from reusing a parent's pool, whose background threads do not survive the fork.
+_pools = {}
+_pools_lock = threading.Lock()
+
 @contextmanager
 def get_conn(dsn):
     """
@@ -18,6 +33,94 @@ def get_conn(dsn):
     with psycopg.connect(dsn) as conn:
         yield conn
 
+def _pool_name(dsn):
+    """
+    Readable pool name (``host:port/dbname``) that leaves out the password.
+
+    :param dsn: Database connection string.
+    :type dsn: str
+    :return: Pool name.
+    :rtype: str
+    """
+    info = conninfo_to_dict(dsn)
+    return f"{info.get('host')}:{info.get('port')}/{info.get('dbname')}"
+
+def get_pool(dsn):
+    """
+    Return the process-wide connection pool for ``dsn``, creating it on first use.
+
+    The pool holds between ``PG_POOL_MIN_SIZE`` and ``PG_POOL_MAX_SIZE``
+    connections and health-checks each connection when it is checked
+    out, replacing connections that were dropped by the server.
+
+    :param dsn: Database connection string.
+    :type dsn: str
+    :return: Open connection pool.
+    :rtype: psycopg_pool.ConnectionPool
+    """
+    key = (os.getpid(), dsn)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                dsn,
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                timeout=POOL_TIMEOUT,
+                check=ConnectionPool.check_connection,
+                name=_pool_name(dsn),
+                open=True,
+            )
+            _pools[key] = pool
+    return pool
+
+@contextmanager
+def pooled_connection(dsn, timeout=None):
+    """
+    Check a connection out of the shared pool for ``dsn``.
+
+    Behaves like ``with psycopg.connect(dsn) as conn``: the transaction
+    is committed when the block exits normally and rolled back on error,
+    but the connection goes back to the pool instead of being closed.
+
+    :param dsn: Database connection string.
+    :type dsn: str
+    :param timeout: Seconds to wait for a connection; ``None`` uses ``PG_POOL_TIMEOUT``.
+    :type timeout: float | None
+    :yield: A live PostgreSQL connection borrowed from the pool.
+    :rtype: psycopg.Connection
+    :raises psycopg_pool.PoolTimeout: If no connection is available in time
+        (an :class:`psycopg.OperationalError`).
+    """
+    with get_pool(dsn).connection(timeout=timeout) as conn:
+        yield conn
+
+def pool_stats():
+    """
+    Return usage statistics for every pool opened by this process.
+
+    :return: Mapping of pool name to the counters from
+        :meth:`psycopg_pool.ConnectionPool.get_stats`.
+    :rtype: dict[str, dict[str, int]]
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [p for (owner, _), p in _pools.items() if owner == pid]
+    return {p.name: p.get_stats() for p in pools}
+
+@atexit.register
+def close_pools():
+    """
+    Close every pool opened by this process (also run at interpreter exit).
+
+    :return: None
+    :rtype: NoneType
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        for key in [k for k in _pools if k[0] == pid]:
+            _pools.pop(key).close()
+
 def ensure_schema(dsn):
     """
     Ensure that the ``applicants`` table exists in the database.
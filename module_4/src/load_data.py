@@ -1,10 +1,17 @@
 import os
 import io
 import json
+import time
+import hashlib
+import argparse
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Any, List, Dict, Tuple
-from psycopg import connect
 from psycopg.rows import dict_row
+from db import pooled_connection as connect     # Connections come from the shared pool in db.py
+import query_data                               # Summary view refreshed after each load
 from dotenv import load_dotenv
 from datetime import datetime, date
 import re
@@ -22,6 +29,9 @@ DSN = (
 BASE_DIR = os.path.dirname(__file__)                                # Path to the current working directory of this script
 LLM_JSON = os.path.join(BASE_DIR, "LLM_app_data_GRE_GPA.jsonl")     # Json of the new data set after being processed by the LLM (new data to be able to get GPA/GRE data)
 
+# Rows sent per executemany() call by the batched loaders
+BATCH_SIZE = 5000
+
 # Set up the columns based on assignment description
 COLUMNS: List[str] = [
     "p_id",
@@ -66,14 +76,436 @@ CREATE TABLE IF NOT EXISTS applicants (
 );
 """
 
-# Insert sql data based on data outlined above
+# Opt-in layout: applicants range-partitioned by date_added, one partition per year
+PARTITIONED = os.getenv("APPLICANTS_PARTITIONED", "").lower() in ("1", "true", "yes")
+
+# A partitioned table cannot have a primary key on p_id alone (the partition key must be part
+# of every unique constraint). p_id uniqueness across partitions is enforced by the
+# applicant_ids lookup table instead: a BEFORE INSERT row trigger claims each p_id there and
+# drops the row if it is already taken, and an AFTER DELETE trigger releases it again. When
+# the trigger is first attached the lookup table is filled from the rows already present.
+CREATE_PARTITIONED_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS applicants (
+  p_id INTEGER NOT NULL,
+  program TEXT,
+  comments TEXT,
+  date_added DATE,
+  url TEXT,
+  status TEXT,
+  term TEXT,
+  us_or_international TEXT,
+  gpa DOUBLE PRECISION,
+  gre_q DOUBLE PRECISION,
+  gre_v DOUBLE PRECISION,
+  gre_aw DOUBLE PRECISION,
+  degree TEXT,
+  llm_generated_program TEXT,
+  llm_generated_university TEXT,
+  UNIQUE (p_id, date_added)
+) PARTITION BY RANGE (date_added);
+CREATE TABLE IF NOT EXISTS applicants_undated PARTITION OF applicants DEFAULT;
+SELECT pg_advisory_xact_lock(hashtext('applicant_ids'));
+CREATE TABLE IF NOT EXISTS applicant_ids (p_id INTEGER PRIMARY KEY);
+CREATE OR REPLACE FUNCTION applicant_ids_claim() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO applicant_ids (p_id) VALUES (NEW.p_id) ON CONFLICT DO NOTHING;
+  IF FOUND THEN
+    RETURN NEW;
+  END IF;
+  RETURN NULL;
+END
+$$;
+CREATE OR REPLACE FUNCTION applicant_ids_release() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  DELETE FROM applicant_ids WHERE p_id = OLD.p_id;
+  RETURN NULL;
+END
+$$;
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                 WHERE tgname = 'applicant_ids_claim' AND tgrelid = 'applicants'::regclass) THEN
+    TRUNCATE applicant_ids;
+    INSERT INTO applicant_ids (p_id) SELECT p_id FROM applicants ON CONFLICT DO NOTHING;
+    CREATE TRIGGER applicant_ids_claim BEFORE INSERT ON applicants
+      FOR EACH ROW EXECUTE FUNCTION applicant_ids_claim();
+    CREATE TRIGGER applicant_ids_release AFTER DELETE ON applicants
+      FOR EACH ROW EXECUTE FUNCTION applicant_ids_release();
+  END IF;
+END
+$$;
+"""
+
+# One partition per calendar year of date_added
+CREATE_YEAR_PARTITION_SQL = """
+CREATE TABLE IF NOT EXISTS applicants_y{year} PARTITION OF applicants
+FOR VALUES FROM ('{year}-01-01') TO ('{next_year}-01-01');
+"""
+
+# Insert sql data based on data outlined above, skipping p_ids that are already loaded
 INSERT_SQL = f"""
 INSERT INTO applicants ({insert_cols})
 VALUES ({placeholders})
 ON CONFLICT (p_id) DO NOTHING;
 """
 
-def read_items(path):
+# The partitioned layout has no p_id primary key to name as a conflict target; its
+# applicant_ids trigger drops duplicate p_ids before they reach a partition
+PARTITIONED_INSERT_SQL = f"""
+INSERT INTO applicants ({insert_cols})
+VALUES ({placeholders});
+"""
+
+# Parallel loads defer the trigger-fed rollups below. Every worker holds one long
+# transaction whose many INSERT statements each fire the triggers, so workers would lock
+# the same rollup rows in different orders and deadlock. Instead, each worker sets this
+# transaction-local setting (DEFER_ROLLUPS_SQL), the trigger functions return early while
+# it is on, and load_parallel rebuilds the rollups once from applicants when the workers
+# are done (after_load(conn, rebuild_rollups=True)).
+DEFER_ROLLUPS_SETTING = "applicants.defer_rollups"
+DEFER_ROLLUPS_SQL = f"SELECT set_config('{DEFER_ROLLUPS_SETTING}', 'on', true);"
+SKIP_IF_DEFERRED = f"IF current_setting('{DEFER_ROLLUPS_SETTING}', true) = 'on' THEN RETURN NULL; END IF;"
+
+# Running aggregates per bucket of the columns the dashboard filters and groups on.
+# Every get_results metric can be derived exactly from these counts and sums; sums of
+# squares are kept as well so variances can be derived the same way.
+ROLLUP_TABLE = "applicant_rollups"
+ROLLUP_KEYS = ["term", "status", "us_or_international", "degree",
+               "llm_generated_program", "llm_generated_university"]
+ROLLUP_MEASURES = ["gpa", "gre_q", "gre_v", "gre_aw"]
+
+rollup_keys = ", ".join(ROLLUP_KEYS)
+rollup_measure_cols = [f"{m}_{agg}" for m in ROLLUP_MEASURES for agg in ("n", "sum", "sumsq")]
+
+def _rollup_upsert_sql(source):
+    """
+    Build the statement that folds the rows of ``source`` into the rollup table.
+
+    Bucket keys are stored with ``NULL`` as ``''`` so they can form the
+    primary key. Buckets are upserted in key order, so concurrent loaders
+    lock them in the same order.
+
+    :param source: Table (or transition table) to aggregate.
+    :type source: str
+    :return: ``INSERT ... ON CONFLICT DO UPDATE`` statement.
+    :rtype: str
+    """
+    positions = ", ".join(str(i + 1) for i in range(len(ROLLUP_KEYS)))
+    measures = ", ".join(
+        f"COUNT({m}), COALESCE(SUM({m}::numeric), 0), COALESCE(SUM(({m} * {m})::numeric), 0)"
+        for m in ROLLUP_MEASURES
+    )
+    updates = ", ".join(f"{c} = {ROLLUP_TABLE}.{c} + EXCLUDED.{c}" for c in ["n"] + rollup_measure_cols)
+    return f"""
+    INSERT INTO {ROLLUP_TABLE} ({rollup_keys}, n, {", ".join(rollup_measure_cols)})
+    SELECT {", ".join(f"COALESCE({k}, '')" for k in ROLLUP_KEYS)}, COUNT(*), {measures}
+    FROM {source}
+    GROUP BY {positions}
+    ORDER BY {positions}
+    ON CONFLICT ({rollup_keys}) DO UPDATE SET {updates};
+    """
+
+# Rollup table plus a statement-level trigger that feeds it only the newly inserted rows
+# (the NEW TABLE transition table), so a load costs work proportional to its own size.
+# Rows skipped as duplicates never reach the transition table. When the trigger is first
+# attached (new install, or a freshly migrated table) the rollup is rebuilt from the rows
+# already present; the summary view reads the rollup, so it is simply refreshed after the
+# next load.
+CREATE_ROLLUP_SQL = f"""
+SELECT pg_advisory_xact_lock(hashtext('{ROLLUP_TABLE}'));
+CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+  {", ".join(f"{k} TEXT NOT NULL" for k in ROLLUP_KEYS)},
+  n BIGINT NOT NULL DEFAULT 0,
+  {", ".join(f"{c} {'BIGINT' if c.endswith('_n') else 'NUMERIC'} NOT NULL DEFAULT 0" for c in rollup_measure_cols)},
+  PRIMARY KEY ({rollup_keys})
+);
+CREATE OR REPLACE FUNCTION {ROLLUP_TABLE}_add() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  {SKIP_IF_DEFERRED}
+  {_rollup_upsert_sql("new_rows")}
+  RETURN NULL;
+END
+$$;
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                 WHERE tgname = '{ROLLUP_TABLE}_add' AND tgrelid = 'applicants'::regclass) THEN
+    TRUNCATE {ROLLUP_TABLE};
+    {_rollup_upsert_sql("applicants")}
+    CREATE TRIGGER {ROLLUP_TABLE}_add AFTER INSERT ON applicants
+      REFERENCING NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION {ROLLUP_TABLE}_add();
+  END IF;
+END
+$$;
+"""
+
+# Weekly time-series rollup behind query_data.trends: applications and decisions per
+# (week, degree, university), fed by its own statement-level trigger in the same way as
+# the rollup above. Undated rows have no week and are left out.
+WEEKLY_TABLE = query_data.TREND_TABLE
+WEEKLY_KEYS = ["week", "degree", "llm_generated_university"]
+
+def _weekly_upsert_sql(source):
+    """
+    Build the statement that folds the dated rows of ``source`` into the weekly rollup.
+
+    :param source: Table (or transition table) to aggregate.
+    :type source: str
+    :return: ``INSERT ... ON CONFLICT DO UPDATE`` statement.
+    :rtype: str
+    """
+    decisions = ", ".join(f"COUNT(*) FILTER (WHERE status ILIKE '%{word}%')"
+                          for word in query_data.TREND_STATUSES.values())
+    updates = ", ".join(f"{c} = {WEEKLY_TABLE}.{c} + EXCLUDED.{c}" for c in ["n", *query_data.TREND_STATUSES])
+    return f"""
+    INSERT INTO {WEEKLY_TABLE} ({", ".join(WEEKLY_KEYS)}, n, {", ".join(query_data.TREND_STATUSES)})
+    SELECT date_trunc('week', date_added)::date, COALESCE(degree, ''), COALESCE(llm_generated_university, ''),
+           COUNT(*), {decisions}
+    FROM {source}
+    WHERE date_added IS NOT NULL
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT ({", ".join(WEEKLY_KEYS)}) DO UPDATE SET {updates};
+    """
+
+CREATE_WEEKLY_ROLLUP_SQL = f"""
+SELECT pg_advisory_xact_lock(hashtext('{WEEKLY_TABLE}'));
+CREATE TABLE IF NOT EXISTS {WEEKLY_TABLE} (
+  week DATE NOT NULL,
+  degree TEXT NOT NULL,
+  llm_generated_university TEXT NOT NULL,
+  n BIGINT NOT NULL DEFAULT 0,
+  {", ".join(f"{c} BIGINT NOT NULL DEFAULT 0" for c in query_data.TREND_STATUSES)},
+  PRIMARY KEY ({", ".join(WEEKLY_KEYS)})
+);
+CREATE OR REPLACE FUNCTION {WEEKLY_TABLE}_add() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  {SKIP_IF_DEFERRED}
+  {_weekly_upsert_sql("new_rows")}
+  RETURN NULL;
+END
+$$;
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                 WHERE tgname = '{WEEKLY_TABLE}_add' AND tgrelid = 'applicants'::regclass) THEN
+    TRUNCATE {WEEKLY_TABLE};
+    {_weekly_upsert_sql("applicants")}
+    CREATE TRIGGER {WEEKLY_TABLE}_add AFTER INSERT ON applicants
+      REFERENCING NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION {WEEKLY_TABLE}_add();
+  END IF;
+END
+$$;
+"""
+
+# Rollup table -> statement that refills it from applicants, run by after_load after a
+# load that deferred the triggers
+DEFERRED_ROLLUPS = {
+    ROLLUP_TABLE: _rollup_upsert_sql("applicants"),
+    WEEKLY_TABLE: _weekly_upsert_sql("applicants"),
+}
+
+# Cross-tab cube behind query_data.cube: applications and decisions for every combination of
+# university, program and degree (GROUP BY CUBE). Every inserted row would touch eight cells,
+# the grand total among them, so unlike the rollups above the cube is not fed per insert
+# (concurrent loaders would contend and deadlock on those cells); it is a materialized view
+# over the trigger-fed rollup table, whose buckets already hold the per-load increments, so
+# after_load's refresh re-aggregates the rollup buckets rather than every applicant. The
+# rollup keys store missing values as '', and grouping_id tells a summed-over dimension
+# ('') from a missing value.
+CUBE_TABLE = query_data.CUBE_TABLE
+CUBE_KEYS = ["grouping_id", *query_data.CUBE_DIMENSIONS.values()]
+cube_dims = ", ".join(query_data.CUBE_DIMENSIONS.values())
+
+CREATE_CUBE_SQL = f"""
+SELECT pg_advisory_xact_lock(hashtext('{CUBE_TABLE}'));
+CREATE MATERIALIZED VIEW IF NOT EXISTS {CUBE_TABLE} AS
+SELECT GROUPING({cube_dims}) AS grouping_id,
+       {", ".join(f"COALESCE({d}, '') AS {d}" for d in query_data.CUBE_DIMENSIONS.values())},
+       COALESCE(SUM(n), 0)::bigint AS n,
+       {", ".join(f"COALESCE(SUM(n) FILTER (WHERE status ILIKE '%{word}%'), 0)::bigint AS {c}"
+                  for c, word in query_data.TREND_STATUSES.items())}
+FROM {ROLLUP_TABLE}
+GROUP BY CUBE ({cube_dims});
+CREATE UNIQUE INDEX IF NOT EXISTS {CUBE_TABLE}_key ON {CUBE_TABLE} ({", ".join(CUBE_KEYS)});
+"""
+
+# Full-text search column: a stored generated tsvector over program (weight A) and comments
+# (weight B), which PostgreSQL fills in on every insert, plus a GIN index on it. Both are
+# added to an existing table on the first load after upgrading; the checks keep later
+# loads from taking the ALTER TABLE lock.
+CREATE_SEARCH_SQL = f"""
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_attribute
+                 WHERE attrelid = 'applicants'::regclass AND attname = 'search_tsv' AND NOT attisdropped) THEN
+    ALTER TABLE applicants ADD COLUMN search_tsv tsvector GENERATED ALWAYS AS (
+      setweight(to_tsvector('{query_data.SEARCH_CONFIG}', COALESCE(program, '')), 'A') ||
+      setweight(to_tsvector('{query_data.SEARCH_CONFIG}', COALESCE(comments, '')), 'B')
+    ) STORED;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_index i
+                 JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY (i.indkey)
+                 WHERE i.indrelid = 'applicants'::regclass AND a.attname = 'search_tsv') THEN
+    CREATE INDEX ON applicants USING gin (search_tsv);
+  END IF;
+END
+$$;
+"""
+
+# Index matching the keyset order of query_data.browse_applicants
+CREATE_BROWSE_INDEX_SQL = f"""
+CREATE INDEX IF NOT EXISTS applicants_browse ON applicants (({query_data.BROWSE_SORT_KEY}), p_id);
+"""
+
+# Indexes behind the structured filters of query_data.query_metrics: trigram GIN indexes
+# serve the substring (ILIKE '%...%') filters, a btree serves the date_added range
+FILTER_INDEXES_SQL = "CREATE EXTENSION IF NOT EXISTS pg_trgm;\n" + "".join(
+    f"CREATE INDEX IF NOT EXISTS applicants_{column}_trgm ON applicants USING gin ({column} gin_trgm_ops);\n"
+    for column in query_data.FILTER_COLUMNS.values()
+) + "CREATE INDEX IF NOT EXISTS applicants_date_added ON applicants (date_added);\n"
+
+# Checkpoint table used by the resumable streaming loader (one row per source file).
+# The statements also run on the SQLite copy (see _checkpoint_sql), so they stick to SQL both accept.
+# prefix_hash is the SHA-256 of the file's first line_offset lines, so a checkpoint is only
+# reused while those lines are unchanged (the file was appended to, not rewritten).
+CHECKPOINT_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS load_checkpoints (
+  source TEXT PRIMARY KEY,
+  line_offset INTEGER NOT NULL,
+  prefix_hash TEXT NOT NULL,
+  rows_loaded BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+CHECKPOINT_SELECT_SQL = "SELECT line_offset, prefix_hash FROM load_checkpoints WHERE source = %s;"
+
+CHECKPOINT_DELETE_SQL = "DELETE FROM load_checkpoints WHERE source = %s;"
+
+CHECKPOINT_UPSERT_SQL = """
+INSERT INTO load_checkpoints (source, line_offset, prefix_hash, rows_loaded)
+VALUES (%s, %s, %s, %s)
+ON CONFLICT (source) DO UPDATE
+SET line_offset = EXCLUDED.line_offset,
+    prefix_hash = EXCLUDED.prefix_hash,
+    rows_loaded = load_checkpoints.rows_loaded + EXCLUDED.rows_loaded,
+    updated_at = CURRENT_TIMESTAMP;
+"""
+
+class PrefixHash:
+    """
+    Running SHA-256 of the first lines of a file.
+
+    The streaming loader stores the digest with each checkpoint and
+    compares it on resume, so a file regenerated under the same path is
+    loaded from line 1 while a file that was only appended to resumes.
+    Lines are hashed as raw bytes without their line terminator, so
+    appending to a file whose last line had no newline keeps the digest.
+
+    :param path: Path to the input file.
+    :type path: str
+    """
+    def __init__(self, path):
+        self._fh = open(path, "rb")
+        self._hash = hashlib.sha256()
+        self.lines = 0
+
+    def advance(self, line_no):
+        """
+        Hash up to and including line ``line_no`` and return the digest.
+
+        :param line_no: 1-based line number; lines past the end of the file are ignored.
+        :type line_no: int
+        :return: Hex digest of the lines read so far.
+        :rtype: str
+        """
+        while self.lines < line_no:
+            line = self._fh.readline()
+            if not line:
+                break
+            self._hash.update(line.rstrip(b"\r\n") + b"\n")
+            self.lines += 1
+        return self._hash.hexdigest()
+
+    def close(self):
+        """Close the underlying file."""
+        self._fh.close()
+
+class Quarantine:
+    """
+    Dead-letter sink for input records that cannot be loaded.
+
+    Each rejected record is appended to a JSON-lines file together with
+    its line number and the reason it was rejected, and counted per
+    reason. The file is only created once the first record is rejected.
+
+    :param path: Path of the dead-letter JSON-lines file.
+    :type path: str
+    """
+    def __init__(self, path):
+        self.path = path
+        self.counts = {"unparseable": 0, "extract_failed": 0}
+        self._fh = None
+
+    def add(self, line_no, kind, reason, record):
+        """
+        Record one rejected input record.
+
+        :param line_no: Line number (or item position) in the input file.
+        :type line_no: int
+        :param kind: ``"unparseable"`` or ``"extract_failed"``.
+        :type kind: str
+        :param reason: Human-readable error message.
+        :type reason: str
+        :param record: The raw line or parsed item that was rejected.
+        :type record: str | dict
+        :return: None
+        :rtype: NoneType
+        """
+        if self._fh is None:
+            self._fh = io.open(self.path, "a", encoding="utf-8")
+        self._fh.write(json.dumps({"line": line_no, "kind": kind, "reason": reason,
+                                   "record": record}, default=str) + "\n")
+        self.counts[kind] += 1
+
+    @property
+    def total(self):
+        """Total number of quarantined records."""
+        return sum(self.counts.values())
+
+    def close(self):
+        """Close the dead-letter file if it was opened."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def report(self):
+        """
+        Print the per-run quarantine counters (only when something was rejected).
+
+        :return: None
+        :rtype: NoneType
+        """
+        self.close()
+        if self.total:
+            print(f"Quarantined {self.total} records ({self.counts['unparseable']} unparseable, "
+                  f"{self.counts['extract_failed']} failed extract_data) -> {self.path}")
+
+def dead_letter_path(path):
+    """
+    Default dead-letter file for an input file: ``<path>.rejects.jsonl``.
+
+    :param path: Path to the input file.
+    :type path: str
+    :return: Path of the dead-letter file.
+    :rtype: str
+    """
+    return f"{path}.rejects.jsonl"
+
+def read_items(path, quarantine=None):
     """
     Read and parse items from a JSON or JSON-lines file.
 
@@ -86,13 +518,19 @@ def read_items(path):
     - If the file is JSON-lines formatted (one JSON object per line),
       returns a list of parsed objects.
 
+    In JSON-lines mode a malformed line raises, unless a
+    :class:`Quarantine` is given, in which case the line is sent there
+    and the remaining lines are still returned.
+
     :param path: Path to the input file.
     :type path: str
+    :param quarantine: Optional dead-letter sink for unparseable lines.
+    :type quarantine: Quarantine | None
     :return: Parsed list of items.
     :rtype: list[dict]
     """
-    raw = io.open(path, "r", encoding="utf-8-sig").read()   # Open and read the json file contents as a string; encoding = utf-8-sig avoids byte order marks
-    raw = raw.strip()                                       # Strip leading and ending whitespace
+    text = io.open(path, "r", encoding="utf-8-sig").read()  # Open and read the json file contents as a string; encoding = utf-8-sig avoids byte order marks
+    raw = text.strip()                                      # Strip leading and ending whitespace
 
     if not raw:                     # If raw data is empty, returns an empty list
         return []
@@ -101,12 +539,85 @@ def read_items(path):
         return obj["items"] if isinstance(obj, dict) and "items" in obj else obj
     except json.JSONDecodeError:    # If reading json file as an object fails, use this as a fail safe to read data line by line
         items = []
-        for line in raw.splitlines():
+        for line_no, line in enumerate(text.splitlines(), start=1):
             s = line.strip()        # Strip white space
             if s:                   # If the cleaned string is non-empty, append it to the list
-                items.append(json.loads(s))
+                item = _parse_line(s, line_no, quarantine)
+                if item is not None:
+                    items.append(item)
         return items
 
+def _parse_line(s, line_no, quarantine):
+    """
+    Parse one JSON line, routing failures to ``quarantine`` when given.
+
+    :param s: Stripped, non-empty line.
+    :type s: str
+    :param line_no: 1-based line number, used in the dead-letter record.
+    :type line_no: int
+    :param quarantine: Optional dead-letter sink.
+    :type quarantine: Quarantine | None
+    :return: Parsed object, or ``None`` if the line was quarantined.
+    :rtype: dict | None
+    """
+    try:
+        return json.loads(s)
+    except json.JSONDecodeError as e:
+        if quarantine is None:
+            raise
+        quarantine.add(line_no, "unparseable", str(e), s)
+        return None
+
+
+def iter_items(path, start_line=0, quarantine=None):
+    """
+    Lazily yield ``(line_no, item)`` pairs from a JSON-lines file.
+
+    Lines are read one at a time, so memory use does not grow with the
+    file size. Lines numbered ``start_line`` or lower (1-based) are
+    skipped without being parsed, which is how the streaming loader
+    resumes after a failure. Blank lines are ignored.
+
+    Files that are a single JSON document (a list, or an object with an
+    ``items`` key) cannot be streamed; they are read with
+    :func:`read_items` and each item's 1-based position is used as its
+    line number.
+
+    :param path: Path to the input file.
+    :type path: str
+    :param start_line: Last line already processed; ``0`` reads everything.
+    :type start_line: int
+    :param quarantine: Optional dead-letter sink for unparseable lines.
+    :type quarantine: Quarantine | None
+    :return: Generator of line numbers and parsed records.
+    :rtype: Iterator[tuple[int, dict]]
+    """
+    with io.open(path, "r", encoding="utf-8-sig") as f:
+        first = ""
+        for first in f:                 # Peek at the first non-blank line to detect the file layout
+            if first.strip():
+                break
+        try:
+            head = json.loads(first)
+            streamable = isinstance(head, dict) and "items" not in head
+        except json.JSONDecodeError:
+            streamable = False
+
+    if not streamable:                  # Whole-document JSON: fall back to reading it at once
+        for line_no, item in enumerate(read_items(path, quarantine), start=1):
+            if line_no > start_line:
+                yield line_no, item
+        return
+
+    with io.open(path, "r", encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no <= start_line:
+                continue
+            s = line.strip()
+            if s:
+                item = _parse_line(s, line_no, quarantine)
+                if item is not None:
+                    yield line_no, item
 
 def to_date(s: str | None) -> date | None:
     """
@@ -227,32 +738,46 @@ def clean_gre(val, kind):
         return s if 0.0 <= s <= 6.0 else None       # If the GRE analytical writing score is outside of the normal range, ignore
     return s if 130 <= s <= 170 else None           # If the GRE quantative/verbal score is outside of the normal range, ignore
 
-def extract_data(item, idx):
+def derive_p_id(item, idx):
     """
-    Extract and normalize applicant data from a raw JSON record.
+    Derive the primary key for a raw applicant record.
 
-    Attempts to build a structured tuple corresponding to database
-    fields, performing type cleaning for GPA, GRE, and dates.
+    The numeric suffix of the applicant URL is used when available,
+    otherwise the record's own ``p_id`` field, otherwise ``idx``.
 
     :param item: Applicant JSON record.
     :type item: dict
     :param idx: Fallback index used if a primary key cannot be derived.
     :type idx: int
-    :return: Extracted applicant data as a tuple aligned with table schema.
-    :rtype: tuple
+    :return: Primary key for the record.
+    :rtype: int
     """
     url = item.get("url") or item.get("applicant_URL")  # Obtain the current applicant url
 
     # Use the URL to create a unique "p_id" value
-    p_id = None
     if url:
         try:
-            p_id = int(url.rstrip("/").split("/")[-1])  # Remove irrelevant url pieces
+            return int(url.rstrip("/").split("/")[-1])  # Remove irrelevant url pieces
         except ValueError:
             pass
 
-    if p_id is None:
-        p_id = int(item.get("p_id", idx))               # If the previous code does not actually create a p_id, default to the loop index
+    return int(item.get("p_id", idx))                   # If the url does not give a p_id, default to the loop index
+
+def extract_data(item, idx):
+    """
+    Extract and normalize applicant data from a raw JSON record.
+
+    Attempts to build a structured tuple corresponding to database
+    fields, performing type cleaning for GPA, GRE, and dates.
+
+    :param item: Applicant JSON record.
+    :type item: dict
+    :param idx: Fallback index used if a primary key cannot be derived.
+    :type idx: int
+    :return: Extracted applicant data as a tuple aligned with table schema.
+    :rtype: tuple
+    """
+    p_id = derive_p_id(item, idx)
 
     return (
         p_id,                                           # Primary key uses p_id unless it's missing, otherwise uses the loop index
@@ -272,34 +797,713 @@ def extract_data(item, idx):
         item.get("llm_generated_university") or item.get("llm-generated-university"),   # Extract llm university
     )
 
-def main(path=None):
+def safe_extract(item, idx, quarantine):
+    """
+    Run :func:`extract_data`, quarantining the record if it fails.
+
+    :param item: Applicant JSON record.
+    :type item: dict
+    :param idx: Line number / fallback index passed to :func:`extract_data`.
+    :type idx: int
+    :param quarantine: Dead-letter sink for failing records.
+    :type quarantine: Quarantine
+    :return: Extracted row, or ``None`` if the record was quarantined.
+    :rtype: tuple | None
+    """
+    try:
+        return extract_data(item, idx)
+    except Exception as e:
+        quarantine.add(idx, "extract_failed", f"{type(e).__name__}: {e}", item)
+        return None
+
+def ensure_table(cur):
+    """
+    Create the ``applicants`` table in the configured layout.
+
+    Uses :data:`CREATE_PARTITIONED_TABLE_SQL` when :data:`PARTITIONED`
+    is set (``APPLICANTS_PARTITIONED=1``), otherwise the plain
+    :data:`CREATE_TABLE_SQL`. The rollup table and its insert trigger
+    (:data:`CREATE_ROLLUP_SQL`), the full-text search column
+    (:data:`CREATE_SEARCH_SQL`), the browse index
+    (:data:`CREATE_BROWSE_INDEX_SQL`), the weekly trend rollup
+    (:data:`CREATE_WEEKLY_ROLLUP_SQL`) and the application cube
+    (:data:`CREATE_CUBE_SQL`) are set up alongside.
+
+    :param cur: Open cursor.
+    :type cur: psycopg.Cursor
+    :return: None
+    :rtype: NoneType
+    """
+    cur.execute(CREATE_PARTITIONED_TABLE_SQL if PARTITIONED else CREATE_TABLE_SQL)
+    cur.execute(CREATE_ROLLUP_SQL)
+    cur.execute(CREATE_SEARCH_SQL)
+    cur.execute(CREATE_BROWSE_INDEX_SQL)
+    cur.execute(CREATE_WEEKLY_ROLLUP_SQL)
+    cur.execute(CREATE_CUBE_SQL)
+
+def ensure_partitions(cur, rows):
+    """
+    Create the yearly partitions needed by ``rows`` (partitioned layout only).
+
+    PostgreSQL routes each inserted row to its partition by itself, but
+    the partition has to exist first; otherwise dated rows would land in
+    the default partition. An advisory lock serialises partition creation
+    between concurrent loaders.
+
+    :param cur: Open cursor.
+    :type cur: psycopg.Cursor
+    :param rows: Extracted rows (``date_added`` is column 3).
+    :type rows: list[tuple]
+    :return: Years for which a partition was ensured.
+    :rtype: list[int]
+    """
+    if not PARTITIONED:
+        return []
+    years = sorted({r[3].year for r in rows if r[3] is not None})
+    if years:
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('applicants_partitions'));")
+        for year in years:
+            cur.execute(CREATE_YEAR_PARTITION_SQL.format(year=year, next_year=year + 1))
+    return years
+
+def migrate_to_partitioned(dsn=None):
+    """
+    Convert an existing plain ``applicants`` table to the partitioned layout.
+
+    Runs in a single transaction: the old table is renamed, the
+    partitioned table and one partition per year present in the data are
+    created, all rows are copied over and the old table is dropped. Does
+    nothing if ``applicants`` is already partitioned.
+
+    :param dsn: Database connection string. Defaults to :data:`DSN`.
+    :type dsn: str | None
+    :return: Number of rows migrated (``0`` if nothing was done).
+    :rtype: int
+    """
+    with connect(dsn or DSN) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('applicants');")
+            kind = cur.fetchone()
+            if kind is None or kind[0] == "p":
+                print("applicants is missing or already partitioned; nothing to migrate.")
+                return 0
+
+            cur.execute("DROP INDEX IF EXISTS applicants_browse;")                     # Frees the name for the new table
+            cur.execute("ALTER TABLE applicants RENAME TO applicants_unpartitioned;")
+            cur.execute(CREATE_PARTITIONED_TABLE_SQL)
+            cur.execute(CREATE_ROLLUP_SQL)              # Rebuilt empty; the copy below refills it
+            cur.execute(CREATE_SEARCH_SQL)
+            cur.execute(CREATE_BROWSE_INDEX_SQL)
+            cur.execute(CREATE_WEEKLY_ROLLUP_SQL)      # Also refilled by the copy
+            cur.execute("SELECT DISTINCT EXTRACT(YEAR FROM date_added)::int FROM applicants_unpartitioned "
+                        "WHERE date_added IS NOT NULL ORDER BY 1;")
+            for (year,) in cur.fetchall():
+                cur.execute(CREATE_YEAR_PARTITION_SQL.format(year=year, next_year=year + 1))
+            cur.execute(f"INSERT INTO applicants ({insert_cols}) "
+                        f"SELECT {insert_cols} FROM applicants_unpartitioned;")
+            moved = cur.rowcount
+            cur.execute("DROP TABLE applicants_unpartitioned;")
+        conn.commit()
+        after_load(conn)
+
+    print(f"Migrated {moved} rows into the partitioned applicants table.")
+    return moved
+
+def ensure_filter_indexes(dsn=None):
+    """
+    Create the indexes used by filtered analytics queries (:data:`FILTER_INDEXES_SQL`).
+
+    Kept out of the regular load path because ``pg_trgm`` may need
+    elevated privileges to install. On the partitioned layout the indexes
+    are created on every partition.
+
+    :param dsn: Database connection string. Defaults to :data:`DSN`.
+    :type dsn: str | None
+    :return: None
+    :rtype: NoneType
+    """
+    with connect(dsn or DSN) as conn:
+        with conn.cursor() as cur:
+            cur.execute(FILTER_INDEXES_SQL)
+        conn.commit()
+    print("Filter indexes are in place.")
+
+# The embedded SQLite copy read by query_data.SQLiteBackend uses CREATE_TABLE_SQL as is
+# (SQLite accepts the PostgreSQL type names); url is indexed for the scraper's duplicate check
+SQLITE_INSERT_SQL = (f"INSERT OR IGNORE INTO applicants ({insert_cols}) "
+                     f"VALUES ({', '.join(['?'] * len(COLUMNS))});")
+SQLITE_URL_INDEX_SQL = "CREATE INDEX IF NOT EXISTS applicants_url ON applicants (url);"
+
+def _sqlite_row(row):
+    """
+    Bind dates as ISO strings, the form the SQLite copy stores and compares them in.
+
+    :param row: Extracted row.
+    :type row: tuple
+    :return: The row with :class:`datetime.date` values as ``YYYY-MM-DD``.
+    :rtype: tuple
+    """
+    return tuple(v.isoformat() if isinstance(v, date) else v for v in row)
+
+def _cursor(conn):
+    """
+    Open a cursor as a context manager on either store the streaming loader writes to.
+
+    :param conn: PostgreSQL connection or the SQLite copy.
+    :type conn: psycopg.Connection | sqlite3.Connection
+    :return: Context manager yielding a cursor; SQLite cursors are closed on exit.
+    :rtype: contextlib.AbstractContextManager
+    """
+    if isinstance(conn, sqlite3.Connection):
+        return closing(conn.cursor())                   # sqlite3 cursors are not context managers
+    return conn.cursor()
+
+def _checkpoint_sql(sql, conn):
+    """
+    Adapt a ``load_checkpoints`` statement to the placeholder style of ``conn``.
+
+    :param sql: Statement written with ``%s`` placeholders.
+    :type sql: str
+    :param conn: PostgreSQL connection or the SQLite copy.
+    :type conn: psycopg.Connection | sqlite3.Connection
+    :return: The statement, with ``?`` placeholders for SQLite.
+    :rtype: str
+    """
+    return sql.replace("%s", "?") if isinstance(conn, sqlite3.Connection) else sql
+
+def load_sqlite(rows, path=None):
+    """
+    Insert extracted rows into the embedded SQLite copy of ``applicants``.
+
+    Used instead of PostgreSQL when ``ANALYTICS_BACKEND=sqlite``. Rows
+    whose ``p_id`` is already present are skipped, as with
+    :data:`INSERT_SQL`, and the results cache version is bumped afterwards.
+
+    :param rows: Extracted rows (see :func:`extract_data`).
+    :type rows: list[tuple]
+    :param path: SQLite file. Defaults to :data:`query_data.SQLITE_PATH`.
+    :type path: str | None
+    :return: Number of rows inserted.
+    :rtype: int
+    """
+    conn = sqlite3.connect(path or query_data.SQLITE_PATH)
+    try:
+        with conn:                                      # Commits on success
+            conn.execute(CREATE_TABLE_SQL)
+            conn.execute(SQLITE_URL_INDEX_SQL)
+            before = conn.total_changes
+            conn.executemany(SQLITE_INSERT_SQL, map(_sqlite_row, rows))
+            inserted = conn.total_changes - before
+    finally:
+        conn.close()
+    query_data.RESULTS_CACHE.bump()
+    return inserted
+
+def snapshot_sqlite(path=None, dsn=None, batch_size=BATCH_SIZE):
+    """
+    Copy the PostgreSQL ``applicants`` table into a local SQLite snapshot.
+
+    Rows are streamed through a server-side cursor in batches into a new
+    file, which then replaces ``path`` in one rename, so readers see either
+    the previous snapshot or the complete new one.
+
+    :param path: SQLite file. Defaults to :data:`query_data.SQLITE_PATH`.
+    :type path: str | None
+    :param dsn: Database connection string. Defaults to :data:`DSN`.
+    :type dsn: str | None
+    :param batch_size: Rows fetched per round trip.
+    :type batch_size: int
+    :return: Number of rows copied.
+    :rtype: int
+    """
+    path = path or query_data.SQLITE_PATH
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)                                  # Left over from an interrupted snapshot
+
+    copied = 0
+    lite = sqlite3.connect(tmp)
+    try:
+        with connect(dsn or DSN) as conn, conn.cursor(name="applicants_snapshot") as cur:
+            cur.execute(f"SELECT {insert_cols} FROM applicants;")
+            with lite:
+                lite.execute(CREATE_TABLE_SQL)
+                while batch := cur.fetchmany(batch_size):
+                    lite.executemany(SQLITE_INSERT_SQL, map(_sqlite_row, batch))
+                    copied += len(batch)
+                lite.execute(SQLITE_URL_INDEX_SQL)      # Built once, after the copy
+    finally:
+        lite.close()
+    os.replace(tmp, path)
+    query_data.RESULTS_CACHE.bump()
+
+    print(f"Copied {copied} rows into the SQLite snapshot {path}.")
+    return copied
+
+def after_load(conn, rebuild_rollups=False):
+    """
+    Refresh everything derived from ``applicants`` once a load has committed.
+
+    Runs in its own transaction after the data commit, so a failed
+    refresh never rolls back loaded rows. With ``rebuild_rollups`` (after
+    a load that deferred the rollup triggers, see :data:`DEFER_ROLLUPS_SQL`)
+    every table in :data:`DEFERRED_ROLLUPS` is first refilled from
+    ``applicants``; the ``EXCLUSIVE`` lock holds off concurrent loaders'
+    triggers until the rebuild commits, while readers keep seeing the old
+    rows. Then it refreshes the dashboard
+    summary view (:func:`query_data.refresh_summary`) and rebuilds the
+    application cube (:data:`CREATE_CUBE_SQL`) from the rollup table, then
+    bumps the results cache version so cached dashboard results are
+    recomputed.
+
+    :param conn: Open database connection.
+    :type conn: psycopg.Connection
+    :param rebuild_rollups: Rebuild the trigger-fed rollups from scratch first.
+    :type rebuild_rollups: bool
+    :return: None
+    :rtype: NoneType
+    """
+    with conn.cursor() as cur:
+        if rebuild_rollups:
+            for table, refill in DEFERRED_ROLLUPS.items():
+                cur.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE;")
+                cur.execute(f"DELETE FROM {table};")
+                cur.execute(refill)
+        query_data.refresh_summary(cur)
+        cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {CUBE_TABLE};")
+    conn.commit()
+    query_data.RESULTS_CACHE.bump()
+
+def insert_sql(staged=False):
+    """
+    Return the insert statement for the configured layout.
+
+    :param staged: Return the ``INSERT ... SELECT`` from the COPY staging
+        table rather than the per-row ``INSERT ... VALUES``.
+    :type staged: bool
+    :return: :data:`INSERT_SQL` or :data:`INSERT_STAGED_SQL`, or their
+        partitioned variants when :data:`PARTITIONED` is set.
+    :rtype: str
+    """
+    if staged:
+        return PARTITIONED_INSERT_STAGED_SQL if PARTITIONED else INSERT_STAGED_SQL
+    return PARTITIONED_INSERT_SQL if PARTITIONED else INSERT_SQL
+
+def insert_executemany(cur, rows):
+    """
+    Default insert backend: one :meth:`~psycopg.Cursor.executemany` call.
+
+    :param cur: Open cursor.
+    :type cur: psycopg.Cursor
+    :param rows: Extracted rows to insert.
+    :type rows: list[tuple]
+    :return: None
+    :rtype: NoneType
+    """
+    cur.executemany(insert_sql(), rows)
+
+# Session-local staging table for the COPY backend. Rows are copied into it and moved to
+# applicants with one INSERT ... SELECT, which skips duplicates like INSERT_SQL does.
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS applicants_staging (LIKE applicants) ON COMMIT DELETE ROWS;
+"""
+COPY_STAGING_SQL = f"COPY applicants_staging ({insert_cols}) FROM STDIN"
+INSERT_STAGED_SQL = f"""
+INSERT INTO applicants ({insert_cols})
+SELECT {insert_cols} FROM applicants_staging
+ON CONFLICT (p_id) DO NOTHING;
+"""
+PARTITIONED_INSERT_STAGED_SQL = f"""
+INSERT INTO applicants ({insert_cols})
+SELECT {insert_cols} FROM applicants_staging;
+"""
+
+def insert_copy(cur, rows):
+    """
+    COPY insert backend.
+
+    Rows are streamed into a temporary staging table with ``COPY`` and
+    moved into ``applicants`` with a single ``INSERT ... SELECT``, so the
+    whole batch costs a handful of round trips instead of one statement
+    per row. Duplicate ``p_id`` values are skipped exactly as with
+    :func:`insert_sql`, and the rollup triggers fire for each inserted row.
+
+    :param cur: Open cursor.
+    :type cur: psycopg.Cursor
+    :param rows: Extracted rows to insert.
+    :type rows: list[tuple]
+    :return: None
+    :rtype: NoneType
+    """
+    cur.execute(CREATE_STAGING_SQL)
+    cur.execute("TRUNCATE applicants_staging;")         # Earlier batches in the same transaction
+    with cur.copy(COPY_STAGING_SQL) as copy:
+        for row in rows:
+            copy.write_row(row)
+    cur.execute(insert_sql(staged=True))
+
+# Insert backends selectable with main(backend=...) / --backend
+INSERT_BACKENDS = {
+    "executemany": insert_executemany,
+    "copy": insert_copy,
+}
+
+def partition_items(items, workers):
+    """
+    Split raw items into contiguous ``p_id`` ranges, one per worker.
+
+    Items are sorted by their derived ``p_id`` and cut into ``workers``
+    chunks of (almost) equal size, so each worker inserts a disjoint key
+    range. Each entry keeps the 1-based position of the item in the input
+    file, which :func:`extract_data` needs as its fallback key.
+
+    :param items: Raw applicant records as returned by :func:`read_items`.
+    :type items: list[dict]
+    :param workers: Number of partitions to produce.
+    :type workers: int
+    :return: List of partitions, each a list of ``(idx, item)`` pairs.
+    :rtype: list[list[tuple[int, dict]]]
+    """
+    def key(item, idx):
+        try:
+            return derive_p_id(item, idx)
+        except Exception:       # Malformed records are quarantined by the worker; keep them at their position
+            return idx
+
+    keyed = sorted(
+        ((key(item, i + 1), i + 1, item) for i, item in enumerate(items)),
+        key=lambda t: t[0],
+    )
+    size = max(-(-len(keyed) // max(workers, 1)), 1)    # Ceiling division so no partition is left over
+    return [
+        [(idx, item) for _, idx, item in keyed[start:start + size]]
+        for start in range(0, len(keyed), size)
+    ]
+
+def load_partition(part, batch_size=BATCH_SIZE):
+    """
+    Extract and insert one ``p_id`` partition on its own connection.
+
+    Runs inside a worker process of :func:`load_parallel`. Rows are sent
+    in batches of ``batch_size`` and committed once at the end, with the
+    rollup triggers deferred (:data:`DEFER_ROLLUPS_SQL`). Records
+    that fail :func:`extract_data` are returned to the parent under
+    ``rejects`` instead of aborting the partition.
+
+    :param part: One partition produced by :func:`partition_items`.
+    :type part: list[tuple[int, dict]]
+    :param batch_size: Number of rows per ``executemany`` call.
+    :type batch_size: int
+    :return: Summary with row count, ``p_id`` range, rejects and elapsed seconds.
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    rows = []
+    rejects = []
+    for idx, item in part:
+        try:
+            rows.append(extract_data(item, idx))
+        except Exception as e:
+            rejects.append((idx, f"{type(e).__name__}: {e}", item))
+
+    with connect(DSN) as conn:
+        with conn.cursor() as cur:
+            if ensure_partitions(cur, rows):
+                conn.commit()           # Release the partition lock before the long insert transaction
+            cur.execute(DEFER_ROLLUPS_SQL)  # load_parallel rebuilds them once all workers are done
+            for i in range(0, len(rows), batch_size):
+                cur.executemany(insert_sql(), rows[i:i + batch_size])
+        conn.commit()
+
+    return {
+        "rows": len(rows),
+        "min_p_id": rows[0][0] if rows else None,
+        "max_p_id": rows[-1][0] if rows else None,
+        "rejects": rejects,
+        "seconds": time.perf_counter() - start,
+    }
+
+def load_parallel(path=None, workers=4, batch_size=BATCH_SIZE, dead_letter=None):
+    """
+    Load a large file using several worker processes and connections.
+
+    - Reads items from a JSON or JSON-lines file.
+    - Creates the ``applicants`` table once, up front.
+    - Partitions the items by ``p_id`` range (:func:`partition_items`).
+    - Each worker process runs :func:`load_partition` on its own
+      connection, so :func:`extract_data` and the inserts run in parallel.
+    - The workers skip the rollup triggers; the rollups are rebuilt once
+      afterwards (:func:`after_load`), even if a worker failed.
+    - Unparseable lines and failing records go to the dead-letter file.
+    - Prints a per-partition and overall summary.
+
+    PostgreSQL only; :func:`main` loads the SQLite copy in one process.
+
+    :param path: Optional path to the LLM JSON file. Defaults to ``LLM_JSON``.
+    :type path: str | None
+    :param workers: Number of worker processes/connections.
+    :type workers: int
+    :param batch_size: Number of rows per ``executemany`` call.
+    :type batch_size: int
+    :param dead_letter: Dead-letter file. Defaults to :func:`dead_letter_path`.
+    :type dead_letter: str | None
+    :return: One summary dictionary per partition.
+    :rtype: list[dict]
+    """
+    start = time.perf_counter()
+    llm_file = path or LLM_JSON
+    quarantine = Quarantine(dead_letter or dead_letter_path(llm_file))
+    llm_items = read_items(llm_file, quarantine)
+    parts = partition_items(llm_items, workers)
+
+    with connect(DSN) as conn:
+        with conn.cursor() as cur:
+            ensure_table(cur)
+        conn.commit()
+
+    summaries = []
+    if parts:
+        try:
+            with ProcessPoolExecutor(max_workers=len(parts)) as pool:
+                summaries = list(pool.map(load_partition, parts, [batch_size] * len(parts)))
+        finally:
+            with connect(DSN) as conn:              # Also counts the partitions that did commit
+                after_load(conn, rebuild_rollups=True)
+
+    for i, s in enumerate(summaries):
+        for idx, reason, item in s["rejects"]:
+            quarantine.add(idx, "extract_failed", reason, item)
+        print(f"  partition {i}: p_id {s['min_p_id']}-{s['max_p_id']}, "
+              f"{s['rows']} rows in {s['seconds']:.2f}s")
+
+    total = sum(s["rows"] for s in summaries)
+    elapsed = time.perf_counter() - start
+    print(f"Pushed {total} rows into applicants using {len(parts)} workers in {elapsed:.2f}s.")
+    quarantine.report()
+    return summaries
+
+def _commit_batch(conn, source, rows, line_offset, prefix_hash, backend="executemany"):
+    """
+    Insert one batch and advance the checkpoint in the same transaction.
+
+    :param conn: Open database connection, or the SQLite copy.
+    :type conn: psycopg.Connection | sqlite3.Connection
+    :param source: Checkpoint key (absolute path of the input file).
+    :type source: str
+    :param rows: Extracted rows to insert.
+    :type rows: list[tuple]
+    :param line_offset: Last input line covered by ``rows``.
+    :type line_offset: int
+    :param prefix_hash: :class:`PrefixHash` digest of lines ``1..line_offset``.
+    :type prefix_hash: str
+    :param backend: Key of :data:`INSERT_BACKENDS` used for the insert
+        (PostgreSQL only; the SQLite copy always uses :data:`SQLITE_INSERT_SQL`).
+    :type backend: str
+    :return: None
+    :rtype: NoneType
+    """
+    with _cursor(conn) as cur:
+        if isinstance(conn, sqlite3.Connection):
+            cur.executemany(SQLITE_INSERT_SQL, map(_sqlite_row, rows))
+        else:
+            ensure_partitions(cur, rows)
+            INSERT_BACKENDS[backend](cur, rows)
+        cur.execute(_checkpoint_sql(CHECKPOINT_UPSERT_SQL, conn),
+                    (source, line_offset, prefix_hash, len(rows)))
+    conn.commit()
+
+def load_streaming(path=None, batch_size=BATCH_SIZE, resume=True, dead_letter=None,
+                   backend="executemany"):
+    """
+    Stream a JSON-lines file into the database, committing in batches.
+
+    - Reads the file lazily with :func:`iter_items`; only one batch of
+      rows is held in memory at a time.
+    - Each batch is inserted and committed together with the last line
+      number it covers in the ``load_checkpoints`` table, so a failure
+      only loses the batch in flight.
+    - With ``resume`` enabled, loading restarts after the last committed
+      line recorded for this file, provided the lines before it are
+      unchanged (:class:`PrefixHash`); a file rewritten since the
+      checkpoint is loaded again from line 1.
+    - Prints rows/sec progress after every committed batch.
+    - Unparseable lines and failing records go to the dead-letter file
+      instead of stopping the load.
+
+    With ``ANALYTICS_BACKEND=sqlite`` the batches and the checkpoint go
+    into the embedded SQLite copy (:data:`query_data.SQLITE_PATH`), the
+    same store :func:`main` loads there, and ``backend`` is not used.
+
+    :param path: Optional path to the LLM JSON file. Defaults to ``LLM_JSON``.
+    :type path: str | None
+    :param batch_size: Number of rows per committed batch.
+    :type batch_size: int
+    :param resume: Continue from the stored checkpoint instead of line 1.
+    :type resume: bool
+    :param dead_letter: Dead-letter file. Defaults to :func:`dead_letter_path`.
+    :type dead_letter: str | None
+    :param backend: Key of :data:`INSERT_BACKENDS` used for each batch.
+    :type backend: str
+    :return: Number of rows sent to the database in this run.
+    :rtype: int
+    """
+    source = os.path.abspath(path or LLM_JSON)
+    quarantine = Quarantine(dead_letter or dead_letter_path(source))
+
+    sqlite = query_data.ANALYTICS_BACKEND == "sqlite"
+    prefix = PrefixHash(source)
+    with (closing(sqlite3.connect(query_data.SQLITE_PATH)) if sqlite else connect(DSN)) as conn:
+        offset = 0
+        with _cursor(conn) as cur:
+            if sqlite:
+                cur.execute(CREATE_TABLE_SQL)
+                cur.execute(SQLITE_URL_INDEX_SQL)
+            else:
+                ensure_table(cur)
+            cur.execute(CHECKPOINT_TABLE_SQL)
+            if resume:
+                cur.execute(_checkpoint_sql(CHECKPOINT_SELECT_SQL, conn), (source,))
+                row = cur.fetchone()
+                if row and prefix.advance(row[0]) == row[1]:
+                    offset = row[0]
+                elif row:
+                    print(f"{source} changed since its checkpoint; loading from line 1.")
+                    cur.execute(_checkpoint_sql(CHECKPOINT_DELETE_SQL, conn), (source,))
+                    prefix.close()
+                    prefix = PrefixHash(source)
+        conn.commit()
+
+        if offset:
+            print(f"Resuming {source} after line {offset}.")
+
+        start = time.perf_counter()
+        loaded = 0
+        batch = []
+        try:
+            for line_no, item in iter_items(source, start_line=offset, quarantine=quarantine):
+                offset = line_no
+                row = safe_extract(item, line_no, quarantine)
+                if row is None:
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    _commit_batch(conn, source, batch, offset, prefix.advance(offset), backend)
+                    loaded += len(batch)
+                    batch = []
+                    rate = loaded / max(time.perf_counter() - start, 1e-9)
+                    print(f"  committed {loaded} rows (through line {offset}), {rate:.0f} rows/sec")
+
+            if batch:
+                _commit_batch(conn, source, batch, offset, prefix.advance(offset), backend)
+                loaded += len(batch)
+        finally:
+            prefix.close()
+
+        if sqlite:
+            query_data.RESULTS_CACHE.bump()
+        elif loaded:
+            after_load(conn)
+
+    elapsed = time.perf_counter() - start
+    print(f"Pushed {loaded} rows into applicants in {elapsed:.2f}s "
+          f"({loaded / max(elapsed, 1e-9):.0f} rows/sec).")
+    quarantine.report()
+    return loaded
+
+def main(path=None, workers=1, dead_letter=None, backend="executemany"):
     """
     Load processed applicant data into the PostgreSQL database.
 
     - Reads items from a JSON or JSON-lines file.
     - Extracts fields into structured tuples.
-    - Creates the ``applicants`` table if it does not exist.
+    - Creates the ``applicants`` table if it does not exist
+      (:func:`ensure_table`), plus any yearly partitions the rows need
+      when the partitioned layout is enabled.
     - Inserts rows, ignoring conflicts on ``p_id``.
+    - Refreshes the dashboard summary (:func:`after_load`).
+    - Malformed lines and records that fail :func:`extract_data` are
+      written to a dead-letter file rather than failing the whole load.
+
+    With ``workers`` greater than one the load is delegated to
+    :func:`load_parallel`. ``backend`` selects how rows are sent: the
+    default single ``executemany`` or ``COPY`` through a staging table
+    (:func:`insert_copy`).
+
+    With ``ANALYTICS_BACKEND=sqlite`` the rows go into the embedded SQLite
+    copy instead (:func:`load_sqlite`) and no PostgreSQL server is needed.
+    That copy is then the only store: the load runs in this process
+    whatever ``workers`` is, and :func:`load_streaming` appends to the same
+    file. Only ``--sqlite-snapshot`` (:func:`snapshot_sqlite`) replaces it.
 
     :param path: Optional path to the LLM JSON file. Defaults to ``LLM_JSON``.
     :type path: str | None
+    :param workers: Number of parallel worker processes. Defaults to ``1``.
+    :type workers: int
+    :param dead_letter: Dead-letter file. Defaults to :func:`dead_letter_path`.
+    :type dead_letter: str | None
+    :param backend: ``"executemany"`` or ``"copy"`` (see :data:`INSERT_BACKENDS`).
+    :type backend: str
     :return: None
     :rtype: NoneType
+    :raises ValueError: If ``backend`` is not a known insert backend.
     """
+    if backend not in INSERT_BACKENDS:
+        raise ValueError(f"Unknown loader backend {backend!r}; choose from {sorted(INSERT_BACKENDS)}")
+
+    sqlite = query_data.ANALYTICS_BACKEND == "sqlite"
+    if workers > 1 and not sqlite:
+        load_parallel(path, workers=workers, dead_letter=dead_letter)
+        return
+
     llm_file = path or LLM_JSON         # Fallback to default file name when this is ran as a standalone script
-    llm_items = read_items(llm_file)
+    quarantine = Quarantine(dead_letter or dead_letter_path(llm_file))
+    llm_items = read_items(llm_file, quarantine)
 
     rows = []
     for i, item in enumerate(llm_items):
-        rows.append(extract_data(item, i + 1))
+        row = safe_extract(item, i + 1, quarantine)
+        if row is not None:
+            rows.append(row)
 
-    with connect(DSN) as conn:
-        with conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(CREATE_TABLE_SQL)
-            cur.executemany(INSERT_SQL, rows)
-        conn.commit()
+    if sqlite:
+        load_sqlite(rows)
+    else:
+        with connect(DSN) as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                ensure_table(cur)
+                ensure_partitions(cur, rows)
+                INSERT_BACKENDS[backend](cur, rows)
+            conn.commit()
+            after_load(conn)
 
     print(f"Pushed {len(rows)} rows into applicants.")
+    quarantine.report()
 
 if __name__ == "__main__":  # pragma: no cover
-    main()
+    parser = argparse.ArgumentParser(description="Load LLM-processed applicant data into PostgreSQL.")
+    parser.add_argument("path", nargs="?", default=None, help="JSON/JSONL file to load (defaults to LLM_JSON)")
+    parser.add_argument("--workers", type=int, default=1, help="parallel worker processes, one connection each")
+    parser.add_argument("--stream", action="store_true", help="stream the file and commit in batches with a checkpoint")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per committed batch in --stream mode")
+    parser.add_argument("--no-resume", action="store_true", help="ignore the stored checkpoint and start from line 1")
+    parser.add_argument("--dead-letter", default=None, help="file for rejected records (defaults to <path>.rejects.jsonl)")
+    parser.add_argument("--backend", choices=sorted(INSERT_BACKENDS), default="executemany",
+                        help="insert backend: one executemany call, or COPY into a staging table")
+    parser.add_argument("--migrate-partitioned", action="store_true",
+                        help="convert an existing applicants table to the date_added-partitioned layout and exit")
+    parser.add_argument("--create-filter-indexes", action="store_true",
+                        help="create the trigram/date indexes used by filtered analytics queries and exit")
+    parser.add_argument("--sqlite-snapshot", nargs="?", const="", default=None, metavar="PATH",
+                        help="copy applicants into an embedded SQLite file (defaults to SQLITE_PATH) and exit")
+    args = parser.parse_args()
+    if args.migrate_partitioned:
+        migrate_to_partitioned()
+    elif args.create_filter_indexes:
+        ensure_filter_indexes()
+    elif args.sqlite_snapshot is not None:
+        snapshot_sqlite(args.sqlite_snapshot or None)
+    elif args.stream:
+        load_streaming(args.path, batch_size=args.batch_size, resume=not args.no_resume,
+                       dead_letter=args.dead_letter, backend=args.backend)
+    else:
+        main(args.path, workers=args.workers, dead_letter=args.dead_letter, backend=args.backend)
@@ -1,6 +1,28 @@
 import os
-from psycopg import connect
+import re
+import io
+import csv
+import json
+import zlib
+import base64
+import argparse
+import threading
+import time
+import math
+import random
+import statistics
+import hashlib
+import logging
+import sqlite3
+from collections import OrderedDict, deque, namedtuple
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+import psycopg
+from psycopg import errors, sql
 from psycopg.rows import dict_row
+from db import pooled_connection as connect     # Connections come from the shared pool in db.py
 from dotenv import load_dotenv
 
 # Load database credentials from .env file
@@ -13,25 +35,451 @@ DSN = (
     f"password={os.getenv('PGPASSWORD')}"
 )
 
-def sql_query(sql, *params):
+# Optional read replica for analytics queries (PGHOST_READ, and PGPORT_READ if it differs);
+# same database and credentials as the primary
+READ_DSN = (
+    f"host={os.getenv('PGHOST_READ')} port={os.getenv('PGPORT_READ', os.getenv('PGPORT'))} "
+    f"dbname={os.getenv('PGDATABASE')} user={os.getenv('PGUSER')} "
+    f"password={os.getenv('PGPASSWORD')}"
+) if os.getenv("PGHOST_READ") else None
+
+# The replica is used while it is reachable and at most REPLICA_MAX_LAG seconds behind;
+# its health is re-checked every REPLICA_CHECK_INTERVAL seconds
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "30"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+REPLICA_CONNECT_TIMEOUT = int(os.getenv("REPLICA_CONNECT_TIMEOUT", "2"))
+
+# Optional directory shared by every process (web workers, CLI loads) for the results cache
+RESULTS_CACHE_DIR = os.getenv("RESULTS_CACHE_DIR")
+
+# Statements slower than this (milliseconds) go to the slow-query log, which names the
+# types of their parameters but never the values. With SLOW_QUERY_EXPLAIN set their plan is
+# captured too: the estimated EXPLAIN plan, or with SLOW_QUERY_EXPLAIN=analyze the
+# EXPLAIN (ANALYZE, BUFFERS) plan, which runs the statement a second time.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "").lower() in ("1", "true", "yes", "analyze")
+SLOW_QUERY_ANALYZE = os.getenv("SLOW_QUERY_EXPLAIN", "").lower() == "analyze"
+
+# Run the independent metric statements concurrently, each on its own pooled connection.
+# PARALLEL_METRICS=0 falls back to running them one after another on a single connection.
+PARALLEL_METRICS = os.getenv("PARALLEL_METRICS", "1").lower() not in ("0", "false", "no")
+
+# Storage engine behind the dashboard metrics: "postgres" (default), or "sqlite" for
+# deployments without a PostgreSQL server, which read a local file at SQLITE_PATH
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "postgres").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(__file__), "applicants.sqlite3"))
+
+logger = logging.getLogger(__name__)
+
+def fingerprint(query):
+    """
+    Normalize a SQL statement so that runs differing only in values group together.
+
+    String and numeric literals and ``%s``/``%(name)s`` placeholders become
+    ``?``, whitespace is collapsed and the text is lowercased.
+
+    :param query: SQL statement.
+    :type query: str
+    :return: Normalized statement text.
+    :rtype: str
+    """
+    text = re.sub(r"'(?:[^']|'')*'", "?", query)                # String literals
+    text = re.sub(r"%\(\w+\)s|%s", "?", text)                   # Bound placeholders
+    text = re.sub(r"\b\d+(?:\.\d+)?\b", "?", text)               # Numbers (not digits inside names)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def _param_types(params):
+    """Describe bound parameters by type only, e.g. ``(str, date)``, so values stay out of logs."""
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in params or ()) + ")"
+
+def _percentile(ordered, q):
+    """Nearest-rank ``q`` quantile of an ascending, non-empty list, rounded to 3 places."""
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+class QueryStats:
+    """
+    Per-statement timing collected by :func:`sql_query`.
+
+    Statements are grouped by :func:`fingerprint`. Each group keeps its call
+    count, total time and rows, plus the last ``window`` durations from
+    which rolling percentiles are reported. Calls slower than ``slow_ms``
+    are logged with the types of their parameters (never the values) and
+    remembered, so the plan can be captured later with :meth:`explain` (or
+    right away with ``explain_slow``). Plans are always captured on a
+    separate pooled connection, never inside the caller's transaction.
+
+    :param slow_ms: Slow-query threshold in milliseconds.
+    :type slow_ms: float
+    :param window: Number of recent durations kept per statement.
+    :type window: int
+    :param explain_slow: Capture the plan as soon as a query is slow.
+    :type explain_slow: bool
+    :param analyze: Capture ``EXPLAIN (ANALYZE, BUFFERS)`` rather than the
+        estimated plan by default; this runs the statement again.
+    :type analyze: bool
+    """
+    def __init__(self, slow_ms=SLOW_QUERY_MS, window=1000, explain_slow=SLOW_QUERY_EXPLAIN,
+                 analyze=SLOW_QUERY_ANALYZE):
+        self.slow_ms = slow_ms
+        self.window = window
+        self.explain_slow = explain_slow
+        self.analyze = analyze
+        self._entries = {}                              # query id -> counters
+        self._samples = {}                              # query id -> (sql, params) of the last slow call
+        self._lock = threading.Lock()
+
+    def record(self, query, params, seconds, rows):
+        """
+        Add one execution of ``query`` to its statement's counters.
+
+        :param query: SQL statement as executed.
+        :type query: str
+        :param params: Parameters it was executed with.
+        :type params: tuple | dict
+        :param seconds: Wall time of execute and fetch.
+        :type seconds: float
+        :param rows: Number of rows returned.
+        :type rows: int
+        :return: The statement's query id.
+        :rtype: str
+        """
+        text = fingerprint(query)
+        query_id = hashlib.md5(text.encode()).hexdigest()[:12]
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._entries.get(query_id)
+            if entry is None:
+                entry = self._entries[query_id] = {
+                    "fingerprint": text, "calls": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "slow": 0, "durations": deque(maxlen=self.window), "plan": None,
+                }
+            entry["calls"] += 1
+            entry["rows"] += rows
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["durations"].append(ms)
+            slow = ms >= self.slow_ms
+            if slow:
+                entry["slow"] += 1
+                self._samples[query_id] = (query, params)
+
+        if slow:
+            logger.warning("Slow query %s: %.1f ms, %d rows: %s params=%s",
+                           query_id, ms, rows, text, _param_types(params))
+            if self.explain_slow:
+                try:
+                    self.explain(query_id)              # Own pooled connection, not the caller's transaction
+                except ValueError:
+                    pass                                # Not a read-only statement; nothing to capture
+                except psycopg.Error as e:
+                    logger.warning("Could not explain slow query %s: %s", query_id, e)
+        return query_id
+
+    def explain(self, query_id, conn=None, analyze=None):
+        """
+        Capture the plan of a statement's last slow call.
+
+        The plan is stored with the statement's stats. By default it is the
+        estimated ``EXPLAIN`` plan; ``analyze`` captures ``EXPLAIN (ANALYZE,
+        BUFFERS)``, which runs the statement again. Only ``SELECT``/``WITH``
+        statements are explained.
+
+        :param query_id: Query id from :meth:`snapshot`.
+        :type query_id: str
+        :param conn: Connection to run on; one is borrowed from the pool if omitted.
+        :type conn: psycopg.Connection | None
+        :param analyze: Run ``EXPLAIN ANALYZE``; defaults to the ``analyze`` setting.
+        :type analyze: bool | None
+        :return: Plan lines.
+        :rtype: list[str]
+        :raises KeyError: If the statement has never been slow.
+        :raises ValueError: If the statement is not a query.
+        """
+        query, params = self._samples[query_id]
+        if not fingerprint(query).startswith(("select", "with")):
+            raise ValueError(f"Only SELECT statements can be explained, not {query_id}")
+        if conn is None:
+            return run_read(lambda conn: self.explain(query_id, conn=conn, analyze=analyze))
+
+        analyze = self.analyze if analyze is None else analyze
+        with conn.cursor() as cur:
+            cur.execute(("EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN ")
+                        + query.strip().rstrip(";"), params)
+            plan = [row[0] for row in cur.fetchall()]
+        with self._lock:
+            self._entries[query_id]["plan"] = plan
+        return plan
+
+    def snapshot(self):
+        """
+        Report the collected statistics, most expensive statement first.
+
+        :return: One dict per statement with its id, fingerprint, call and
+            row counts, total/mean/max time, rolling p50/p95/p99 (ms), slow
+            call count and captured plan.
+        :rtype: list[dict[str, Any]]
+        """
+        out = []
+        with self._lock:
+            for query_id, e in self._entries.items():
+                recent = sorted(e["durations"])
+                out.append({
+                    "id": query_id, "fingerprint": e["fingerprint"], "calls": e["calls"], "rows": e["rows"],
+                    "total_ms": round(e["total_ms"], 3), "mean_ms": round(e["total_ms"] / e["calls"], 3),
+                    "p50_ms": _percentile(recent, 0.50), "p95_ms": _percentile(recent, 0.95),
+                    "p99_ms": _percentile(recent, 0.99), "max_ms": round(e["max_ms"], 3),
+                    "slow": e["slow"], "plan": e["plan"],
+                })
+        return sorted(out, key=lambda e: e["total_ms"], reverse=True)
+
+    def reset(self):
+        """Forget every collected statistic."""
+        with self._lock:
+            self._entries.clear()
+            self._samples.clear()
+
+QUERY_STATS = QueryStats()
+
+# Replay lag of a standby in seconds; 0 on a primary, or when everything received is replayed
+# (an idle primary leaves the last replay timestamp behind without the standby being late)
+REPLICA_LAG_SQL = """
+SELECT CASE
+  WHEN NOT pg_is_in_recovery() THEN 0
+  WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+  ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END::float8;
+"""
+
+# Read-your-writes check for version-cached results: the primary's current WAL position, and
+# whether a replica has replayed up to it (a server that is not in recovery is the primary)
+PRIMARY_LSN_SQL = "SELECT pg_current_wal_lsn()::text;"
+REPLICA_CAUGHT_UP_SQL = "SELECT NOT pg_is_in_recovery() OR pg_last_wal_replay_lsn() >= %s::pg_lsn;"
+
+class ReplicaRouter:
+    """
+    Choose between the read replica and the primary for analytics reads.
+
+    The replica's reachability and replay lag are checked at most every
+    ``check_interval`` seconds, over a direct connection with a short
+    connect timeout so an unreachable replica never stalls on the pool.
+    While the replica is down or more than ``max_lag`` seconds behind,
+    reads go to the primary.
+
+    :param read_dsn: Replica connection string, or ``None`` for no replica.
+    :type read_dsn: str | None
+    :param max_lag: Largest acceptable replay lag in seconds.
+    :type max_lag: float
+    :param check_interval: Seconds between health checks.
+    :type check_interval: float
+    """
+    def __init__(self, read_dsn, max_lag=REPLICA_MAX_LAG, check_interval=REPLICA_CHECK_INTERVAL):
+        self.read_dsn = read_dsn
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.healthy = False
+        self.lag = None
+        self.error = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        """
+        Measure the replica's lag now and record whether it may be used.
+
+        :return: ``True`` if the replica is usable.
+        :rtype: bool
+        """
+        try:
+            with psycopg.connect(self.read_dsn, connect_timeout=REPLICA_CONNECT_TIMEOUT) as conn:
+                lag = conn.execute(REPLICA_LAG_SQL).fetchone()[0]
+        except psycopg.Error as e:
+            self.mark_down(f"{type(e).__name__}: {e}")
+            return False
+        healthy = lag <= self.max_lag
+        with self._lock:
+            self.healthy, self.lag, self._checked_at = healthy, lag, time.monotonic()
+            self.error = None if healthy else f"replica is {lag:.1f}s behind (limit {self.max_lag:g}s)"
+        if not healthy:
+            logger.warning("Read replica skipped: %s", self.error)
+        return healthy
+
+    def mark_down(self, error):
+        """
+        Send reads to the primary until the next health check.
+
+        :param error: Why the replica was given up.
+        :type error: str
+        """
+        with self._lock:
+            self.healthy, self.lag, self.error, self._checked_at = False, None, error, time.monotonic()
+        logger.warning("Read replica unavailable, reading from the primary: %s", error)
+
+    def dsn(self):
+        """
+        Connection string for the next analytics read.
+
+        :return: :data:`READ_DSN` while the replica is usable, otherwise :data:`DSN`.
+        :rtype: str
+        """
+        if self.read_dsn is None:
+            return DSN
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self.check()
+        return self.read_dsn if self.healthy else DSN
+
+    def stats(self):
+        """
+        Report the replica's state for the admin endpoint.
+
+        :return: Whether a replica is configured and usable, its last
+            measured lag, the reason it is skipped, and the age of the check.
+        :rtype: dict[str, Any]
+        """
+        checked = self._checked_at
+        return {
+            "configured": self.read_dsn is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "error": self.error,
+            "checked_seconds_ago": None if checked is None else round(time.monotonic() - checked, 1),
+        }
+
+REPLICA = ReplicaRouter(READ_DSN)
+
+@contextmanager
+def read_connection(primary=False):
+    """
+    Borrow a pooled connection for an analytics read.
+
+    Reads go to the replica chosen by :data:`REPLICA` unless ``primary``
+    is set; if the replica pool cannot hand out a connection within
+    :data:`REPLICA_CONNECT_TIMEOUT` seconds, the replica is marked down
+    and the primary is used instead. Errors raised by the block itself
+    are not retried; use :func:`run_read` for that. Writes and the
+    scraper's duplicate checks keep using :func:`db.pooled_connection`
+    on :data:`DSN` directly.
+
+    :param primary: Read from the primary regardless of the replica.
+    :type primary: bool
+    :yield: A live connection.
+    :rtype: psycopg.Connection
+    """
+    dsn = DSN if primary else REPLICA.dsn()
+    with ExitStack() as stack:
+        if dsn == DSN:
+            conn = stack.enter_context(connect(DSN))
+        else:
+            try:
+                conn = stack.enter_context(connect(dsn, timeout=REPLICA_CONNECT_TIMEOUT))
+            except errors.OperationalError as e:
+                REPLICA.mark_down(f"{type(e).__name__}: {e}")
+                conn = stack.enter_context(connect(DSN))
+        yield conn
+
+def _fetch_value(conn, query, params=None):
+    """Run a one-value query on ``conn`` and return the value."""
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        return cur.fetchone()[0]
+
+def run_read(work, primary=False, fresh=False):
+    """
+    Run the read-only ``work(conn)`` on a read connection, falling back to the primary.
+
+    Like :func:`read_connection`, but a replica that fails while ``work``
+    runs (the server went away between health checks, a dropped
+    connection) is marked down as well, and ``work`` is run again on the
+    primary. A statement timeout is raised as is.
+
+    With ``fresh`` the replica is only used once it has replayed the
+    primary's WAL up to the position read just before
+    (:data:`PRIMARY_LSN_SQL`), so the result includes every load
+    committed so far; results cached per data version need this, or a
+    lagging replica would pin stale numbers under the new version. A
+    replica that is behind is skipped for this read only.
+
+    :param work: Callable taking a connection; it must only read.
+    :type work: Callable[[psycopg.Connection], T]
+    :param primary: Read from the primary regardless of the replica.
+    :type primary: bool
+    :param fresh: Require the replica to have caught up with the primary.
+    :type fresh: bool
+    :return: What ``work`` returns.
+    :rtype: T
+    """
+    dsn = DSN if primary else REPLICA.dsn()
+    if dsn != DSN:
+        if fresh:
+            with connect(DSN) as conn:
+                lsn = _fetch_value(conn, PRIMARY_LSN_SQL)
+        try:
+            with connect(dsn, timeout=REPLICA_CONNECT_TIMEOUT) as conn:
+                if not fresh or _fetch_value(conn, REPLICA_CAUGHT_UP_SQL, (lsn,)):
+                    return work(conn)
+        except errors.QueryCanceled:
+            raise
+        except errors.OperationalError as e:
+            REPLICA.mark_down(f"{type(e).__name__}: {e}")
+    with connect(DSN) as conn:
+        return work(conn)
+
+def sql_query(sql, *params, conn=None, prepare=None):
     """
     Execute a SQL query against the PostgreSQL database.
 
-    Opens a connection using the global DSN and executes the query with
-    the provided parameters. Results are returned as a list of dictionaries,
-    where each dictionary corresponds to a row.
+    Borrows a connection for the global DSN from the shared pool (see
+    :func:`db.pooled_connection`) and executes the query with the
+    provided parameters. Results are returned as a list of dictionaries,
+    where each dictionary corresponds to a row. Every call is timed and
+    recorded in :data:`QUERY_STATS`.
 
     :param sql: SQL query string with optional placeholders.
     :type sql: str
-    :param params: Parameters to safely substitute into the SQL query.
+    :param params: Parameters to safely substitute into the SQL query. A
+        single ``dict`` argument is passed through for ``%(name)s`` placeholders.
     :type params: tuple
+    :param conn: Already checked-out connection to run on, so a caller
+        issuing several queries pays for a single pool checkout.
+    :type conn: psycopg.Connection | None
+    :param prepare: ``True`` to use a server-side prepared statement (kept
+        per pooled connection), ``None`` to let psycopg decide.
+    :type prepare: bool | None
     :return: List of query results, each row represented as a dictionary.
     :rtype: list[dict]
     """
-    with connect(DSN) as conn:
-        with conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(sql, params)                    # Execute query
-            return cur.fetchall()
+    if conn is None:
+        with connect(DSN) as conn:
+            return sql_query(sql, *params, conn=conn, prepare=prepare)
+
+    if len(params) == 1 and isinstance(params[0], dict):
+        params = params[0]                              # Named placeholders
+
+    start = time.perf_counter()
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(sql, params, prepare=prepare)       # Execute query
+        rows = cur.fetchall()
+    QUERY_STATS.record(sql, params, time.perf_counter() - start, len(rows))
+    return rows
+
+def read_query(query, params, conn=None):
+    """
+    Run an analytics read as a prepared statement, on the read replica
+    (see :func:`run_read`) unless ``conn`` is given.
+
+    :param query: SQL query string.
+    :type query: str
+    :param params: Query parameters.
+    :type params: dict[str, Any]
+    :param conn: Already checked-out connection to run on.
+    :type conn: psycopg.Connection | None
+    :return: Rows as dictionaries.
+    :rtype: list[dict]
+    """
+    if conn is None:
+        return run_read(lambda conn: sql_query(query, params, conn=conn, prepare=True))
+    return sql_query(query, params, conn=conn, prepare=True)
 
 def pct(x):
     """
@@ -44,16 +492,510 @@ def pct(x):
     """
     return f"{x:.2f}%"  # Convert value to percent
 
+# Structured filters. Text filters match their column case-insensitively as a substring
+# ({"university": "johns hopkins"} -> llm_generated_university ILIKE '%johns hopkins%');
+# date_from (inclusive) and date_to (exclusive) bound date_added.
+FILTER_COLUMNS = {
+    "term": "term",
+    "status": "status",
+    "citizenship": "us_or_international",
+    "degree": "degree",
+    "program": "llm_generated_program",
+    "university": "llm_generated_university",
+}
+DATE_FILTERS = {"date_from": ">=", "date_to": "<"}
+
+# Tables a metric query can read: the raw rows, or the loader's running aggregates
+# (load_data.CREATE_ROLLUP_SQL), whose bucket keys carry the same column names.
+# The rollup has no date_added, so date filters always read applicants.
+# "sample" reads a block sample of applicants for approximate_metrics; "sqlite" reads the
+# embedded SQLite copy of applicants (SQLiteBackend).
+SOURCES = {
+    "applicants": "applicants",
+    "rollup": "applicant_rollups",
+    "sample": "applicants TABLESAMPLE SYSTEM (%(sample_pct)s) REPEATABLE (%(sample_seed)s)",
+    "sqlite": "applicants",
+}
+
+# Aggregate kinds per source. {f} is the metric's FILTER clause, {share} the predicate
+# counted in a percentage's numerator, {col} the averaged column.
+AGGREGATES = {
+    "applicants": {
+        "count": "COUNT(*){f}",
+        "pct": "ROUND(100.0 * COUNT(*) FILTER (WHERE {share}) / NULLIF(COUNT(*){f}, 0), 2)",
+        "avg": "ROUND((AVG({col}){f})::numeric, 3)",
+    },
+    "rollup": {
+        "count": "COALESCE(SUM(n){f}, 0)::bigint",
+        "pct": "ROUND(100.0 * COALESCE(SUM(n) FILTER (WHERE {share}), 0) / NULLIF(SUM(n){f}, 0), 2)",
+        "avg": "ROUND(SUM({col}_sum){f} / NULLIF(SUM({col}_n){f}, 0), 3)",
+    },
+    # Per-page sample statistics: a count, or the numerator and denominator of a ratio.
+    # compile_metrics sums them over the sampled pages (SAMPLE_TOTALS) and approximate_metrics
+    # scales the sums and derives confidence intervals from their spread between pages.
+    "sample": {
+        "count": "COUNT(*){f}",
+        "pct": "ARRAY[COUNT(*) FILTER (WHERE {share}), COUNT(*){f}]::float8[]",
+        "avg": "ARRAY[COALESCE(SUM({col}){f}, 0), COUNT({col}){f}]::float8[]",
+    },
+    "sqlite": {
+        "count": "COUNT(*){f}",
+        "pct": "ROUND(100.0 * COUNT(*) FILTER (WHERE {share}) / NULLIF(COUNT(*){f}, 0), 2)",
+        "avg": "ROUND(AVG({col}){f}, 3)",
+    },
+}
+
+# TABLESAMPLE SYSTEM keeps or skips whole pages, so the sample statistics are first taken
+# per page (partitions have their own page numbers, hence tableoid) and then summed, with
+# the sums of squares and products approximate_metrics needs for the between-page variance.
+# {m} is the metric's per-page column; ratio pages with a zero denominator are not counted.
+SAMPLE_PAGE = "tableoid, (ctid::text::point)[0]"
+SAMPLE_TOTALS = {
+    "count": "ARRAY[SUM({m}), SUM({m} * {m})]::float8[]",
+    "pct": ("ARRAY[SUM({m}[1]), SUM({m}[2]), SUM({m}[1] * {m}[1]), SUM({m}[1] * {m}[2]), "
+            "SUM({m}[2] * {m}[2]), COUNT(*) FILTER (WHERE {m}[2] > 0)]"),
+}
+SAMPLE_TOTALS["avg"] = SAMPLE_TOTALS["pct"]
+
+# Degree and university counts in one GROUPING SETS scan; g_degree tells the two sets apart.
+# Rollup bucket keys store NULL as '', which is turned back into NULL here. SQLite has no
+# GROUPING SETS, so it unions the two groupings and sets g_degree itself.
+GROUPED_SELECT = {
+    "applicants": """
+SELECT GROUPING(degree) AS g_degree, degree, llm_generated_university, COUNT(*) AS n
+FROM applicants{where}
+GROUP BY GROUPING SETS ((degree), (llm_generated_university))
+""",
+    "rollup": """
+SELECT GROUPING(degree) AS g_degree,
+       NULLIF(degree, '') AS degree,
+       NULLIF(llm_generated_university, '') AS llm_generated_university,
+       SUM(n)::bigint AS n
+FROM applicant_rollups{where}
+GROUP BY GROUPING SETS ((degree), (llm_generated_university))
+""",
+    "sample": f"""
+SELECT GROUPING(degree) AS g_degree, degree, llm_generated_university,
+       ROUND(COUNT(*) * 100.0 / %(sample_pct)s)::bigint AS n
+FROM {SOURCES["sample"]}{{where}}
+GROUP BY GROUPING SETS ((degree), (llm_generated_university))
+""",
+    "sqlite": """
+SELECT 0 AS g_degree, degree, NULL AS llm_generated_university, COUNT(*) AS n
+FROM applicants{where}
+GROUP BY degree
+UNION ALL
+SELECT 1, NULL, llm_generated_university, COUNT(*)
+FROM applicants{where}
+GROUP BY llm_generated_university
+""",
+}
+
+# One dashboard metric: an aggregate kind, the averaged column (avg only), the filters the
+# metric applies on top of the query's own, and for percentages the filters counted as a share
+Metric = namedtuple("Metric", "kind column where share", defaults=(None, {}, {}))
+
+# The dashboard questions, each expressed as structured filters
+DASHBOARD_METRICS = {
+    "total": Metric("count"),
+    "fall_2025": Metric("count", where={"term": "Fall 2025"}),
+    "pct_international": Metric("pct", share={"citizenship": "internat"}),
+    "avg_gpa_4": Metric("avg", "gpa"),
+    "avg_gre_q": Metric("avg", "gre_q"),
+    "avg_gre_v": Metric("avg", "gre_v"),
+    "avg_gre_aw": Metric("avg", "gre_aw"),
+    "avg_gpa_us_fall25": Metric("avg", "gpa", {"term": "Fall 2025", "citizenship": "American"}),
+    "pct_accept_fall25": Metric("pct", where={"term": "Fall 2025"}, share={"status": "accept"}),
+    "avg_gpa_accept_fall25": Metric("avg", "gpa", {"term": "Fall 2025", "status": "accept"}),
+    "jhu_masters_cs": Metric("count", where={"university": "johns hopkins",
+                                             "program": "computer science", "degree": "master"}),
+    "georgetown_cs_phd": Metric("count", where={"term": "2025", "status": "accept",
+                                                "university": "georgetown",
+                                                "program": "computer science", "degree": "phd"}),
+}
+
+def _like_pattern(value):
+    """
+    Turn a filter value into an ``ILIKE`` substring pattern, escaping ``%`` and ``_``.
+
+    :param value: Text to search for.
+    :type value: str
+    :return: Pattern such as ``%johns hopkins%``.
+    :rtype: str
+    """
+    escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def compile_filters(filters, params):
+    """
+    Compile structured filters to SQL predicates with named placeholders.
+
+    Each distinct value is bound once (``%(p0)s``, ``%(p1)s``, ...) and
+    added to ``params``; no value is ever formatted into the SQL text.
+
+    :param filters: Filter name to value, see :data:`FILTER_COLUMNS` and :data:`DATE_FILTERS`.
+    :type filters: dict[str, Any]
+    :param params: Named parameters collected so far; updated in place.
+    :type params: dict[str, Any]
+    :return: One predicate per filter, to be joined with ``AND``.
+    :rtype: list[str]
+    :raises ValueError: If a filter name is unknown or a date is not ``YYYY-MM-DD``.
+    """
+    predicates = []
+    for name, value in filters.items():
+        if name in FILTER_COLUMNS:
+            column, op, value = FILTER_COLUMNS[name], "ILIKE", _like_pattern(value)
+        elif name in DATE_FILTERS:
+            column, op = "date_added", DATE_FILTERS[name]
+            value = value if isinstance(value, date) else date.fromisoformat(str(value))
+        else:
+            raise ValueError(f"Unknown filter {name!r}; choose from "
+                             f"{sorted(FILTER_COLUMNS) + sorted(DATE_FILTERS)}")
+        key = next((k for k, v in params.items() if v == value), f"p{len(params)}")
+        params[key] = value
+        predicates.append(f"{column} {op} %({key})s")
+    return predicates
+
+def _where(filters, source, params):
+    """
+    Compile the query-wide ``WHERE`` clause for ``source``.
+
+    :param filters: Structured filters.
+    :type filters: dict[str, Any]
+    :param source: ``"applicants"`` or ``"rollup"``.
+    :type source: str
+    :param params: Named parameters; updated in place.
+    :type params: dict[str, Any]
+    :return: ``"\nWHERE ..."``, or ``""`` without filters.
+    :rtype: str
+    :raises ValueError: If date filters are used with the rollup source.
+    """
+    if source == "rollup" and any(name in DATE_FILTERS for name in filters):
+        raise ValueError("Date filters need the applicants source; the rollup has no date_added")
+    predicates = compile_filters(filters, params)
+    return f"\nWHERE {' AND '.join(predicates)}" if predicates else ""
+
+def compile_metrics(filters=None, source="applicants", metrics=DASHBOARD_METRICS):
+    """
+    Compile a metric set into one single-scan ``SELECT``.
+
+    Every metric becomes one aggregate with its own ``FILTER`` clause, so
+    the whole set costs a single pass over ``source``; ``filters`` narrow
+    that pass with a ``WHERE`` clause. For the ``"sample"`` source the
+    aggregates are taken per sampled page and summed (:data:`SAMPLE_TOTALS`).
+
+    :param filters: Structured filters applied to every metric.
+    :type filters: dict[str, Any] | None
+    :param source: ``"applicants"``, ``"rollup"``, ``"sample"`` or ``"sqlite"`` (see :data:`SOURCES`).
+    :type source: str
+    :param metrics: Metric name to :class:`Metric` definition.
+    :type metrics: dict[str, Metric]
+    :return: ``(sql, params)``; the SQL has no trailing semicolon.
+    :rtype: tuple[str, dict[str, Any]]
+    :raises ValueError: On an unknown filter, or date filters with the rollup source.
+    """
+    params = {}
+    where = _where(filters or {}, source, params)
+    lines = []
+    for name, metric in metrics.items():
+        predicates = compile_filters(metric.where, params)
+        f = f" FILTER (WHERE {' AND '.join(predicates)})" if predicates else ""
+        share = " AND ".join(predicates + compile_filters(metric.share, params))
+        aggregate = AGGREGATES[source][metric.kind].format(f=f, share=share, col=metric.column)
+        lines.append(f"  {aggregate} AS {name}")
+    query = "SELECT\n" + ",\n".join(lines) + f"\nFROM {SOURCES[source]}{where}\n"
+    if source == "sample":
+        totals = (f"  {SAMPLE_TOTALS[metric.kind].format(m=name)} AS {name}" for name, metric in metrics.items())
+        query = ("SELECT\n" + ",\n".join(totals) + f"\nFROM ({query}GROUP BY {SAMPLE_PAGE}) AS pages\n")
+    return query, params
+
+def compile_grouped(filters=None, source="applicants"):
+    """
+    Compile the degree/university counts query for ``filters``.
+
+    :param filters: Structured filters.
+    :type filters: dict[str, Any] | None
+    :param source: A key of :data:`GROUPED_SELECT`.
+    :type source: str
+    :return: ``(sql, params)``; the SQL has no ``ORDER BY`` or trailing semicolon.
+    :rtype: tuple[str, dict[str, Any]]
+    """
+    params = {}
+    return GROUPED_SELECT[source].format(where=_where(filters or {}, source, params)), params
+
+# Every scalar dashboard metric in a single scan of applicants, and its bound filter values
+SCALAR_METRICS_SELECT, DASHBOARD_PARAMS = compile_metrics()
+SCALAR_METRICS_SQL = SCALAR_METRICS_SELECT + ";"
+GROUPED_COUNTS_SQL = compile_grouped()[0] + "ORDER BY n DESC;"
+
+# The same metrics derived from the loader's running aggregates: counts are sums of bucket
+# counts, averages are sum / count, so they match the applicants scan exactly
+ROLLUP_METRICS_SELECT = compile_metrics(source="rollup")[0]
+ROLLUP_GROUPED_SELECT = compile_grouped(source="rollup")[0]
+
+# Name of the materialized view holding the precomputed get_results output
+SUMMARY_VIEW = "applicants_summary"
+
+def _inline_params(query, params):
+    """
+    Replace ``%(name)s`` placeholders with quoted literals.
+
+    View definitions cannot take bind parameters, so the dashboard filter
+    values are baked into the materialized view as SQL literals.
+
+    :param query: SQL text with ``%(name)s`` placeholders.
+    :type query: str
+    :param params: Values for the placeholders.
+    :type params: dict[str, str]
+    :return: SQL text with the values inlined.
+    :rtype: str
+    """
+    template = re.sub(r"%\((\w+)\)s", r"{\1}", query)
+    return sql.SQL(template).format(**{k: sql.Literal(v) for k, v in params.items()}).as_string(None)
+
+# One-row materialized view with every dashboard metric; the grouped lists are stored as JSON.
+# It reads the rollup table rather than applicants, so a refresh costs one pass over the
+# buckets whatever the number of rows.
+CREATE_SUMMARY_SQL = f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {SUMMARY_VIEW} AS
+WITH scalars AS ({_inline_params(*compile_metrics(source="rollup"))}),
+grouped AS ({ROLLUP_GROUPED_SELECT})
+SELECT
+  1 AS id,
+  scalars.*,
+  (SELECT COALESCE(json_agg(json_build_object('degree', degree, 'n', n) ORDER BY n DESC), '[]'::json)
+     FROM grouped WHERE g_degree = 0) AS degree_counts,
+  (SELECT COALESCE(json_agg(json_build_object('llm_generated_university', llm_generated_university, 'n', n)
+                            ORDER BY n DESC), '[]'::json)
+     FROM (SELECT * FROM grouped
+           WHERE g_degree = 1 AND llm_generated_university IS NOT NULL
+           ORDER BY n DESC LIMIT 10) AS top) AS top_universities,
+  now() AS refreshed_at
+FROM scalars;
+CREATE UNIQUE INDEX IF NOT EXISTS {SUMMARY_VIEW}_id ON {SUMMARY_VIEW} (id);
+"""
+
+def refresh_summary(cur):
+    """
+    Create the summary materialized view if needed and refresh it.
+
+    Called by the loader at the end of every load, once the rollup table
+    holds the new rows (the view is derived from it). The refresh is
+    ``CONCURRENTLY`` (hence the unique index on ``id``), so dashboard
+    reads keep seeing the previous summary until the new one is ready.
+
+    :param cur: Open cursor on a connection that can see the new rows.
+    :type cur: psycopg.Cursor
+    :return: None
+    :rtype: NoneType
+    """
+    cur.execute(CREATE_SUMMARY_SQL)
+    cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {SUMMARY_VIEW};")
+
+def split_grouped_counts(rows, top_n=10):
+    """
+    Split :data:`GROUPED_COUNTS_SQL` output into the two dashboard lists.
+
+    :param rows: Rows with ``g_degree``, ``degree``, ``llm_generated_university`` and ``n``,
+        ordered by ``n`` descending.
+    :type rows: list[dict]
+    :param top_n: Number of universities to keep.
+    :type top_n: int
+    :return: ``(degree_counts, top_universities)``.
+    :rtype: tuple[list[dict], list[dict]]
+    """
+    degree_counts = [{"degree": r["degree"], "n": r["n"]} for r in rows if r["g_degree"] == 0]
+    top_universities = [
+        {"llm_generated_university": r["llm_generated_university"], "n": r["n"]}
+        for r in rows
+        if r["g_degree"] == 1 and r["llm_generated_university"] is not None
+    ][:top_n]
+    return degree_counts, top_universities
+
+class ResultsCache:
+    """
+    Cache of the :func:`get_results` output keyed by a data-version counter.
+
+    The loader bumps the version (:meth:`bump`) after each committed load,
+    so a cached entry stays valid until the data actually changes and a
+    cache hit never touches the database.
+
+    By default the version and the cached entry live in this process only.
+    With ``cache_dir`` set, both are kept on disk (``data_version`` and
+    ``results_v<N>.json``), so a load run from the command line also
+    invalidates the web workers' cache, and workers share one entry.
+    Entries are plain JSON (never unpickled), so a writable cache
+    directory cannot be used to run code, and files of older versions
+    are removed whenever a newer entry is written.
+
+    Other derived results (e.g. :func:`get_distributions`) are cached
+    under their own ``key`` alongside, and invalidated the same way.
+
+    :param cache_dir: Directory for the shared on-disk cache, or ``None``.
+    :type cache_dir: str | None
+    :param max_entries: Keyed entries kept in memory before the oldest is dropped.
+    :type max_entries: int
+    """
+    def __init__(self, cache_dir=None, max_entries=64):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version = 0
+        self._entries = {}                              # key -> (version, results, stored_at)
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    @staticmethod
+    def _name(version, key):
+        suffix = "" if key is None else "_" + hashlib.md5(repr(key).encode()).hexdigest()[:12]
+        return f"results_v{version}{suffix}.json"
+
+    @staticmethod
+    def _encode(value):
+        """JSON fallback for the non-JSON values results hold (``numeric`` columns and dates)."""
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, date):
+            return value.isoformat()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    def _prune(self, version):
+        """Remove the on-disk entries of versions before ``version``."""
+        for name in os.listdir(self.cache_dir):
+            m = re.match(r"results_v(\d+)", name)
+            if m and int(m.group(1)) < version:
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:               # Pruned by another process first
+                    pass
+
+    def _write(self, name, data):
+        tmp = self._path(f"{name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, self._path(name))               # Atomic, so readers never see half a file
+
+    @property
+    def version(self):
+        """Current data version (``0`` until the first load)."""
+        if not self.cache_dir:
+            return self._version
+        try:
+            with open(self._path("data_version"), encoding="utf-8") as fh:
+                return int(fh.read())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self):
+        """
+        Advance the data version, invalidating the cached results.
+
+        :return: The new version.
+        :rtype: int
+        """
+        with self._lock:
+            version = self.version + 1
+            if self.cache_dir:
+                self._write("data_version", str(version).encode())
+            self._version = version
+        return version
+
+    def invalidate(self):
+        """Drop the cached entry so the next read recomputes it."""
+        with self._lock:
+            self._entries.clear()
+            if self.cache_dir:
+                for name in os.listdir(self.cache_dir):
+                    if name.startswith("results_v"):
+                        os.remove(self._path(name))
+
+    def _load(self, version, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry
+        if self.cache_dir:
+            try:
+                with open(self._path(self._name(version, key)), encoding="utf-8") as fh:
+                    self._store(key, tuple(json.load(fh)))
+                return self._entries[key]
+            except FileNotFoundError:
+                pass
+        return None
+
+    def _store(self, key, entry):
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            oldest = min((k for k in self._entries if k is not None), key=lambda k: self._entries[k][2])
+            del self._entries[oldest]
+
+    def get(self, compute, key=None):
+        """
+        Return the cached results for the current version, or compute them.
+
+        The version is read before ``compute`` runs, so results computed
+        while a load commits are stored under the older version and
+        replaced on the next read.
+
+        :param compute: Zero-argument function returning fresh results.
+        :type compute: Callable[[], dict]
+        :param key: Hashable key of a derived result, or ``None`` for the dashboard results.
+        :type key: Hashable | None
+        :return: Cached or freshly computed results.
+        :rtype: dict[str, Any]
+        """
+        version = self.version
+        with self._lock:
+            entry = self._load(version, key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        results = compute()
+        entry = (version, results, time.time())
+        with self._lock:
+            self._store(key, entry)
+            if self.cache_dir:
+                self._write(self._name(version, key), json.dumps(entry, default=self._encode).encode())
+                self._prune(version)
+        return results
+
+    def stats(self):
+        """
+        Report cache counters for the page footer and stats endpoint.
+
+        :return: Version, hit/miss counts, the number of cached entries and
+            the age of the dashboard entry in seconds (``None`` when it is
+            not cached).
+        :rtype: dict[str, Any]
+        """
+        entry = self._entries.get(None)
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "age_seconds": round(time.time() - entry[2], 1) if entry else None,
+            "shared": bool(self.cache_dir),
+        }
+
+RESULTS_CACHE = ResultsCache(RESULTS_CACHE_DIR)
+
 def get_results():
     """
-    Run a series of predefined queries against the applicants database.
+    Run the dashboard queries against the applicants database.
 
-    This function executes multiple queries to calculate statistics about
-    applicants, such as counts, averages, acceptance rates, and top
-    universities. Results are returned as a dictionary for use in the
-    Flask application.
+    This function calculates statistics about applicants, such as counts,
+    averages, acceptance rates, and top universities. Results are returned
+    as a dictionary for use in the Flask application.
 
-    The queries include:
+    The metrics include:
       - Total applicants
       - Fall 2025 applicant count
       - Percentage of international students
@@ -66,107 +1008,390 @@ def get_results():
       - Degree distribution
       - Top 10 universities by applicant count
 
+    Results are read from the :data:`SUMMARY_VIEW` materialized view,
+    which the loader refreshes after each load, so a page render is a
+    single-row lookup whatever the table size. If the view has not been
+    created yet, the metrics are computed live by :func:`compute_results`.
+
+    That row is itself cached in :data:`RESULTS_CACHE` until the next
+    load bumps the data version, so repeat renders skip the database.
+
     :return: Dictionary mapping query names to results.
     :rtype: dict[str, Any]
     """
-    results = {}
-
-    results["total"] = sql_query("SELECT COUNT(*) AS total FROM applicants;")[0]["total"]
-
-    # Question 1: Query to determine the number of applicants for the fall 2025 semester
-    q1 = sql_query("SELECT COUNT(*) AS n FROM applicants WHERE term ILIKE %s;", "%Fall 2025%")
-    results["fall_2025"] = q1[0]["n"]
-
-    # Question 2: Query to determine number of applicants who were international students (NOT american and NOT other) to 2 decimals
-    q2 = sql_query("""
-        SELECT ROUND(
-            100.0 * COUNT(*) FILTER (WHERE us_or_international ILIKE %s)
-            / NULLIF(COUNT(*), 0), 2
-        ) AS pct_international
-        FROM applicants;
-    """, "%internat%")
-    results["pct_international"] = q2[0]["pct_international"]
-
-    # Question 3: Query to find the average of GPA, GRE_q, GRE_V, GRE AW scores
-    q3 = sql_query("""
-        SELECT
-          ROUND(AVG(gpa)::numeric, 3)    AS avg_gpa_4,
-          ROUND(AVG(gre_q)::numeric, 3)  AS avg_gre_q,
-          ROUND(AVG(gre_v)::numeric, 3)  AS avg_gre_v,
-          ROUND(AVG(gre_aw)::numeric, 3) AS avg_gre_aw
-        FROM applicants;
-    """)
-    results["avg_gpa_4"]  = q3[0]["avg_gpa_4"]
-    results["avg_gre_q"]  = q3[0]["avg_gre_q"]
-    results["avg_gre_v"]  = q3[0]["avg_gre_v"]
-    results["avg_gre_aw"] = q3[0]["avg_gre_aw"]
-
-    # Question 4: Query to find the average GPA of students for the fall 2025 semester
-    q4 = sql_query("""
-        SELECT ROUND(AVG(gpa)::numeric, 3) AS avg_gpa_us_fall25
-        FROM applicants
-        WHERE term ILIKE %s
-          AND us_or_international ILIKE %s;
-    """, "%Fall 2025%", "%American%")
-    results["avg_gpa_us_fall25"] = q4[0]["avg_gpa_us_fall25"]
-
-    # Question 5: Query to determine percentage (to 2 decimal places) of students from fall 2025 semester were accepted
-    q5 = sql_query(
-        "SELECT ROUND(100.0 * AVG(CASE WHEN status ILIKE %s THEN 1 ELSE 0 END), 2) "
-        "AS pct_accept_fall25 FROM applicants WHERE term ILIKE %s;",
-        "%accept%", "%Fall 2025%"
-    )
-    results["pct_accept_fall25"] = q5[0]["pct_accept_fall25"]
+    return RESULTS_CACHE.get(read_results)
 
-    # Question 6: Query to determine average gpa of applicants who were accepted in fall 2025    
-    q6 = sql_query(
-        "SELECT ROUND(AVG(gpa)::numeric, 3) AS avg_gpa_accept_fall25 "
-        "FROM applicants WHERE term ILIKE %s AND status ILIKE %s;",
-        "%Fall 2025%", "%accept%"
-    )
-    results["avg_gpa_accept_fall25"] = q6[0]["avg_gpa_accept_fall25"]
-
-    # Question 7: Query to determine number of applicants for jhu computer science
-    q7 = sql_query(
-        "SELECT COUNT(*) AS n FROM applicants "
-        "WHERE llm_generated_university ILIKE %s AND llm_generated_program ILIKE %s "
-        "AND degree ILIKE %s;",
-        "%johns hopkins%", "%computer science%", "%master%"
-    )
-    results["jhu_masters_cs"] = q7[0]["n"]
-
-    # Question 8: Query to determine acceptances at georgetown university for phd in computer science
-    q8 = sql_query(
-        "SELECT COUNT(*) AS n FROM applicants "
-        "WHERE term ILIKE %s AND status ILIKE %s "
-        "AND llm_generated_university ILIKE %s "
-        "AND llm_generated_program ILIKE %s AND degree ILIKE %s;",
-        "%2025%", "%accept%", "%georgetown%", "%computer science%", "%phd%"
-    )
-    results["georgetown_cs_phd"] = q8[0]["n"]
-
-    # Custom question 9: Most common applicant degree type
-    q9 = sql_query("""
-        SELECT degree, COUNT(*) AS n
-        FROM applicants
-        GROUP BY degree
-        ORDER BY n DESC;
-    """)
-    results["degree_counts"] = [dict(r) for r in q9]
-
-    # Custom question 10: Top 10 most common universities and the number of applicants
-    q10 = sql_query("""
-        SELECT llm_generated_university, COUNT(*) AS n
-        FROM applicants
-        WHERE llm_generated_university IS NOT NULL
-        GROUP BY llm_generated_university
-        ORDER BY n DESC
-        LIMIT 10;
-    """)
-    results["top_universities"] = [dict(r) for r in q10]
+def read_results():
+    """
+    Read the dashboard metrics from the database, bypassing the cache.
+
+    :return: Dictionary mapping query names to results.
+    :rtype: dict[str, Any]
+    """
+    if ANALYTICS_BACKEND == "sqlite":
+        return SQLITE.query_metrics()
 
+    def read_summary(conn):
+        try:
+            row = sql_query(f"SELECT * FROM {SUMMARY_VIEW};", conn=conn)[0]
+        except errors.UndefinedTable:
+            conn.rollback()                             # Clear the failed statement before querying live
+            return None if PARALLEL_METRICS else compute_results(conn)
+        row.pop("id")
+        return row
+
+    results = run_read(read_summary, fresh=True)       # Cached per data version, see run_read
+    if results is None:
+        return compute_results()                        # Connection released; statements run concurrently
     return results
 
+def compute_results(conn=None):
+    """
+    Compute the dashboard metrics live from ``applicants``.
+
+    Only two statements are issued: all scalar metrics come from a single
+    scan using ``FILTER`` clauses (:data:`SCALAR_METRICS_SQL`), and both
+    grouped lists come from one ``GROUPING SETS`` scan
+    (:data:`GROUPED_COUNTS_SQL`).
+
+    The results are cached per data version, so a read replica is only
+    used once it has caught up with the primary (``fresh``, see
+    :func:`run_read`).
+
+    :param conn: Checked-out database connection, or ``None`` to borrow
+        from the pool (concurrently, see :data:`PARALLEL_METRICS`).
+    :type conn: psycopg.Connection | None
+    :return: Dictionary mapping query names to results.
+    :rtype: dict[str, Any]
+    """
+    return query_metrics(conn=conn, source="applicants", fresh=True)
+
+def query_metrics(filters=None, conn=None, source=None, parallel=None, fresh=False):
+    """
+    Compute the dashboard metric set for the applicants matching ``filters``.
+
+    ``{"university": "stanford", "term": "Fall 2025"}`` returns the same
+    keys as :func:`get_results`, restricted to those applicants. The
+    queries are compiled by :func:`compile_metrics` and
+    :func:`compile_grouped`, run as prepared statements, and take two
+    statements whatever the filters.
+
+    Without an explicit ``source`` the rollup table is used unless a date
+    filter needs the raw rows; if the rollup does not exist yet the query
+    falls back to ``applicants``.
+
+    Without ``conn`` the two statements run concurrently, each on its own
+    pooled connection, so the call takes about as long as the slower of
+    the two. ``parallel=False`` (or ``PARALLEL_METRICS=0``) runs them in
+    turn on one connection instead; with ``conn`` they always run in turn.
+
+    With ``ANALYTICS_BACKEND=sqlite`` the metrics come from
+    :data:`SQLITE` instead and ``conn``, ``source`` and ``parallel`` are ignored.
+
+    :param filters: Structured filters, see :data:`FILTER_COLUMNS` and :data:`DATE_FILTERS`.
+    :type filters: dict[str, Any] | None
+    :param conn: Checked-out connection; one is borrowed from the pool if omitted.
+    :type conn: psycopg.Connection | None
+    :param source: ``"applicants"``, ``"rollup"`` or ``None`` to choose automatically.
+    :type source: str | None
+    :param parallel: Run the statements concurrently when no ``conn`` is
+        given; ``None`` uses :data:`PARALLEL_METRICS`.
+    :type parallel: bool | None
+    :param fresh: Only read from a replica that has caught up with the
+        primary (see :func:`run_read`).
+    :type fresh: bool
+    :return: Dictionary mapping metric names to results.
+    :rtype: dict[str, Any]
+    :raises ValueError: On an unknown filter name.
+    """
+    filters = dict(filters or {})
+    if ANALYTICS_BACKEND == "sqlite":
+        return SQLITE.query_metrics(filters)
+    if parallel is None:
+        parallel = PARALLEL_METRICS
+    if conn is None and not parallel:
+        return run_read(lambda conn: query_metrics(filters, conn=conn, source=source), fresh=fresh)
+
+    if source is None:
+        if any(name in DATE_FILTERS for name in filters):
+            source = "applicants"
+        else:
+            try:
+                return query_metrics(filters, conn=conn, source="rollup", parallel=parallel, fresh=fresh)
+            except errors.UndefinedTable:
+                if conn is not None:
+                    conn.rollback()                     # Rollup not created yet
+                source = "applicants"
+
+    scalar_sql, scalar_params = compile_metrics(filters, source)
+    grouped_sql, grouped_params = compile_grouped(filters, source)
+    statements = [(scalar_sql + ";", scalar_params), (grouped_sql + "ORDER BY n DESC;", grouped_params)]
+    scalar, grouped = run_statements(statements, conn, fresh)
+
+    results = dict(scalar[0])
+    results["degree_counts"], results["top_universities"] = split_grouped_counts(grouped)
+
+    return results
+
+def run_statements(statements, conn=None, fresh=False):
+    """
+    Run independent statements as prepared statements.
+
+    On ``conn`` they run one after another; without it they run at the
+    same time, each on its own connection from :func:`run_read`.
+
+    :param statements: ``(sql, params)`` pairs.
+    :type statements: list[tuple[str, Any]]
+    :param conn: Checked-out connection, or ``None`` to run concurrently.
+    :type conn: psycopg.Connection | None
+    :param fresh: Passed to :func:`run_read`.
+    :type fresh: bool
+    :return: The rows of each statement, in the order given.
+    :rtype: list[list[dict]]
+    :raises Exception: The first statement's error, if any statement fails.
+    """
+    if conn is not None:
+        return [sql_query(query, params, conn=conn, prepare=True) for query, params in statements]
+
+    def run(query, params):
+        return run_read(lambda conn: read_query(query, params, conn), fresh=fresh)
+
+    with ThreadPoolExecutor(max_workers=len(statements), thread_name_prefix="query") as pool:
+        futures = [pool.submit(run, query, params) for query, params in statements]
+        return [f.result() for f in futures]
+
+def to_sqlite(query, params):
+    """
+    Translate a compiled PostgreSQL statement to SQLite.
+
+    ``ILIKE`` becomes ``LIKE`` with the same backslash escape (SQLite's
+    ``LIKE`` ignores case for ASCII letters), ``%(name)s`` placeholders
+    become ``:name``, and dates are bound as ISO strings, the form the
+    SQLite copy stores them in.
+
+    :param query: SQL built by :func:`compile_metrics` or :func:`compile_grouped`.
+    :type query: str
+    :param params: Named parameters.
+    :type params: dict[str, Any]
+    :return: ``(sql, params)`` for :mod:`sqlite3`.
+    :rtype: tuple[str, dict[str, Any]]
+    """
+    query = re.sub(r"ILIKE (%\(\w+\)s)", r"LIKE \1 ESCAPE '\\'", query)
+    query = re.sub(r"%\((\w+)\)s", r":\1", query)
+    return query, {k: v.isoformat() if isinstance(v, date) else v for k, v in params.items()}
+
+class SQLiteBackend:
+    """
+    Dashboard metrics from an embedded SQLite copy of ``applicants``.
+
+    For deployments without a PostgreSQL server: the loader writes rows
+    into one local file (:func:`load_data.load_sqlite`), or copies a
+    snapshot of the PostgreSQL table there (:func:`load_data.snapshot_sqlite`).
+    The same compiled metric statements then run in-process with
+    no network round trips. Only the dashboard metrics and the scraper's
+    duplicate check are served this way; search, trends, distributions,
+    approximate metrics and export still need PostgreSQL.
+
+    :param path: SQLite database file.
+    :type path: str
+    """
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def connect(self):
+        """
+        Open the database file for the duration of a ``with`` block.
+
+        :yield: Connection returning rows as :class:`sqlite3.Row`.
+        :rtype: sqlite3.Connection
+        """
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def query(self, query, params=None, conn=None):
+        """
+        Run a PostgreSQL-dialect statement (see :func:`to_sqlite`).
+
+        :param query: SQL with ``%(name)s`` placeholders.
+        :type query: str
+        :param params: Named parameters.
+        :type params: dict[str, Any] | None
+        :param conn: Open connection; the file is opened if omitted.
+        :type conn: sqlite3.Connection | None
+        :return: Rows as dictionaries.
+        :rtype: list[dict]
+        """
+        if conn is None:
+            with self.connect() as conn:
+                return self.query(query, params, conn)
+        query, params = to_sqlite(query, params or {})
+        return [dict(row) for row in conn.execute(query, params)]
+
+    def query_metrics(self, filters=None):
+        """
+        Compute the dashboard metric set for ``filters``, as :func:`query_metrics` does.
+
+        :param filters: Structured filters, see :data:`FILTER_COLUMNS` and :data:`DATE_FILTERS`.
+        :type filters: dict[str, Any] | None
+        :return: Dictionary mapping metric names to results.
+        :rtype: dict[str, Any]
+        :raises ValueError: On an unknown filter name.
+        """
+        scalar_sql, scalar_params = compile_metrics(filters, "sqlite")
+        grouped_sql, grouped_params = compile_grouped(filters, "sqlite")
+        with self.connect() as conn:
+            results = self.query(scalar_sql + ";", scalar_params, conn)[0]
+            grouped = self.query(grouped_sql + "ORDER BY n DESC;", grouped_params, conn)
+        results["degree_counts"], results["top_universities"] = split_grouped_counts(grouped)
+        return results
+
+    def url_exists(self, url):
+        """
+        Check the SQLite copy for an applicant URL.
+
+        :param url: Applicant URL to check.
+        :type url: str
+        :return: ``True`` if the URL is present.
+        :rtype: bool
+        """
+        return bool(self.query("SELECT 1 FROM applicants WHERE url = %(url)s LIMIT 1;", {"url": url}))
+
+    def urls_existing(self, urls):
+        """
+        Check the SQLite copy for several applicant URLs at once.
+
+        :param urls: Applicant URLs to check.
+        :type urls: Sequence[str]
+        :return: The URLs that are present.
+        :rtype: set[str]
+        """
+        params = {f"u{i}": url for i, url in enumerate(urls)}
+        placeholders = ", ".join(f"%({k})s" for k in params)
+        return {row["url"] for row in self.query(f"SELECT url FROM applicants WHERE url IN ({placeholders});", params)}
+
+SQLITE = SQLiteBackend(SQLITE_PATH)
+
+# Default sample size, in percent of applicants' pages, for approximate_metrics
+APPROX_SAMPLE_PCT = float(os.getenv("APPROX_SAMPLE_PCT", "1"))
+
+def _estimate(kind, value, fraction, z):
+    """
+    Turn one metric's page-sample sums into ``(estimate, low, high)``.
+
+    ``TABLESAMPLE SYSTEM`` keeps each page independently with probability
+    ``fraction``, so the variance comes from how much the sampled pages
+    differ, not from a per-row model; rows stored together (e.g. one
+    load's rows) are not counted as independent evidence.
+
+    - ``count``: ``[sum y, sum y²]`` over sampled pages; the estimate is
+      ``sum y / fraction`` with variance ``(1 - fraction) / fraction² · sum y²``.
+    - ``pct`` and ``avg``: ``[sum y, sum x, sum y², sum xy, sum x², pages]``
+      for the ratio ``y / x`` (matching rows over rows, or column sum over
+      non-null count); the variance is linearised through the residuals
+      ``y - R·x`` of the sampled pages. With fewer than two pages holding
+      matching rows there is no interval.
+
+    :param kind: Aggregate kind of the metric.
+    :type kind: str
+    :param value: The summed sample statistics returned for the metric.
+    :type value: list
+    :param fraction: Sampled fraction of the table's pages (0-1].
+    :type fraction: float
+    :param z: Standard normal quantile for the confidence level.
+    :type z: float
+    :return: Point estimate and interval bounds; ``None`` where the sample
+        holds too few matching rows.
+    :rtype: tuple
+    """
+    if kind == "count":
+        total, squares = (v or 0 for v in value)
+        estimate = total / fraction
+        half = z * math.sqrt((1 - fraction) * squares) / fraction
+        return round(estimate), max(0, math.floor(estimate - half)), math.ceil(estimate + half)
+    sy, sx, syy, sxy, sxx, pages = (v or 0 for v in value)
+    if not sx:
+        return None, None, None
+    ratio = sy / sx
+    scale, digits = (100, 2) if kind == "pct" else (1, 3)
+    if pages < 2:
+        return round(scale * ratio, digits), None, None
+    residuals = max(0.0, syy - 2 * ratio * sxy + ratio * ratio * sxx)
+    half = z * math.sqrt((1 - fraction) * residuals) / sx
+    low, high = ratio - half, ratio + half
+    if kind == "pct":
+        low, high = max(0.0, low), min(1.0, high)
+    return round(scale * ratio, digits), round(scale * low, digits), round(scale * high, digits)
+
+def approximate_metrics(filters=None, sample_pct=APPROX_SAMPLE_PCT, seed=None, confidence=0.95,
+                        conn=None, parallel=None):
+    """
+    Estimate the dashboard metric set from a block sample of ``applicants``.
+
+    The same metrics as :func:`query_metrics` are computed over
+    ``applicants TABLESAMPLE SYSTEM (sample_pct)``, which reads only that
+    share of the table's pages, so the cost shrinks with the sample.
+    Counts (including the degree and university counts) are scaled up by
+    the sampling fraction, and every scalar metric gets a confidence
+    interval in ``"intervals"``.
+
+    ``SYSTEM`` sampling keeps or skips whole pages, so the intervals are
+    computed from the variation between sampled pages (:func:`_estimate`)
+    and stay honest when similar rows sit together on disk.
+
+    :param filters: Structured filters, see :data:`FILTER_COLUMNS` and :data:`DATE_FILTERS`.
+    :type filters: dict[str, Any] | None
+    :param sample_pct: Percentage of the table's pages to read, in (0, 100].
+    :type sample_pct: float
+    :param seed: ``REPEATABLE`` seed; a random one is chosen (and
+        reported) if omitted, so any answer can be reproduced.
+    :type seed: int | None
+    :param confidence: Confidence level of the intervals.
+    :type confidence: float
+    :param conn: Checked-out connection; one is borrowed from the pool if omitted.
+    :type conn: psycopg.Connection | None
+    :param parallel: As for :func:`query_metrics`.
+    :type parallel: bool | None
+    :return: The :func:`query_metrics` keys holding estimates, plus
+        ``"intervals"`` (metric name to ``[low, high]``) and ``"sample"``
+        (percent, seed and confidence).
+    :rtype: dict[str, Any]
+    :raises ValueError: On an unknown filter, or a sample size or confidence out of range.
+    """
+    if not 0 < sample_pct <= 100:
+        raise ValueError(f"sample_pct must be in (0, 100], got {sample_pct}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be in (0, 1), got {confidence}")
+    if parallel is None:
+        parallel = PARALLEL_METRICS
+    if conn is None and not parallel:
+        return run_read(lambda conn: approximate_metrics(filters, sample_pct, seed, confidence, conn=conn))
+
+    filters = dict(filters or {})
+    sample = {"sample_pct": sample_pct, "sample_seed": random.randrange(2**31) if seed is None else seed}
+    scalar_sql, scalar_params = compile_metrics(filters, "sample")
+    grouped_sql, grouped_params = compile_grouped(filters, "sample")
+    scalar, grouped = run_statements([(scalar_sql + ";", {**scalar_params, **sample}),
+                                      (grouped_sql + "ORDER BY n DESC;", {**grouped_params, **sample})], conn)
+
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    results, intervals = {}, {}
+    for name, metric in DASHBOARD_METRICS.items():
+        results[name], low, high = _estimate(metric.kind, scalar[0][name], sample_pct / 100, z)
+        intervals[name] = [low, high]
+    results["degree_counts"], results["top_universities"] = split_grouped_counts(grouped)
+    results["intervals"] = intervals
+    results["sample"] = {"percent": sample_pct, "seed": sample["sample_seed"], "confidence": confidence}
+    return results
+
+# The scraper's duplicate check, once per scraped result; psycopg prepares it on a pooled
+# connection after a few runs (prepare_threshold), so later checks skip parsing and planning
+URL_EXISTS_SQL = "SELECT 1 FROM applicants WHERE url = %s LIMIT 1;"
+
 def url_exists_in_db(url):
     """
     Check if a given applicant URL already exists in the database.
@@ -179,111 +1404,958 @@ def url_exists_in_db(url):
     :return: ``True`` if the URL exists in the database, ``False`` otherwise.
     :rtype: bool
     """
-    result = sql_query("SELECT 1 FROM applicants WHERE url = %s LIMIT 1;", url) 
+    if ANALYTICS_BACKEND == "sqlite":
+        return SQLITE.url_exists(url)
+    result = sql_query(URL_EXISTS_SQL, url)
     return len(result) > 0
 
-def main():
+# The scraper's batched duplicate check: one statement per page of results
+URLS_EXISTING_SQL = "SELECT url FROM applicants WHERE url = ANY(%s);"
+URL_CACHE_SIZE = int(os.getenv("URL_CACHE_SIZE", "10000"))
+SQLITE_MAX_VARIABLES = 500
+
+class UrlCache:
     """
-    Run queries and print results to the console.
+    Bounded LRU of recent :func:`urls_existing` answers.
 
-    Executes the same queries as :func:`get_results`, but prints the
-    results in a human-readable format instead of returning them. This
-    function is primarily intended for debugging and manual inspection.
+    Applicants are only ever added, so a URL found in the table stays
+    found; a URL found missing may be loaded at any time, so negative
+    answers are dropped whenever the data version of
+    :data:`RESULTS_CACHE` moves on (the loader bumps it after each commit).
 
-    :return: None
-    :rtype: NoneType
+    :param max_entries: URLs remembered before the least recently used is dropped.
+    :type max_entries: int
+    """
+    def __init__(self, max_entries=URL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._entries = OrderedDict()                   # url -> exists, least recently used first
+        self._lock = threading.Lock()
+
+    def _sync(self, version):
+        if version != self._version:
+            for url in [u for u, exists in self._entries.items() if not exists]:
+                del self._entries[url]
+            self._version = version
+
+    def lookup(self, urls, version):
+        """
+        Split ``urls`` into the cached answers and the URLs still to check.
+
+        :param urls: Distinct URLs.
+        :type urls: Iterable[str]
+        :param version: Current data version.
+        :type version: int
+        :return: ``(known, missing)``: cached URLs that exist, and URLs with no cached answer.
+        :rtype: tuple[set[str], list[str]]
+        """
+        known, missing = set(), []
+        with self._lock:
+            self._sync(version)
+            for url in urls:
+                if url in self._entries:
+                    self._entries.move_to_end(url)
+                    self.hits += 1
+                    if self._entries[url]:
+                        known.add(url)
+                else:
+                    self.misses += 1
+                    missing.append(url)
+        return known, missing
+
+    def store(self, answers, version):
+        """
+        Remember fresh answers read at data version ``version``.
+
+        :param answers: URL -> whether it exists.
+        :type answers: dict[str, bool]
+        :param version: Data version the answers were read at.
+        :type version: int
+        """
+        with self._lock:
+            self._sync(version)
+            self._entries.update(answers)
+            for url in answers:
+                self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Size and hit/miss counts of the cache.
+
+        :rtype: dict[str, int]
+        """
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+URL_CACHE = UrlCache()
+
+def urls_existing(urls):
+    """
+    Which of ``urls`` are already in the database, in one query per batch.
+
+    Answers are served from :data:`URL_CACHE` where possible; the rest
+    are resolved together with ``url = ANY(...)`` (chunks of
+    :data:`SQLITE_MAX_VARIABLES` on the SQLite backend) and cached.
+
+    :param urls: Applicant URLs to check; duplicates and empty strings are ignored.
+    :type urls: Iterable[str]
+    :return: The subset of ``urls`` present in the database.
+    :rtype: set[str]
+    """
+    version = RESULTS_CACHE.version                     # Read before querying, so no load is missed
+    known, missing = URL_CACHE.lookup(dict.fromkeys(u for u in urls if u), version)
+    if not missing:
+        return known
+    if ANALYTICS_BACKEND == "sqlite":
+        found = set()
+        for i in range(0, len(missing), SQLITE_MAX_VARIABLES):
+            found |= SQLITE.urls_existing(missing[i:i + SQLITE_MAX_VARIABLES])
+    else:
+        found = {row["url"] for row in sql_query(URLS_EXISTING_SQL, missing)}
+    URL_CACHE.store({url: url in found for url in missing}, version)
+    return known | found
+
+# Text search configuration shared with the loader's generated search_tsv column
+SEARCH_CONFIG = "english"
+SEARCH_MAX_PAGE_SIZE = 100
+
+# Ranked full-text hits over program and comments. The GIN index on search_tsv finds the
+# matches; only the rows of the requested page get a highlighted snippet.
+SEARCH_SQL = f"""
+WITH hits AS (
+  SELECT p_id, url, program, comments, term, status, degree, llm_generated_university, date_added,
+         ts_rank_cd(search_tsv, query) AS rank
+  FROM applicants, websearch_to_tsquery('{SEARCH_CONFIG}', %(q)s) AS query
+  WHERE search_tsv @@ query{{filters}}
+  ORDER BY rank DESC, p_id
+  LIMIT %(limit)s OFFSET %(offset)s
+)
+SELECT p_id, url, program, term, status, degree, llm_generated_university, date_added, rank,
+       ts_headline('{SEARCH_CONFIG}', COALESCE(comments, ''), websearch_to_tsquery('{SEARCH_CONFIG}', %(q)s),
+                   'MaxFragments=2, MaxWords=20, MinWords=5') AS snippet
+FROM hits
+ORDER BY rank DESC, p_id;
+"""
+
+def search(q, page=1, page_size=20, filters=None, conn=None):
+    """
+    Full-text search over applicant programs and comments.
+
+    ``q`` uses web-search syntax (``"machine learning" -phd``, ``or``).
+    Hits are ranked with ``ts_rank_cd`` (program matches weigh more than
+    comments) and paginated; ``filters`` narrow the hits with the same
+    structured filters as :func:`query_metrics`.
+
+    :param q: Search text.
+    :type q: str
+    :param page: 1-based page number.
+    :type page: int
+    :param page_size: Hits per page, at most :data:`SEARCH_MAX_PAGE_SIZE`.
+    :type page_size: int
+    :param filters: Structured filters, see :func:`compile_filters`.
+    :type filters: dict[str, Any] | None
+    :param conn: Checked-out connection; one is borrowed from the pool if omitted.
+    :type conn: psycopg.Connection | None
+    :return: ``q``, ``page``, ``page_size``, ``has_more`` and the ``hits``
+        (each with its ``rank`` and a highlighted ``snippet``).
+    :rtype: dict[str, Any]
+    :raises ValueError: On an empty query, a bad page or page size, or an unknown filter.
+    """
+    if not q or not q.strip():
+        raise ValueError("Search text must not be empty")
+    if page < 1 or not 1 <= page_size <= SEARCH_MAX_PAGE_SIZE:
+        raise ValueError(f"page must be >= 1 and page_size between 1 and {SEARCH_MAX_PAGE_SIZE}")
+
+    params = {}
+    predicates = compile_filters(filters or {}, params)
+    query = SEARCH_SQL.format(filters="".join(f" AND {p}" for p in predicates))
+    params.update(q=q, limit=page_size + 1, offset=(page - 1) * page_size)     # One extra row tells if there is a next page
+
+    rows = read_query(query, params, conn)
+    return {"q": q, "page": page, "page_size": page_size,
+            "has_more": len(rows) > page_size, "hits": rows[:page_size]}
+
+# Columns /api/applicants may return; p_id and date_added are always included (they form the cursor)
+BROWSE_COLUMNS = [
+    "p_id", "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre_q", "gre_v", "gre_aw", "degree",
+    "llm_generated_program", "llm_generated_university",
+]
+BROWSE_MAX_LIMIT = 500
+
+# Keyset order: newest first, undated rows last. The loader indexes this exact expression
+# (load_data.CREATE_BROWSE_INDEX_SQL), so each page is an index range scan.
+BROWSE_SORT_KEY = "COALESCE(date_added, '-infinity'::date)"
+
+BROWSE_SQL = f"""
+SELECT {{columns}}
+FROM applicants
+WHERE TRUE{{after}}{{filters}}
+ORDER BY {BROWSE_SORT_KEY} DESC, p_id DESC
+LIMIT %(limit)s;
+"""
+
+def encode_cursor(row):
+    """
+    Build the opaque ``after`` token pointing just past ``row``.
+
+    :param row: Last row of a page (needs ``date_added`` and ``p_id``).
+    :type row: dict
+    :return: URL-safe token.
+    :rtype: str
+    """
+    key = [row["date_added"].isoformat() if row["date_added"] else "-infinity", row["p_id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(token):
+    """
+    Decode an ``after`` token from :func:`encode_cursor`.
+
+    :param token: Token from a previous page's ``next``.
+    :type token: str
+    :return: ``(date_added, p_id)`` with the date as ISO text or ``-infinity``.
+    :rtype: tuple[str, int]
+    :raises ValueError: If the token is malformed.
+    """
+    try:
+        day, p_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if day != "-infinity":
+            date.fromisoformat(day)
+        return day, int(p_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor {token!r}") from e
+
+def browse_applicants(after=None, limit=50, fields=None, filters=None, conn=None):
+    """
+    Page through applicant rows with keyset (seek) pagination.
+
+    Rows come newest first by ``(date_added, p_id)``. Instead of an
+    ``OFFSET``, each page starts right after the previous page's last
+    key, so every page costs the same however deep the client goes.
+
+    :param after: ``next`` token from the previous page, ``None`` for the first page.
+    :type after: str | None
+    :param limit: Rows per page, at most :data:`BROWSE_MAX_LIMIT`.
+    :type limit: int
+    :param fields: Columns to return (subset of :data:`BROWSE_COLUMNS`); all by default.
+    :type fields: list[str] | None
+    :param filters: Structured filters, see :func:`compile_filters`.
+    :type filters: dict[str, Any] | None
+    :param conn: Checked-out connection; one is borrowed from the pool if omitted.
+    :type conn: psycopg.Connection | None
+    :return: ``rows`` and the ``next`` token (``None`` on the last page).
+    :rtype: dict[str, Any]
+    :raises ValueError: On a bad limit, unknown field or filter, or malformed cursor.
+    """
+    if not 1 <= limit <= BROWSE_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {BROWSE_MAX_LIMIT}")
+    fields = list(fields or BROWSE_COLUMNS)
+    unknown = sorted(set(fields) - set(BROWSE_COLUMNS))
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}; choose from {BROWSE_COLUMNS}")
+    columns = ["p_id", "date_added"] + [f for f in fields if f not in ("p_id", "date_added")]
+
+    params = {}
+    predicates = compile_filters(filters or {}, params)
+    after_sql = ""
+    if after:
+        params["after_date"], params["after_id"] = decode_cursor(after)
+        after_sql = f" AND ({BROWSE_SORT_KEY}, p_id) < (%(after_date)s::date, %(after_id)s)"
+    params["limit"] = limit + 1                         # One extra row tells if there is a next page
+
+    query = BROWSE_SQL.format(columns=", ".join(columns), after=after_sql,
+                              filters="".join(f" AND {p}" for p in predicates))
+    rows = read_query(query, params, conn)
+    page = rows[:limit]
+    return {"rows": page, "next": encode_cursor(page[-1]) if len(rows) > limit else None}
+
+# Weekly time-series rollup kept by the loader (load_data.CREATE_WEEKLY_ROLLUP_SQL): one row
+# per (week, degree, university) with the number of applications and of each decision.
+# TREND_STATUSES maps each decision column to the status substring it counts.
+TREND_TABLE = "applicant_weekly"
+TREND_STATUSES = {"accepted": "accept", "rejected": "reject", "waitlisted": "wait"}
+TREND_INTERVALS = ("week", "month", "quarter", "year")
+TREND_GROUPS = {"degree": "degree", "university": "llm_generated_university"}
+
+TREND_SQL = f"""
+SELECT date_trunc(%(interval)s, week)::date AS period{{group}},
+       SUM(n)::bigint AS applications,
+       SUM(accepted)::bigint AS accepted,
+       SUM(rejected)::bigint AS rejected,
+       SUM(waitlisted)::bigint AS waitlisted,
+       ROUND(100.0 * SUM(accepted) / NULLIF(SUM(n), 0), 2) AS acceptance_rate
+FROM {TREND_TABLE}{{where}}
+GROUP BY {{keys}}
+ORDER BY {{keys}};
+"""
+
+def trends(interval="week", filters=None, group_by=None, conn=None):
+    """
+    Applications and decisions over time, read only from the weekly rollup.
+
+    Each point covers one ``interval`` (weeks are re-bucketed by the week's
+    Monday, so a week spanning two months counts towards the first) and
+    holds the number of applications, acceptances, rejections and
+    waitlists, and the acceptance rate in percent of applications.
+    Applicants without a ``date_added`` are not part of any trend.
+
+    :param interval: ``"week"``, ``"month"``, ``"quarter"`` or ``"year"``.
+    :type interval: str
+    :param filters: ``degree`` and ``university`` substring filters, and
+        ``date_from`` (inclusive) / ``date_to`` (exclusive) on the week start.
+    :type filters: dict[str, Any] | None
+    :param group_by: ``"degree"`` or ``"university"`` for one series per
+        value, or ``None`` for a single series.
+    :type group_by: str | None
+    :param conn: Checked-out connection; one is borrowed from the pool if omitted.
+    :type conn: psycopg.Connection | None
+    :return: Points ordered by period (and group).
+    :rtype: list[dict]
+    :raises ValueError: On an unknown interval, grouping or filter.
+    """
+    if interval not in TREND_INTERVALS:
+        raise ValueError(f"Unknown interval {interval!r}; choose from {list(TREND_INTERVALS)}")
+    if group_by is not None and group_by not in TREND_GROUPS:
+        raise ValueError(f"Unknown grouping {group_by!r}; choose from {sorted(TREND_GROUPS)}")
+    filters = dict(filters or {})
+    unknown = set(filters) - set(TREND_GROUPS) - set(DATE_FILTERS)
+    if unknown:
+        raise ValueError(f"Trends can be filtered by {sorted(TREND_GROUPS) + sorted(DATE_FILTERS)}, "
+                         f"not {sorted(unknown)}")
+
+    params = {}
+    predicates = compile_filters({k: v for k, v in filters.items() if k in TREND_GROUPS}, params)
+    for name, op in DATE_FILTERS.items():
+        if name in filters:
+            params[name] = date.fromisoformat(str(filters[name]))
+            predicates.append(f"week {op} %({name})s")
+    params["interval"] = interval
+
+    group = f",\n       NULLIF({TREND_GROUPS[group_by]}, '') AS {group_by}" if group_by else ""
+    query = TREND_SQL.format(group=group, keys="1, 2" if group_by else "1",
+                             where=f"\nWHERE {' AND '.join(predicates)}" if predicates else "")
+    return read_query(query, params, conn)
+
+# Precomputed cross-tab of applications and decisions over every combination of
+# university, program and degree (load_data.CREATE_CUBE_SQL, a GROUP BY CUBE materialized
+# view rebuilt after every load). grouping_id has a bit set for each dimension a row is summed over,
+# university being the highest bit, so every slice is a lookup of one grouping's rows.
+CUBE_TABLE = "applicant_cube"
+CUBE_DIMENSIONS = {"university": "llm_generated_university", "program": "llm_generated_program", "degree": "degree"}
+CUBE_SORTS = ("n", "acceptance_rate")
+CUBE_MAX_LIMIT = 500
+
+CUBE_SQL = f"""
+SELECT {{dims}}SUM(n)::bigint AS n,
+       SUM(accepted)::bigint AS accepted,
+       SUM(rejected)::bigint AS rejected,
+       SUM(waitlisted)::bigint AS waitlisted,
+       ROUND(100.0 * SUM(accepted) / NULLIF(SUM(n), 0), 2) AS acceptance_rate
+FROM {CUBE_TABLE}
+WHERE grouping_id = %(grouping_id)s{{filters}}{{group}}
+ORDER BY {{order}}
+LIMIT %(limit)s;
+"""
+
+def cube_grouping_id(kept):
+    """
+    ``grouping_id`` of the cube rows that keep the dimensions in ``kept``.
+
+    :param kept: Dimension names (keys of :data:`CUBE_DIMENSIONS`).
+    :type kept: Iterable[str]
+    :return: Bitmask as computed by ``GROUPING(...)`` over the cube dimensions.
+    :rtype: int
+    """
+    dims = list(CUBE_DIMENSIONS)
+    return sum(1 << (len(dims) - 1 - i) for i, d in enumerate(dims) if d not in kept)
+
+def cube(by=(), filters=None, sort="n", limit=50, conn=None):
+    """
+    Slice the application cube: counts and decisions per combination of ``by``.
+
+    ``cube(["program"], {"university": "johns hopkins"})`` lists the
+    programs applied to at Johns Hopkins; ``cube(["university", "degree"],
+    sort="acceptance_rate")`` gives the acceptance rate per degree per
+    school. Filters are substring matches like everywhere else, so rows of
+    all matching values are summed. Only the precomputed cube is read.
+
+    :param by: Dimensions to break down by (see :data:`CUBE_DIMENSIONS`);
+        empty for a single total.
+    :type by: Sequence[str]
+    :param filters: ``university``, ``program`` and ``degree`` substring filters.
+    :type filters: dict[str, Any] | None
+    :param sort: ``"n"`` (most applications first) or ``"acceptance_rate"``.
+    :type sort: str
+    :param limit: Maximum number of rows, at most :data:`CUBE_MAX_LIMIT`.
+    :type limit: int
+    :param conn: Checked-out connection; one is borrowed if omitted.
+    :type conn: psycopg.Connection | None
+    :return: One row per combination with ``n``, ``accepted``, ``rejected``,
+        ``waitlisted`` and ``acceptance_rate`` (percent of applications).
+    :rtype: list[dict]
+    :raises ValueError: On an unknown dimension, filter or sort, a repeated
+        dimension, or a limit outside ``1..CUBE_MAX_LIMIT``.
+    """
+    by = list(by)
+    filters = dict(filters or {})
+    unknown = (set(by) | set(filters)) - set(CUBE_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"The cube has the dimensions {list(CUBE_DIMENSIONS)}, not {sorted(unknown)}")
+    if len(set(by)) != len(by):
+        raise ValueError(f"Repeated dimension in {by}")
+    if sort not in CUBE_SORTS:
+        raise ValueError(f"Unknown sort {sort!r}; choose from {list(CUBE_SORTS)}")
+    if not 1 <= int(limit) <= CUBE_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {CUBE_MAX_LIMIT}")
+
+    params = {}
+    predicates = compile_filters(filters, params)
+    params["grouping_id"] = cube_grouping_id(set(by) | set(filters))
+    params["limit"] = int(limit)
+
+    dims = "".join(f"NULLIF({CUBE_DIMENSIONS[d]}, '') AS {d},\n       " for d in by)
+    positions = ", ".join(str(i + 1) for i in range(len(by)))
+    order = "n DESC" if sort == "n" else "acceptance_rate DESC NULLS LAST, n DESC"
+    query = CUBE_SQL.format(
+        dims=dims,
+        filters="".join(f" AND {p}" for p in predicates),
+        group=f"\nGROUP BY {positions}" if by else "",
+        order=f"{order}, {positions}" if by else order,
+    )
+    return read_query(query, params, conn)
+
+# Histogram ranges (low, high, number of bins) of the score distributions. Values outside
+# the range, such as GPAs reported on a 5-point scale, count towards the edge bins.
+HISTOGRAM_BINS = {"gpa": (0, 4, 16), "gre_q": (130, 170, 16), "gre_v": (130, 170, 16), "gre_aw": (0, 6, 12)}
+DISTRIBUTION_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# One pass over applicants: the scores and their bins are read once into a materialized CTE,
+# from which both the bin counts and the percentiles per segment are aggregated
+DISTRIBUTIONS_SQL = """
+WITH measured AS MATERIALIZED (
+  SELECT {segment} AS segment, {measures},
+         {bins}
+  FROM applicants{where}
+),
+pct AS (
+  SELECT segment,
+         {percentiles}
+  FROM measured
+  GROUP BY segment
+)
+SELECT segment, b.measure, b.bin, COUNT(*) AS n, NULL::float8[] AS percentiles
+FROM measured, LATERAL (VALUES {bin_values}) AS b(measure, bin)
+WHERE b.bin IS NOT NULL
+GROUP BY 1, 2, 3
+UNION ALL
+SELECT segment, m.measure, NULL, NULL, m.percentiles
+FROM pct, LATERAL (VALUES {pct_values}) AS m(measure, percentiles)
+ORDER BY 1, 2, 3;
+"""
+
+def compile_distributions(segment=None, filters=None):
+    """
+    Compile the histogram and percentile query for ``segment`` and ``filters``.
+
+    :param segment: Filter name (see :data:`FILTER_COLUMNS`) whose values
+        split the applicants, or ``None`` for one segment named ``"all"``.
+    :type segment: str | None
+    :param filters: Structured filters.
+    :type filters: dict[str, Any] | None
+    :return: ``(sql, params)``.
+    :rtype: tuple[str, dict[str, Any]]
+    :raises ValueError: On an unknown segment or filter.
+    """
+    if segment is not None and segment not in FILTER_COLUMNS:
+        raise ValueError(f"Unknown segment {segment!r}; choose from {sorted(FILTER_COLUMNS)}")
+    params = {}
+    where = _where(filters or {}, "applicants", params)
+    params["quantiles"] = list(DISTRIBUTION_QUANTILES)
+    query = DISTRIBUTIONS_SQL.format(
+        segment=FILTER_COLUMNS[segment] if segment else "'all'::text",
+        measures=", ".join(HISTOGRAM_BINS),
+        bins=",\n         ".join(
+            f"CASE WHEN {m} IS NOT NULL THEN LEAST(GREATEST(width_bucket({m}, {lo}, {hi}, {n}), 1), {n}) END AS {m}_bin"
+            for m, (lo, hi, n) in HISTOGRAM_BINS.items()),
+        where=where,
+        percentiles=",\n         ".join(
+            f"percentile_cont(%(quantiles)s::float8[]) WITHIN GROUP (ORDER BY {m}) AS {m}" for m in HISTOGRAM_BINS),
+        bin_values=", ".join(f"('{m}', {m}_bin)" for m in HISTOGRAM_BINS),
+        pct_values=", ".join(f"('{m}', pct.{m})" for m in HISTOGRAM_BINS),
+    )
+    return query, params
+
+def _empty_distribution(measure):
+    """Zero-count histogram and unknown percentiles for ``measure``."""
+    low, high, n = HISTOGRAM_BINS[measure]
+    width = (high - low) / n
+    return {
+        "histogram": [{"low": low + i * width, "high": low + (i + 1) * width, "n": 0} for i in range(n)],
+        "percentiles": {f"p{round(q * 100)}": None for q in DISTRIBUTION_QUANTILES},
+    }
+
+def distributions(segment=None, filters=None, conn=None):
+    """
+    Compute GPA and GRE histograms and percentiles per segment in the database.
+
+    Bins come from ``width_bucket`` over :data:`HISTOGRAM_BINS` and
+    percentiles from ``percentile_cont`` at :data:`DISTRIBUTION_QUANTILES`,
+    in a single statement with one pass over ``applicants``; only the bin
+    counts and percentiles are returned, never the rows. Missing scores are
+    left out of their measure.
+
+    :param segment: Filter name whose values split the applicants (e.g.
+        ``"degree"``), or ``None`` for all applicants together.
+    :type segment: str | None
+    :param filters: Structured filters, see :data:`FILTER_COLUMNS` and :data:`DATE_FILTERS`.
+    :type filters: dict[str, Any] | None
+    :param conn: Checked-out connection; one is borrowed from the pool if omitted.
+    :type conn: psycopg.Connection | None
+    :return: ``{"segment", "quantiles", "segments"}``; each segment holds
+        per-measure ``histogram`` bins (``low``, ``high``, ``n``) and
+        ``percentiles`` (``p10`` ... ``p90``).
+    :rtype: dict[str, Any]
+    :raises ValueError: On an unknown segment or filter.
+    """
+    query, params = compile_distributions(segment, filters)
+    segments = {}
+    for row in read_query(query, params, conn):
+        measures = segments.setdefault(row["segment"], {m: _empty_distribution(m) for m in HISTOGRAM_BINS})
+        entry = measures[row["measure"]]
+        if row["bin"] is not None:
+            entry["histogram"][row["bin"] - 1]["n"] = row["n"]
+        elif row["percentiles"] is not None:
+            entry["percentiles"] = {name: round(v, 3) for name, v in zip(entry["percentiles"], row["percentiles"])}
+    return {
+        "segment": segment,
+        "quantiles": list(DISTRIBUTION_QUANTILES),
+        "segments": [{"segment": name, "measures": measures} for name, measures in segments.items()],
+    }
+
+def get_distributions(segment=None, filters=None):
+    """
+    :func:`distributions`, cached in :data:`RESULTS_CACHE` until the next load.
+
+    :param segment: As for :func:`distributions`.
+    :type segment: str | None
+    :param filters: As for :func:`distributions`.
+    :type filters: dict[str, Any] | None
+    :return: As for :func:`distributions`.
+    :rtype: dict[str, Any]
+    :raises ValueError: On an unknown segment or filter.
+    """
+    filters = dict(filters or {})
+    compile_distributions(segment, filters)             # Reject bad input before it becomes a cache key
+    key = ("distributions", segment, tuple(sorted((k, str(v)) for k, v in filters.items())))
+
+    def compute():
+        return run_read(lambda conn: distributions(segment, filters, conn=conn), fresh=True)
+
+    return RESULTS_CACHE.get(compute, key=key)
+
+# Bulk export formats and their content types
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+# Rows fetched from the server-side cursor per round trip (and per Parquet row group)
+EXPORT_BATCH = 5000
+
+EXPORT_SQL = """
+SELECT {columns}
+FROM applicants
+WHERE TRUE{filters};
+"""
+
+def export_rows(fmt, filters=None, fields=None, gzip=False, batch_size=EXPORT_BATCH, stats=None):
+    """
+    Stream filtered applicant rows as CSV, NDJSON or Parquet.
+
+    Input is checked up front; the returned generator then borrows a
+    pooled connection and reads through a named (server-side) cursor
+    ``batch_size`` rows at a time, encoding each batch before fetching the
+    next. Memory stays bounded by one batch whatever the table size.
+
+    ``gzip`` compresses CSV/NDJSON output as a gzip stream; for Parquet
+    it selects the gzip codec inside the file instead. Parquet needs the
+    optional ``pyarrow`` package.
+
+    :param fmt: One of :data:`EXPORT_FORMATS`.
+    :type fmt: str
+    :param filters: Structured filters, see :func:`compile_filters`.
+    :type filters: dict[str, Any] | None
+    :param fields: Columns to export (subset of :data:`BROWSE_COLUMNS`); all by default.
+    :type fields: list[str] | None
+    :param gzip: Compress the output.
+    :type gzip: bool
+    :param batch_size: Rows per server-side fetch.
+    :type batch_size: int
+    :param stats: Optional dictionary that receives the exported ``rows`` count.
+    :type stats: dict | None
+    :return: Generator of encoded byte chunks.
+    :rtype: Iterator[bytes]
+    :raises ValueError: On an unknown format, field or filter, or Parquet without pyarrow.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {sorted(EXPORT_FORMATS)}")
+    columns = list(fields or BROWSE_COLUMNS)
+    unknown = sorted(set(columns) - set(BROWSE_COLUMNS))
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}; choose from {BROWSE_COLUMNS}")
+    params = {}
+    predicates = compile_filters(filters or {}, params)
+    query = EXPORT_SQL.format(columns=", ".join(columns),
+                              filters="".join(f" AND {p}" for p in predicates))
+
+    if fmt == "parquet":
+        encoder = _parquet_encoder(columns, gzip, *_import_pyarrow())
+    else:
+        encoder = _csv_encoder(columns) if fmt == "csv" else _ndjson_encoder()
+        if gzip:
+            encoder = _gzipped(encoder)
+    return _export_chunks(query, params, encoder, batch_size, {} if stats is None else stats)
+
+def _export_chunks(query, params, encoder, batch_size, stats):
+    """
+    Feed batches from a named cursor through ``encoder`` and yield its output.
+
+    ``encoder`` is a generator primed with :func:`next`; it receives each
+    batch via ``send`` (returning the bytes to emit) and ``None`` at the
+    end (returning any trailing bytes).
+    """
+    stats["rows"] = 0
+    head = next(encoder)
+    if head:
+        yield head
+    with read_connection() as conn:
+        with conn.cursor(name="applicants_export", row_factory=dict_row) as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                stats["rows"] += len(rows)
+                chunk = encoder.send(rows)
+                if chunk:
+                    yield chunk
+    tail = encoder.send(None)
+    if tail:
+        yield tail
+
+def _csv_encoder(columns):
+    """CSV encoder generator (header first, then one chunk per batch)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    rows = yield buf.getvalue().encode()
+    while rows is not None:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows([r[c] for c in columns] for r in rows)
+        rows = yield buf.getvalue().encode()
+    yield b""
+
+def _ndjson_encoder():
+    """NDJSON encoder generator (one JSON object per line)."""
+    rows = yield b""
+    while rows is not None:
+        rows = yield "".join(json.dumps(r, default=str) + "\n" for r in rows).encode()
+    yield b""
+
+def _gzipped(encoder):
+    """Wrap an encoder generator so its output is one gzip stream."""
+    gz = zlib.compressobj(wbits=31)                     # 31 = gzip container
+    rows = yield gz.compress(next(encoder))
+    while rows is not None:
+        rows = yield gz.compress(encoder.send(rows))
+    yield gz.compress(encoder.send(None)) + gz.flush()
+
+# Arrow types for the applicants columns; every other column is a string
+PARQUET_TYPES = {"p_id": "int32", "date_added": "date32", "gpa": "float64",
+                 "gre_q": "float64", "gre_v": "float64", "gre_aw": "float64"}
+
+def _import_pyarrow():
+    """
+    Import the optional ``pyarrow`` package needed for Parquet export.
+
+    :return: ``(pyarrow, pyarrow.parquet)``.
+    :rtype: tuple[module, module]
+    :raises ValueError: If ``pyarrow`` is not installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Parquet export needs the optional pyarrow package") from e
+    return pa, pq
+
+def _parquet_encoder(columns, gzip, pa, pq):
+    """Parquet encoder generator: one row group per batch, footer at the end."""
+    schema = pa.schema([(c, getattr(pa, PARQUET_TYPES.get(c, "string"))()) for c in columns])
+    buf = io.BytesIO()
+    writer = pq.ParquetWriter(buf, schema, compression="gzip" if gzip else "snappy")
+
+    def drain():
+        data = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    rows = yield b""
+    while rows is not None:
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        rows = yield drain()
+    writer.close()
+    yield drain()
+
+def export_to_file(path, fmt, filters=None, fields=None, gzip=False):
+    """
+    Write an export to ``path`` chunk by chunk (see :func:`export_rows`).
+
+    :param path: Output file.
+    :type path: str
+    :param fmt: One of :data:`EXPORT_FORMATS`.
+    :type fmt: str
+    :param filters: Structured filters.
+    :type filters: dict[str, Any] | None
+    :param fields: Columns to export.
+    :type fields: list[str] | None
+    :param gzip: Compress the output.
+    :type gzip: bool
+    :return: Number of rows exported.
+    :rtype: int
+    """
+    stats = {}
+    with open(path, "wb") as fh:
+        for chunk in export_rows(fmt, filters, fields, gzip, stats=stats):
+            fh.write(chunk)
+    print(f"Exported {stats['rows']} rows to {path}.")
+    return stats["rows"]
+
+CLI_FORMATS = ("text", "json", "csv")
+
+def metric_timings(filters=None, source="applicants"):
+    """
+    Time every dashboard metric on its own.
+
+    Each metric of :data:`DASHBOARD_METRICS` is compiled into its own
+    single-aggregate statement, so the cost of one metric's filter and
+    aggregate shows up separately from the single-scan dashboard query.
+    All statements run in turn on one connection (the SQLite file with
+    ``ANALYTICS_BACKEND=sqlite``).
+
+    :param filters: Structured filters, see :func:`query_metrics`.
+    :type filters: dict[str, Any] | None
+    :param source: ``"applicants"`` or ``"rollup"``; ignored on SQLite.
+    :type source: str
+    :return: Milliseconds per metric name, plus ``grouped_counts`` for the
+        degree and university counts.
+    :rtype: dict[str, float]
+    :raises ValueError: On an unknown filter name.
+    """
+    if ANALYTICS_BACKEND == "sqlite":
+        source = "sqlite"
+    statements = {name: compile_metrics(filters, source, {name: metric})
+                  for name, metric in DASHBOARD_METRICS.items()}
+    grouped_sql, grouped_params = compile_grouped(filters, source)
+    statements["grouped_counts"] = (grouped_sql + "ORDER BY n DESC", grouped_params)
+
+    timings = {}
+    with (SQLITE.connect() if source == "sqlite" else read_connection()) as conn:
+        for name, (query, params) in statements.items():
+            started = time.perf_counter()
+            if source == "sqlite":
+                SQLITE.query(query + ";", params, conn)
+            else:
+                sql_query(query + ";", params, conn=conn)
+            timings[name] = round((time.perf_counter() - started) * 1000, 3)
+    return timings
+
+def _latency(run, repeat):
+    """
+    Time ``repeat`` calls of ``run`` after one uncounted warm-up call.
+
+    :param run: Function called without arguments.
+    :type run: Callable[[], Any]
+    :param repeat: Number of timed calls.
+    :type repeat: int
+    :return: ``runs`` and min/mean/p50/p90/p95/p99/max in milliseconds.
+    :rtype: dict[str, float]
+    """
+    run()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {"runs": repeat, "min_ms": round(times[0], 3), "mean_ms": round(statistics.fmean(times), 3),
+            **{f"p{q}_ms": _percentile(times, q / 100) for q in (50, 90, 95, 99)},
+            "max_ms": round(times[-1], 3)}
+
+def benchmark_metrics(filters=None, repeat=10, source=None):
+    """
+    Latency of the metric set and of the dashboard read over ``repeat`` uncached runs.
+
+    - ``metrics`` times :func:`query_metrics` with ``filters`` on ``source``.
+    - ``dashboard`` times :func:`get_results` as the dashboard page calls
+      it after a load, when the results cache misses: :func:`read_results`,
+      which the cache runs to fill itself (the summary view read, with its
+      replica check). The page takes no filters, so ``filters`` and
+      ``source`` do not apply to it.
+
+    One warm-up run of each is made first and not counted, so connection
+    setup and statement preparation do not skew the figures.
+
+    :param filters: Structured filters, see :func:`query_metrics`.
+    :type filters: dict[str, Any] | None
+    :param repeat: Number of timed runs of each.
+    :type repeat: int
+    :param source: ``"applicants"``, ``"rollup"`` or ``None``, see :func:`query_metrics`.
+    :type source: str | None
+    :return: ``metrics`` and ``dashboard``, each with ``runs`` and
+        min/mean/p50/p90/p95/p99/max in milliseconds.
+    :rtype: dict[str, dict[str, float]]
+    :raises ValueError: If ``repeat`` is less than 1, or on an unknown filter name.
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+    return {"metrics": _latency(lambda: query_metrics(filters, source=source), repeat),
+            "dashboard": _latency(read_results, repeat)}
+
+def _text_report(report):
+    """Lines of the human-readable CLI output for ``report``."""
+    r = report["metrics"]
+    lines = [
+        f"Total number of rows in applicants database: {r['total']}",
+        f"1) Fall 2025 entries: {r['fall_2025']}",
+        f"2) International entries (%): {pct(r['pct_international'])}",
+        f"3) Averages (GPA(on 4.0 scale) / GRE Q / GRE V / GRE AW): "
+        f"{r['avg_gpa_4']} {r['avg_gre_q']} {r['avg_gre_v']} {r['avg_gre_aw']}",
+        f"4) Avg GPA (4.0-scale) of American students, Fall 2025: {r['avg_gpa_us_fall25']}",
+        f"5) Acceptance rate for Fall 2025: {pct(r['pct_accept_fall25'])}",
+        f"6) Avg GPA (4.0-scale) of Fall 2025 Acceptances: {r['avg_gpa_accept_fall25']}",
+        f"7) JHU Masters in CS entries: {r['jhu_masters_cs']}",
+        f"8) 2025 CS PhD acceptances to Georgetown: {r['georgetown_cs_phd']}",
+        "9) Applicants by degree:",
+        *(f"   {row['degree']}: {row['n']}" for row in r["degree_counts"]),
+        "10) Top 10 universities by applicant count:",
+        *(f"   {row['llm_generated_university']}: {row['n']}" for row in r["top_universities"]),
+    ]
+    if "timings_ms" in report:
+        lines.append("Per-metric timing (ms):")
+        lines += [f"   {name}: {ms:.3f}" for name, ms in report["timings_ms"].items()]
+    if "benchmark" in report:
+        lines.append(f"Benchmark over {report['benchmark']['metrics']['runs']} runs (ms):")
+        lines += [f"   {target}: " + ", ".join(f"{k[:-3]} {v:.3f}" for k, v in b.items() if k != "runs")
+                  for target, b in report["benchmark"].items()]
+    return lines
+
+def _csv_report(report):
+    """``section,name,value`` rows of the CSV CLI output for ``report``."""
+    r = report["metrics"]
+    rows = [("metric", name, r[name]) for name in DASHBOARD_METRICS]
+    rows += [("degree_counts", row["degree"], row["n"]) for row in r["degree_counts"]]
+    rows += [("top_universities", row["llm_generated_university"], row["n"]) for row in r["top_universities"]]
+    rows += [("timing_ms", name, ms) for name, ms in report.get("timings_ms", {}).items()]
+    rows += [(f"benchmark_{target}", name, value)
+             for target, b in report.get("benchmark", {}).items() for name, value in b.items()]
+    return rows
+
+def main(filters=None, fmt="text", timing=False, repeat=0, source="applicants"):
+    """
+    Print the dashboard metrics to the console.
+
+    Uses the same metric definitions as :func:`get_results` (via
+    :func:`query_metrics`), optionally narrowed by structured ``filters``,
+    and prints them as text, one JSON document, or ``section,name,value``
+    CSV rows. ``timing`` adds :func:`metric_timings` and ``repeat`` adds
+    :func:`benchmark_metrics`, both on ``source``, so dashboard query
+    performance can be measured from the command line.
+
+    :param filters: Structured filters, see :func:`query_metrics`.
+    :type filters: dict[str, Any] | None
+    :param fmt: One of :data:`CLI_FORMATS`.
+    :type fmt: str
+    :param timing: Also time each metric on its own.
+    :type timing: bool
+    :param repeat: Number of benchmark runs; ``0`` for none.
+    :type repeat: int
+    :param source: Source for the per-metric timing and the benchmark
+        (see :func:`metric_timings` and :func:`benchmark_metrics`).
+    :type source: str
+    :return: The printed report: ``metrics``, and ``timings_ms`` and
+        ``benchmark`` when requested.
+    :rtype: dict[str, Any]
+    :raises ValueError: On an unknown format or filter name.
+    """
+    if fmt not in CLI_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {list(CLI_FORMATS)}")
+    report = {"metrics": query_metrics(filters)}
+    if timing:
+        report["timings_ms"] = metric_timings(filters, source)
+    if repeat:
+        report["benchmark"] = benchmark_metrics(filters, repeat, source)
+
+    if fmt == "json":
+        print(json.dumps(report, indent=2, default=str))
+    elif fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["section", "name", "value"])
+        writer.writerows(_csv_report(report))
+        print(buf.getvalue(), end="")
+    else:
+        print("\n".join(_text_report(report)))
+    return report
+
+def parse_filters(pairs):
+    """
+    Turn ``name=value`` command-line arguments into structured filters.
+
+    :param pairs: Arguments such as ``["term=Fall 2025", "degree=phd"]``.
+    :type pairs: list[str]
+    :return: Filter name to value.
+    :rtype: dict[str, str]
+    :raises ValueError: If an argument has no ``=``.
     """
-    # Determine total number of applicant data rows in the db
-    total = sql_query("SELECT COUNT(*) AS total FROM applicants;")[0]["total"]  # Executing a query to determine the number of rows in the db
-    print("Total number of rows in applicants database:", total)
-
-    # Question 1: Query to determine the number of applicants for the fall 2025 semester
-    q1 = sql_query("SELECT COUNT(*) AS n FROM applicants WHERE term ILIKE %s;", "%Fall 2025%")
-    print("1) Fall 2025 entries:", q1[0]["n"])
-
-    # Question 2: Query to determine number of applicants who were international students (NOT american and NOT other) to 2 decimals
-    q2 = sql_query("""
-        SELECT ROUND(
-            100.0 * COUNT(*) FILTER (WHERE us_or_international ILIKE %s)
-            / NULLIF(COUNT(*), 0), 2
-        ) AS pct_international
-        FROM applicants;
-    """, "%internat%")
-    print("2) International entries (%):", pct(q2[0]["pct_international"]))
-
-    # Question 3: Query to find the average of GPA, GRE_q, GRE_V, GRE AW scores
-    q3 = sql_query("""
-        SELECT
-          ROUND(AVG(gpa)::numeric, 3)    AS avg_gpa_4,
-          ROUND(AVG(gre_q)::numeric, 3)  AS avg_gre_q,
-          ROUND(AVG(gre_v)::numeric, 3)  AS avg_gre_v,
-          ROUND(AVG(gre_aw)::numeric, 3) AS avg_gre_aw
-        FROM applicants;
-    """)
-    print("3) Averages (GPA(on 4.0 scale) / GRE Q / GRE V / GRE AW):",
-          q3[0]["avg_gpa_4"], q3[0]["avg_gre_q"], q3[0]["avg_gre_v"], q3[0]["avg_gre_aw"])
-
-    # Question 4: Query to find the average GPA of students for the fall 2025 semester
-    q4 = sql_query("""
-        SELECT ROUND(AVG(gpa)::numeric, 3) AS avg_gpa_us_fall25
-        FROM applicants
-        WHERE term ILIKE %s
-          AND us_or_international ILIKE %s;
-    """, "%Fall 2025%", "%American%")
-    print("4) Avg GPA (4.0-scale) of American students, Fall 2025:", q4[0]["avg_gpa_us_fall25"])
-
-    # Question 5: Query to determine percentage (to 2 decimal places) of students from fall 2025 semester were accepted
-    q5 = sql_query("""SELECT ROUND(100.0 * AVG(CASE 
-                   WHEN status ILIKE %s THEN 1 ELSE 0 END), 2) AS pct_accept_fall25 
-                   FROM applicants WHERE term ILIKE %s; """, "%accept%", "%Fall 2025%")
-    print("5) Acceptance rate for Fall 2025:", pct(q5[0]["pct_accept_fall25"]))
-
-    # Question 6: Query to determine average gpa of applicants who were accepted in fall 2025
-    q6 = sql_query("""SELECT ROUND(AVG(gpa)::numeric, 3) AS avg_gpa_accept_fall25 FROM applicants 
-                   WHERE term ILIKE %s AND status ILIKE %s;""", "%Fall 2025%", "%accept%")
-    print("6) Avg GPA (4.0-scale) of Fall 2025 Acceptances:", q6[0]["avg_gpa_accept_fall25"])
-
-    # Question 7: Query to determine number of applicants for jhu computer science
-    q7 = sql_query("""SELECT COUNT(*) AS n FROM applicants 
-                   WHERE llm_generated_university ILIKE %s AND llm_generated_program ILIKE %s 
-                   AND degree ILIKE %s;""", "%johns hopkins%", "%computer science%", "%master%")
-    print("7) JHU Masters in CS entries:", q7[0]["n"])
-
-    # Question 8: Query to determine acceptances at georgetown university for phd in computer science
-    q8 = sql_query("""
-        SELECT COUNT(*) AS n
-        FROM applicants
-        WHERE term ILIKE %s
-        AND status ILIKE %s
-        AND llm_generated_university ILIKE %s
-        AND llm_generated_program ILIKE %s
-        AND degree ILIKE %s;
-    """, "%2025%", "%accept%", "%georgetown%", "%computer science%", "%phd%")
-    print("8) 2025 CS PhD acceptances to Georgetown:", q8[0]["n"])
-
-    # Custom question 9: Most common applicant degree type
-    q9 = sql_query("""
-        SELECT degree, COUNT(*) AS n
-        FROM applicants
-        GROUP BY degree
-        ORDER BY n DESC;
-    """)
-    print("9) Applicants by degree:")
-    for row in q9:
-        print(f"   {row['degree']}: {row['n']}")
-
-    # Custom question 10: Top 10 most common universities and the number of applicants
-    q10 = sql_query("""
-        SELECT llm_generated_university, COUNT(*) AS n
-        FROM applicants
-        WHERE llm_generated_university IS NOT NULL
-        GROUP BY llm_generated_university
-        ORDER BY n DESC
-        LIMIT 10;
-    """)
-    print("10) Top 10 universities by applicant count:")
-    for row in q10:
-        print(f"   {row['llm_generated_university']}: {row['n']}")
+    filters = {}
+    for pair in pairs or []:
+        name, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Filter {pair!r} must look like name=value")
+        filters[name.strip()] = value.strip()
+    return filters
 
 if __name__ == "__main__":  # pragma: no cover
-    main()
+    parser = argparse.ArgumentParser(description="Print the applicant analysis or export applicant rows.")
+    parser.add_argument("--filter", action="append", metavar="NAME=VALUE",
+                        help=f"structured filter, repeatable ({', '.join(sorted(FILTER_COLUMNS) + sorted(DATE_FILTERS))})")
+    parser.add_argument("--export", choices=sorted(EXPORT_FORMATS), help="export rows in this format instead of printing metrics")
+    parser.add_argument("--out", help="export file (required with --export)")
+    parser.add_argument("--fields", help="comma-separated columns to export (default: all)")
+    parser.add_argument("--gzip", action="store_true", help="compress the export")
+    parser.add_argument("--format", choices=CLI_FORMATS, default="text", help="metrics output format")
+    parser.add_argument("--timing", action="store_true", help="also time each metric on its own")
+    parser.add_argument("--source", choices=("applicants", "rollup"), default="applicants",
+                        help="table read by --timing and --repeat (default: applicants)")
+    parser.add_argument("--repeat", type=int, default=0, metavar="N",
+                        help="benchmark N runs of the metric queries and of the dashboard read, "
+                             "and report latency percentiles")
+    parser.add_argument("--dsn", help="connection string to run against (default: the PG* settings)")
+    args = parser.parse_args()
+    if args.dsn:
+        DSN = args.dsn
+        REPLICA = ReplicaRouter(None)                   # Read from that database only
+    if args.export:
+        if not args.out:
+            parser.error("--out is required with --export")
+        export_to_file(args.out, args.export, parse_filters(args.filter),
+                       args.fields.split(",") if args.fields else None, args.gzip)
+    else:
+        main(parse_filters(args.filter), args.format, args.timing, args.repeat, args.source)
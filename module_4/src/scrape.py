@@ -5,7 +5,7 @@ import time
 import clean
 from clean import clean_data                            
 from clean import save_data 
-from query_data import url_exists_in_db
+from query_data import urls_existing
 
 import builtins
 print = builtins.print  # allow tests to monkeypatch scrape.print
@@ -38,7 +38,7 @@ def scrape_data(max_applicants=None, latest_date_in_db=None):
     Key behaviors:
       - Stops if a page contains no results or no new rows.
       - Stops early if an applicant's URL already exists in the database
-        (via :func:`query_data.url_exists_in_db`).
+        (checked for the whole page at once via :func:`query_data.urls_existing`).
       - Supports multi-row data extraction (row 1: metadata,
         row 2: GPA/GRE/location, row 3: notes).
       - Includes safeguards to prevent runaway scraping.
@@ -90,6 +90,10 @@ def scrape_data(max_applicants=None, latest_date_in_db=None):
         for tr in data_rows:
             data_row_list.append(tr)
 
+        # Ask the DB once per page which applicant URLs it already has
+        page_urls = [a["href"].split("#")[0] for a in results.find_all("a", href=True, attrs={"data-ext-page-id": True})]
+        existing_urls = urls_existing(page_urls)
+
         row_check = 0        # pragma: no cover                               #this variable acts as a reference to tell how many rows of data there are when parsing through
 
         for data_row in data_row_list:
@@ -215,9 +219,9 @@ def scrape_data(max_applicants=None, latest_date_in_db=None):
                 url_tag = data_row.find("a", href=True, attrs={"data-ext-page-id": True})                           # searches for the applicant link in the by using several identifiers
                 applicant_dictionary['applicant_URL'] = url_tag["href"].split("#")[0] if url_tag else ""            # add applicant_url to applicant_dictionary
 
-                # Import the "url_exists_in_db" function to check if the url being read currently matches with anything in the DB
+                # Check the url being read against the page's batch of URLs already in the DB
 
-                if applicant_dictionary['applicant_URL'] and url_exists_in_db(applicant_dictionary['applicant_URL']):   # If URL exists and is in the DB
+                if applicant_dictionary['applicant_URL'] in existing_urls:                                              # If URL exists and is in the DB
                     print(f"Stopping scrape — hit existing record {applicant_dictionary['applicant_URL']}")             # Stop scraping and return all_applicants dictionary
                     return all_applicants
 
@@ -11,6 +11,12 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+# src modules import each other by bare name (e.g. "from query_data import ..."),
+# so src itself must be importable too when a single test file is run
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
 @pytest.fixture(autouse=True)
 def _no_dns(monkeypatch):
     # Prevent DNS resolution errors leaking into logs
@@ -57,3 +63,21 @@ def _no_real_io(monkeypatch, tmp_path, request):
     # Disables any "sleep" functions in any code to speed up testing
     monkeypatch.setattr("src.scrape.time.sleep", lambda *_: None, raising=False)
     monkeypatch.setattr(time, "sleep", lambda *_: None, raising=False)
+
+@pytest.fixture(autouse=True)
+def _fresh_results_cache(monkeypatch):
+    """
+    Give every test an empty, in-process results cache, URL cache and query stats.
+
+    ``query_data`` is imported both as ``src.query_data`` (by the tests)
+    and as ``query_data`` (by the other src modules), so both copies are reset.
+
+    :param monkeypatch: Pytest fixture for patching attributes at runtime.
+    :type monkeypatch: _pytest.monkeypatch.MonkeyPatch
+    """
+    for name in ("query_data", "src.query_data"):
+        mod = sys.modules.get(name)
+        if mod is not None:
+            monkeypatch.setattr(mod, "RESULTS_CACHE", mod.ResultsCache())
+            monkeypatch.setattr(mod, "QUERY_STATS", mod.QueryStats())
+            monkeypatch.setattr(mod, "URL_CACHE", mod.UrlCache())
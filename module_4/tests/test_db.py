@@ -121,3 +121,99 @@ def test_count_rows_returns_value():
     """
     count = db.count_rows("fake_dsn")
     assert count == 42
+
+
+class FakePool:
+    """
+    Stand-in for :class:`psycopg_pool.ConnectionPool` that records its
+    construction arguments and hands out :data:`dummy_conn`.
+    """
+    created = []
+
+    @staticmethod
+    def check_connection(conn):
+        return None
+
+    def __init__(self, conninfo, **kwargs):
+        self.conninfo = conninfo
+        self.kwargs = kwargs
+        self.name = kwargs["name"]
+        self.closed = False
+        self.checkouts = 0
+        self.timeouts = []
+        FakePool.created.append(self)
+
+    def connection(self, timeout=None):
+        pool = self
+        self.timeouts.append(timeout)
+
+        class _Ctx:
+            def __enter__(self):
+                pool.checkouts += 1
+                return dummy_conn
+            def __exit__(self, *a):
+                return False
+        return _Ctx()
+
+    def get_stats(self):
+        return {"pool_size": 1, "requests_num": self.checkouts}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """
+    Replace :class:`psycopg_pool.ConnectionPool` in :mod:`db` and start
+    every test with no pools open.
+    """
+    FakePool.created.clear()
+    monkeypatch.setattr(db, "ConnectionPool", FakePool)
+    monkeypatch.setattr(db, "_pools", {})
+    yield FakePool
+    db.close_pools()
+
+
+@pytest.mark.db
+def test_get_pool_is_shared_per_dsn(fake_pool):
+    """
+    Verify :func:`db.get_pool` creates one health-checked pool per DSN.
+
+    - Repeated calls for the same DSN return the same pool.
+    - The pool is sized from the module settings and checks connections.
+    - Pool names never include the password.
+    """
+    dsn = "host=dbhost port=5432 dbname=gradcafe user=u password=secret"
+    pool = db.get_pool(dsn)
+    assert db.get_pool(dsn) is pool
+    assert len(fake_pool.created) == 1
+
+    assert pool.kwargs["min_size"] == db.POOL_MIN_SIZE
+    assert pool.kwargs["max_size"] == db.POOL_MAX_SIZE
+    assert pool.kwargs["check"] is FakePool.check_connection
+    assert pool.name == "dbhost:5432/gradcafe"
+
+    db.get_pool("host=other dbname=x")
+    assert len(fake_pool.created) == 2
+
+
+@pytest.mark.db
+def test_pooled_connection_stats_and_close(fake_pool):
+    """
+    Verify :func:`db.pooled_connection` borrows from the pool (with an
+    optional checkout timeout) and that :func:`db.pool_stats` /
+    :func:`db.close_pools` see the pool.
+    """
+    dsn = "host=dbhost port=5432 dbname=gradcafe"
+    with db.pooled_connection(dsn) as conn:
+        assert conn is dummy_conn
+    with db.pooled_connection(dsn, timeout=2):
+        pass
+    assert fake_pool.created[0].timeouts == [None, 2]
+
+    assert db.pool_stats() == {"dbhost:5432/gradcafe": {"pool_size": 1, "requests_num": 2}}
+
+    db.close_pools()
+    assert fake_pool.created[0].closed
+    assert db.pool_stats() == {}
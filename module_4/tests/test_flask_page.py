@@ -47,6 +47,17 @@ def client(monkeypatch):
     with app.app.test_client() as client:
         yield client
 
+@pytest.fixture
+def admin(monkeypatch):
+    """
+    Enable the ``/admin/*`` routes and return the headers that authorize them.
+
+    :return: Request headers carrying the admin bearer token.
+    :rtype: dict[str, str]
+    """
+    monkeypatch.setattr(app, "ADMIN_TOKEN", "s3cret")
+    return {"Authorization": "Bearer s3cret"}
+
 @pytest.mark.web
 def test_index_route(client):
     """
@@ -113,4 +124,323 @@ def test_mock_llm(monkeypatch):
 
     # Redirect back to home page after
     assert resp.status_code == 302  
-    
\ No newline at end of file
+    
+@pytest.mark.web
+def test_pool_stats_route(client, admin, monkeypatch):
+    """
+    Verify ``/admin/pool_stats`` returns the pool counters as JSON.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    :param admin: Headers authorizing the admin routes.
+    :type admin: dict[str, str]
+    """
+    monkeypatch.setattr(app.db, "pool_stats", lambda: {"localhost:5432/gradcafe": {"pool_size": 2}})
+    resp = client.get("/admin/pool_stats", headers=admin)
+    assert resp.status_code == 200
+    assert resp.get_json() == {"localhost:5432/gradcafe": {"pool_size": 2}}
+
+@pytest.mark.web
+def test_results_cache_footer_and_route(client, admin):
+    """
+    Verify the cache counters reach the page footer and ``/admin/results_cache``,
+    and that "Update Analysis" drops the cached entry.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    :param admin: Headers authorizing the admin routes.
+    :type admin: dict[str, str]
+    """
+    cache = app.query_data.RESULTS_CACHE
+    cache.get(lambda: {"total": 1})
+    cache.get(lambda: {"total": 2})
+
+    html = client.get("/").get_data(as_text=True)
+    assert "Data version 0" in html and "cache hits 1, misses 1" in html and "s old" in html
+
+    client.get("/update_analysis")
+    stats = client.get("/admin/results_cache", headers=admin).get_json()
+    assert stats["age_seconds"] is None
+    assert (stats["hits"], stats["misses"], stats["shared"]) == (1, 1, False)
+
+@pytest.mark.web
+def test_metrics_api_filters(client, monkeypatch):
+    """
+    Verify ``/api/metrics`` passes query-string filters through and
+    answers 400 for an unknown filter.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    seen = []
+    def fake_metrics(filters):
+        seen.append(filters)
+        if "colour" in filters:
+            raise ValueError("Unknown filter 'colour'")
+        return {"total": 3}
+    monkeypatch.setattr(app.query_data, "query_metrics", fake_metrics)
+
+    resp = client.get("/api/metrics?university=stanford&term=Fall 2025")
+    assert resp.status_code == 200 and resp.get_json() == {"total": 3}
+    assert seen[0] == {"university": "stanford", "term": "Fall 2025"}
+
+    resp = client.get("/api/metrics?colour=red")
+    assert resp.status_code == 400 and "colour" in resp.get_json()["error"]
+
+@pytest.mark.web
+def test_metrics_api_approximate(client, monkeypatch):
+    """
+    Verify ``/api/metrics?approx=1`` estimates from a sample with the
+    requested size, seed and confidence, and rejects bad numbers.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    seen = []
+    def fake_approx(filters, sample_pct, seed, confidence):
+        seen.append((filters, sample_pct, seed, confidence))
+        return {"total": 1000, "intervals": {"total": [900, 1100]}}
+    monkeypatch.setattr(app.query_data, "approximate_metrics", fake_approx)
+
+    resp = client.get("/api/metrics?approx=1&term=Fall 2025&sample_pct=5&seed=3&confidence=0.9")
+    assert resp.status_code == 200 and resp.get_json()["intervals"]["total"] == [900, 1100]
+    assert seen[0] == ({"term": "Fall 2025"}, 5.0, 3, 0.9)
+
+    client.get("/api/metrics?approx=true")
+    assert seen[1] == ({}, app.query_data.APPROX_SAMPLE_PCT, None, 0.95)
+
+    assert client.get("/api/metrics?approx=1&sample_pct=lots").status_code == 400
+
+@pytest.mark.web
+def test_search_api(client, monkeypatch):
+    """
+    Verify ``/api/search`` splits paging arguments from filters and
+    answers 400 for bad input.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    seen = []
+    def fake_search(q, page=1, page_size=20, filters=None):
+        seen.append((q, page, page_size, filters))
+        if not q:
+            raise ValueError("Search text must not be empty")
+        return {"q": q, "hits": []}
+    monkeypatch.setattr(app.query_data, "search", fake_search)
+
+    resp = client.get("/api/search?q=robotics&page=2&page_size=5&term=Fall 2025")
+    assert resp.status_code == 200 and resp.get_json()["q"] == "robotics"
+    assert seen[0] == ("robotics", 2, 5, {"term": "Fall 2025"})
+
+    assert client.get("/api/search").status_code == 400
+    assert client.get("/api/search?q=x&page=two").status_code == 400
+
+@pytest.mark.web
+def test_applicants_api(client, monkeypatch):
+    """
+    Verify ``/api/applicants`` passes the cursor, limit, projection and
+    filters through, and answers 400 for bad input.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    seen = []
+    def fake_browse(after=None, limit=50, fields=None, filters=None):
+        seen.append((after, limit, fields, filters))
+        if limit > 500:
+            raise ValueError("limit must be between 1 and 500")
+        return {"rows": [], "next": None}
+    monkeypatch.setattr(app.query_data, "browse_applicants", fake_browse)
+
+    resp = client.get("/api/applicants?after=abc&limit=10&fields=program,status&term=Fall 2025")
+    assert resp.status_code == 200 and resp.get_json() == {"rows": [], "next": None}
+    assert seen[0] == ("abc", 10, ["program", "status"], {"term": "Fall 2025"})
+
+    assert client.get("/api/applicants").status_code == 200
+    assert seen[1] == (None, 50, None, {})
+    assert client.get("/api/applicants?limit=1000").status_code == 400
+
+@pytest.mark.web
+def test_export_streams_download(client, monkeypatch):
+    """
+    Verify ``/api/export`` streams the export chunks as a download and
+    answers 400 for bad input.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    seen = []
+    def fake_export(fmt, filters=None, gzip=False, fields=None):
+        seen.append((fmt, filters, gzip, fields))
+        if fmt == "xlsx":
+            raise ValueError("Unknown export format 'xlsx'")
+        return iter([b"p_id\n", b"1\n"])
+    monkeypatch.setattr(app.query_data, "export_rows", fake_export)
+
+    resp = client.get("/api/export?term=Fall 2025&fields=p_id")
+    assert resp.status_code == 200 and resp.data == b"p_id\n1\n"
+    assert resp.mimetype == "text/csv"
+    assert resp.headers["Content-Disposition"] == "attachment; filename=applicants.csv"
+    assert seen[0] == ("csv", {"term": "Fall 2025"}, False, ["p_id"])
+
+    resp = client.get("/api/export?format=ndjson&gzip=1")
+    assert resp.mimetype == "application/gzip"
+    assert resp.headers["Content-Disposition"].endswith("applicants.ndjson.gz")
+
+    resp = client.get("/api/export?format=parquet&gzip=1")
+    assert resp.mimetype == "application/vnd.apache.parquet"
+
+    assert client.get("/api/export?format=xlsx").status_code == 400
+
+@pytest.mark.web
+def test_query_stats_routes(client, admin, monkeypatch):
+    """
+    Verify ``/admin/query_stats`` lists the statement timings and the
+    explain route maps unknown and non-SELECT statements to 404 and 400.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    :param admin: Headers authorizing the admin routes.
+    :type admin: dict[str, str]
+    """
+    stats = app.query_data.QueryStats(slow_ms=0)
+    query_id = stats.record("SELECT 1 FROM applicants WHERE url = %s;", ("http://x",), 0.002, 1)
+    delete_id = stats.record("DELETE FROM applicants;", (), 0.002, 0)
+    monkeypatch.setattr(app.query_data, "QUERY_STATS", stats)
+    real_explain = stats.explain
+    monkeypatch.setattr(stats, "explain", lambda qid, analyze: ["Index Scan", f"analyze={analyze}"]
+                        if qid == query_id else real_explain(qid, analyze=analyze))
+
+    snap = client.get("/admin/query_stats", headers=admin).get_json()
+    assert {e["id"] for e in snap} == {query_id, delete_id} and snap[0]["calls"] == 1
+
+    plan = {"id": query_id, "plan": ["Index Scan", "analyze=False"]}
+    assert client.get(f"/admin/query_stats/{query_id}/explain", headers=admin).get_json() == plan
+    plan = client.get(f"/admin/query_stats/{query_id}/explain?analyze=1", headers=admin).get_json()
+    assert plan["plan"][1] == "analyze=True"
+    assert client.get(f"/admin/query_stats/{delete_id}/explain", headers=admin).status_code == 400
+    assert client.get("/admin/query_stats/nope/explain", headers=admin).status_code == 404
+
+@pytest.mark.web
+def test_admin_routes_need_token(client, monkeypatch):
+    """
+    Verify ``/admin/*`` is disabled without ``ADMIN_TOKEN`` and needs the
+    bearer token once it is set; other routes are unaffected.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    monkeypatch.setattr(app, "ADMIN_TOKEN", None)
+    assert client.get("/admin/query_stats").status_code == 404
+    monkeypatch.setattr(app, "ADMIN_TOKEN", "s3cret")
+    assert client.get("/admin/query_stats").status_code == 401
+    assert client.get("/admin/query_stats", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/admin/query_stats", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    assert client.get("/").status_code == 200
+
+@pytest.mark.web
+def test_replica_status_route(client, admin, monkeypatch):
+    """
+    Verify ``/admin/replica`` reports the read replica's state.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    :param admin: Headers authorizing the admin routes.
+    :type admin: dict[str, str]
+    """
+    monkeypatch.setattr(app.query_data, "REPLICA", app.query_data.ReplicaRouter(None))
+    assert client.get("/admin/replica", headers=admin).get_json() == {
+        "configured": False, "healthy": False, "lag_seconds": None, "error": None, "checked_seconds_ago": None,
+    }
+
+@pytest.mark.web
+def test_trends_api_and_chart(client, monkeypatch):
+    """
+    Verify ``/api/trends`` returns ISO-dated points, ``/trends`` draws them
+    as a chart, and both answer 400 for bad input.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    from datetime import date
+    seen = []
+    def fake_trends(interval="week", filters=None, group_by=None):
+        seen.append((interval, filters, group_by))
+        if interval == "day":
+            raise ValueError("Unknown interval 'day'")
+        if filters.get("degree") == "none":
+            return []
+        return [{"period": date(2025, 1, 1), "applications": 10, "accepted": 4},
+                {"period": date(2025, 2, 1), "applications": 5, "accepted": 1}]
+    monkeypatch.setattr(app.query_data, "trends", fake_trends)
+
+    resp = client.get("/api/trends?interval=month&group_by=degree&university=mit")
+    assert resp.status_code == 200
+    assert resp.get_json()[0] == {"period": "2025-01-01", "applications": 10, "accepted": 4}
+    assert seen[-1] == ("month", {"university": "mit"}, "degree")
+
+    html = client.get("/trends?degree=phd").get_data(as_text=True)
+    assert seen[-1] == ("month", {"degree": "phd"}, None)
+    assert 'points="0.0,0.0 800.0,100.0 "' in html and "15 applications" in html
+    assert "interval=year" in html and "degree=phd" in html
+    assert "No dated applications yet." in client.get("/trends?degree=none").get_data(as_text=True)
+
+    assert client.get("/api/trends?interval=day").status_code == 400
+    assert client.get("/trends?interval=day").status_code == 400
+
+@pytest.mark.web
+def test_cube_api(client, monkeypatch):
+    """
+    Verify ``/api/cube`` splits ``by``, passes the rest through as filters,
+    and answers 400 for bad input.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    seen = []
+    def fake_cube(by, filters=None, sort="n", limit=50):
+        seen.append((by, filters, sort, limit))
+        if limit == "0":
+            raise ValueError("limit must be between 1 and 500")
+        return [{"program": "Computer Science", "n": 3, "accepted": 1}]
+    monkeypatch.setattr(app.query_data, "cube", fake_cube)
+
+    resp = client.get("/api/cube?by=program,%20degree&university=mit&sort=acceptance_rate&limit=5")
+    assert resp.status_code == 200 and resp.get_json()[0]["n"] == 3
+    assert seen[-1] == (["program", "degree"], {"university": "mit"}, "acceptance_rate", "5")
+    client.get("/api/cube")
+    assert seen[-1] == ([], {}, "n", 50)
+    assert client.get("/api/cube?limit=0").status_code == 400
+
+@pytest.mark.web
+def test_distributions_api_and_chart(client, monkeypatch):
+    """
+    Verify ``/api/distributions`` and ``/distributions`` pass the segment
+    and filters through, draw one bar per bin, and answer 400 for bad input.
+
+    :param client: Flask test client.
+    :type client: flask.testing.FlaskClient
+    """
+    seen = []
+    def fake_distributions(segment=None, filters=None):
+        seen.append((segment, filters))
+        if segment == "shoe_size":
+            raise ValueError("Unknown segment 'shoe_size'")
+        if filters.get("term") == "never":
+            return {"segment": segment, "segments": []}
+        return {"segment": segment, "quantiles": [0.5], "segments": [{"segment": "PhD", "measures": {
+            "gpa": {"histogram": [{"low": 3.5, "high": 3.75, "n": 2}, {"low": 3.75, "high": 4.0, "n": 4}],
+                    "percentiles": {"p50": 3.8}}}}]}
+    monkeypatch.setattr(app.query_data, "get_distributions", fake_distributions)
+
+    resp = client.get("/api/distributions?segment=degree&term=Fall 2025")
+    assert resp.status_code == 200 and resp.get_json()["segments"][0]["segment"] == "PhD"
+    assert seen[-1] == ("degree", {"term": "Fall 2025"})
+
+    html = client.get("/distributions?segment=degree").get_data(as_text=True)
+    assert "GPA (degree: PhD)" in html and "p50 3.8" in html
+    assert 'style="width: 50.0%"' in html and 'style="width: 100.0%"' in html
+    assert "No applicants match." in client.get("/distributions?term=never").get_data(as_text=True)
+
+    assert client.get("/api/distributions?segment=shoe_size").status_code == 400
+    assert client.get("/distributions?segment=shoe_size").status_code == 400
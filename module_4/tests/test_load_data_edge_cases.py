@@ -192,3 +192,51 @@ def test_main_db_push(tmp_path, monkeypatch, capsys):
 
     # Make sure two rows exist
     assert len(execs["rows"]) == 2
+
+@pytest.mark.db
+def test_main_copy_backend(tmp_path, monkeypatch, capsys):
+    """
+    Verify :func:`ld.main` with ``backend="copy"``.
+
+    - Rows are written to the staging table with one ``COPY``.
+    - They reach ``applicants`` through a single ``INSERT ... SELECT``.
+    - ``executemany`` is not used.
+    - Unknown backends are rejected with ``ValueError``.
+    """
+    p = tmp_path / "data.jsonl"
+    p.write_text("\n".join(json.dumps({"url": f"http://site/{n}"}) for n in range(1, 6)),
+                 encoding="utf-8")
+
+    log = []
+
+    class DummyCopy:
+        def write_row(self, row): log.append(("row", row[0]))
+        def __enter__(self): return self
+        def __exit__(self, *a): return False
+
+    class DummyConn:
+        def cursor(self, *a, **k): return DummyCursor()
+        def commit(self): pass
+        def __enter__(self): return self
+        def __exit__(self, *a): return False
+
+    class DummyCursor:
+        def execute(self, sql, params=None):
+            if "applicants_staging" in sql:
+                log.append(sql)
+        def executemany(self, sql, rows): log.append("executemany")
+        def copy(self, sql):
+            log.append(sql)
+            return DummyCopy()
+        def __enter__(self): return self
+        def __exit__(self, *a): return False
+
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn())
+
+    ld.main(str(p), backend="copy")
+    assert "Pushed 5 rows into applicants." in capsys.readouterr().out
+    assert log == [ld.CREATE_STAGING_SQL, "TRUNCATE applicants_staging;", ld.COPY_STAGING_SQL,
+                   *[("row", n) for n in range(1, 6)], ld.INSERT_STAGED_SQL]
+
+    with pytest.raises(ValueError):
+        ld.main(str(p), backend="carrier-pigeon")
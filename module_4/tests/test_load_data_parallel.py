@@ -0,0 +1,155 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import src.load_data as ld
+
+
+class DummyCursor:
+    """
+    Dummy cursor that records statements, ``CREATE TABLE`` calls and
+    inserted batches into a shared log.
+    """
+    def __init__(self, log):
+        self.log = log
+    def execute(self, sql, params=None):
+        self.log["sql"].append(" ".join((sql or "").split()))
+        if "create table if not exists applicants" in (sql or "").lower():
+            self.log["create"] += 1
+    def executemany(self, sql, rows):
+        self.log["batches"].append(list(rows))
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+class DummyConn:
+    """
+    Dummy connection handing out :class:`DummyCursor` objects and counting commits.
+    """
+    def __init__(self, log):
+        self.log = log
+    def cursor(self, *a, **k): return DummyCursor(self.log)
+    def commit(self): self.log["commits"] += 1
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+@pytest.fixture
+def log(monkeypatch):
+    """
+    Patch :func:`ld.connect` with a dummy connection and run the worker
+    pool on threads so the workers see the patch.
+
+    :param monkeypatch: Pytest fixture for patching dependencies.
+    :type monkeypatch: _pytest.monkeypatch.MonkeyPatch
+    :return: Shared log of creates, commits and inserted batches.
+    :rtype: dict
+    """
+    log = {"create": 0, "commits": 0, "batches": [], "sql": []}
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn(log))
+    monkeypatch.setattr(ld, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return log
+
+
+@pytest.mark.db
+def test_partition_items_by_p_id_range():
+    """
+    Verify :func:`ld.partition_items` splits items into sorted, disjoint ranges.
+
+    - Items are ordered by the ``p_id`` derived from their URL.
+    - Partition sizes differ by at most one item.
+    - The original 1-based file position is kept for each item.
+    """
+    items = [{"url": f"http://site/{n}"} for n in (9, 3, 7, 1, 5)]
+    parts = ld.partition_items(items, 2)
+
+    assert len(parts) == 2
+    keys = [[ld.derive_p_id(item, idx) for idx, item in part] for part in parts]
+    assert keys == [[1, 3, 5], [7, 9]]
+    assert parts[0][0] == (4, {"url": "http://site/1"})
+
+    assert ld.partition_items([], 4) == []
+
+
+@pytest.mark.db
+def test_derive_p_id_fallbacks():
+    """
+    Verify :func:`ld.derive_p_id` falls back to the record's ``p_id`` then the index.
+    """
+    assert ld.derive_p_id({"applicant_URL": "http://site/12/"}, 1) == 12
+    assert ld.derive_p_id({"url": "http://site/abc", "p_id": "8"}, 1) == 8
+    assert ld.derive_p_id({}, 3) == 3
+
+
+@pytest.mark.db
+def test_load_partition_batches(log):
+    """
+    Verify :func:`ld.load_partition` inserts in batches and commits once,
+    with the rollup triggers deferred for its transaction.
+    """
+    part = [(i, {"url": f"http://site/{i}"}) for i in range(1, 6)]
+    summary = ld.load_partition(part, batch_size=2)
+
+    assert log["sql"] == [ld.DEFER_ROLLUPS_SQL]
+    assert "set_config('applicants.defer_rollups', 'on', true)" in ld.DEFER_ROLLUPS_SQL
+
+    assert [len(b) for b in log["batches"]] == [2, 2, 1]
+    assert log["commits"] == 1
+    assert summary["rows"] == 5
+    assert (summary["min_p_id"], summary["max_p_id"]) == (1, 5)
+
+
+@pytest.mark.db
+@pytest.mark.integration
+def test_main_with_workers_loads_all_partitions(tmp_path, log, capsys):
+    """
+    Verify :func:`ld.main` with ``workers > 1`` delegates to :func:`ld.load_parallel`.
+
+    - The table is created exactly once by the parent.
+    - Every row is inserted by exactly one worker.
+    - The deferred rollups are rebuilt once, after the workers.
+    - A per-partition and total summary is printed.
+    """
+    p = tmp_path / "data.jsonl"
+    p.write_text("\n".join(json.dumps({"url": f"http://site/{n}"}) for n in range(1, 8)),
+                 encoding="utf-8")
+
+    ld.main(str(p), workers=3)
+    out = capsys.readouterr().out
+
+    assert log["create"] == 1
+    inserted = sorted(row[0] for batch in log["batches"] for row in batch)
+    assert inserted == list(range(1, 8))
+    assert log["sql"].count(ld.DEFER_ROLLUPS_SQL) == 3
+    rebuild = log["sql"].index("LOCK TABLE applicant_weekly IN EXCLUSIVE MODE;")
+    assert log["sql"][rebuild + 1] == "DELETE FROM applicant_weekly;"
+    assert log["sql"][rebuild + 2].startswith("INSERT INTO applicant_weekly")
+    assert rebuild > max(i for i, stmt in enumerate(log["sql"]) if stmt == ld.DEFER_ROLLUPS_SQL)
+    assert "partition 0: p_id 1-3" in out
+    assert "Pushed 7 rows into applicants using 3 workers" in out
+
+
+@pytest.mark.db
+def test_load_parallel_empty_file(tmp_path, log, capsys):
+    """
+    Verify :func:`ld.load_parallel` handles an empty file without starting workers.
+    """
+    p = tmp_path / "empty.jsonl"
+    p.write_text("", encoding="utf-8")
+
+    assert ld.load_parallel(str(p), workers=2) == []
+    assert "Pushed 0 rows" in capsys.readouterr().out
+
+
+@pytest.mark.db
+def test_load_parallel_rebuilds_rollups_when_a_worker_fails(tmp_path, log, monkeypatch):
+    """
+    Verify the rollups are rebuilt even when a worker fails, so rows the
+    other workers committed are counted.
+    """
+    p = tmp_path / "data.jsonl"
+    p.write_text(json.dumps({"url": "http://site/1"}), encoding="utf-8")
+    monkeypatch.setattr(ld, "load_partition", lambda part, batch_size: 1 / 0)
+
+    with pytest.raises(ZeroDivisionError):
+        ld.load_parallel(str(p), workers=2)
+    assert "DELETE FROM applicant_weekly;" in log["sql"]
@@ -0,0 +1,261 @@
+import json
+from datetime import date
+import pytest
+import src.load_data as ld
+
+
+class DummyCursor:
+    """
+    Dummy cursor that logs every SQL statement and answers the catalog
+    queries used by :func:`ld.migrate_to_partitioned`.
+    """
+    def __init__(self, log, relkind=("r",), years=()):
+        self.log = log
+        self.relkind = relkind
+        self.years = years
+        self.result = None
+        self.rowcount = 0
+    def execute(self, sql, params=None):
+        self.log.append(" ".join(sql.split()))
+        s = sql.lower()
+        if "select relkind" in s:
+            self.result = [self.relkind] if self.relkind else []
+        elif "select distinct extract(year" in s:
+            self.result = [(y,) for y in self.years]
+        elif s.startswith("insert into applicants (") and "select" in s:
+            self.rowcount = 3
+    def executemany(self, sql, rows):
+        self.log.append(f"executemany {len(list(rows))}")
+    def fetchone(self):
+        return self.result[0] if self.result else None
+    def fetchall(self):
+        return self.result
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+class DummyConn:
+    def __init__(self, cursor):
+        self.cur = cursor
+        self.commits = 0
+    def cursor(self, *a, **k): return self.cur
+    def commit(self): self.commits += 1
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+@pytest.fixture
+def partitioned(monkeypatch):
+    """
+    Enable the partitioned layout for the duration of a test.
+    """
+    monkeypatch.setattr(ld, "PARTITIONED", True)
+
+
+@pytest.mark.db
+def test_insert_sql_per_layout(monkeypatch):
+    """
+    Verify :func:`ld.insert_sql` picks the statement for the configured layout.
+
+    - The plain layout names ``p_id`` as its conflict target.
+    - The partitioned layout has no conflict clause; the ``applicant_ids``
+      trigger created with the table drops duplicate p_ids instead.
+    """
+    assert ld.insert_sql() == ld.INSERT_SQL and "ON CONFLICT (p_id) DO NOTHING" in ld.INSERT_SQL
+    assert ld.insert_sql(staged=True) == ld.INSERT_STAGED_SQL
+    assert "ON CONFLICT (p_id) DO NOTHING" in ld.INSERT_STAGED_SQL
+
+    monkeypatch.setattr(ld, "PARTITIONED", True)
+    assert ld.insert_sql() == ld.PARTITIONED_INSERT_SQL
+    assert ld.insert_sql(staged=True) == ld.PARTITIONED_INSERT_STAGED_SQL
+    assert "ON CONFLICT" not in ld.PARTITIONED_INSERT_SQL + ld.PARTITIONED_INSERT_STAGED_SQL
+    assert "BEFORE INSERT ON applicants" in ld.CREATE_PARTITIONED_TABLE_SQL
+
+
+@pytest.mark.db
+def test_ensure_table_and_partitions_plain_layout():
+    """
+    Verify the plain layout creates the original table and no partitions.
+    """
+    log = []
+    cur = DummyCursor(log)
+    ld.ensure_table(cur)
+    assert ld.ensure_partitions(cur, [(1, None, None, date(2025, 1, 1))]) == []
+    assert len(log) == 6 and "PARTITION" not in log[0]
+    assert "CREATE TABLE IF NOT EXISTS applicant_rollups" in log[1]
+    assert "ADD COLUMN search_tsv tsvector GENERATED ALWAYS" in log[2]
+    assert "applicants_browse ON applicants ((COALESCE(date_added, '-infinity'::date)), p_id)" in log[3]
+    assert "CREATE TABLE IF NOT EXISTS applicant_weekly" in log[4]
+    assert "CREATE MATERIALIZED VIEW IF NOT EXISTS applicant_cube" in log[5]
+
+
+@pytest.mark.db
+def test_ensure_partitions_creates_one_per_year(partitioned):
+    """
+    Verify :func:`ld.ensure_partitions` creates each needed yearly partition once.
+
+    - Undated rows need no partition (they go to the default one).
+    - Partition creation is guarded by an advisory lock.
+    """
+    log = []
+    cur = DummyCursor(log)
+    ld.ensure_table(cur)
+    assert "PARTITION BY RANGE (date_added)" in log[0]
+
+    rows = [(1, None, None, date(2025, 2, 1)), (2, None, None, date(2024, 9, 1)),
+            (3, None, None, date(2025, 3, 1)), (4, None, None, None)]
+    assert ld.ensure_partitions(cur, rows) == [2024, 2025]
+    lock = next(i for i, stmt in enumerate(log) if "hashtext('applicants_partitions')" in stmt)
+    assert "applicants_y2024 PARTITION OF applicants FOR VALUES FROM ('2024-01-01') TO ('2025-01-01')" in log[lock + 1]
+    assert "applicants_y2025" in log[lock + 2]
+
+    assert ld.ensure_partitions(cur, [(5, None, None, None)]) == []
+
+
+@pytest.mark.db
+@pytest.mark.integration
+def test_main_routes_rows_into_partitions(tmp_path, monkeypatch, partitioned, capsys):
+    """
+    Verify :func:`ld.main` creates the partitions for the file's years before inserting.
+    """
+    p = tmp_path / "data.jsonl"
+    p.write_text("\n".join(json.dumps(x) for x in [
+        {"url": "http://site/1", "date_added": "02/03/2024"},
+        {"url": "http://site/2", "date_added": "02/03/2025"},
+    ]), encoding="utf-8")
+    log = []
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn(DummyCursor(log)))
+
+    ld.main(str(p))
+    assert "Pushed 2 rows" in capsys.readouterr().out
+    created = [s for s in log if "PARTITION OF applicants FOR VALUES" in s]
+    assert len(created) == 2
+    assert log.index(created[-1]) < log.index("executemany 2")
+
+
+@pytest.mark.db
+def test_load_partition_commits_partitions_first(monkeypatch, partitioned):
+    """
+    Verify a parallel worker commits partition creation before its inserts.
+    """
+    log = []
+    conn = DummyConn(DummyCursor(log))
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: conn)
+
+    ld.load_partition([(1, {"url": "http://site/1", "date_added": "02/03/2025"})])
+    assert conn.commits == 2
+
+
+@pytest.mark.db
+def test_migrate_to_partitioned(monkeypatch, capsys):
+    """
+    Verify :func:`ld.migrate_to_partitioned` renames, copies and drops in order,
+    and is a no-op for a table that is already partitioned or missing.
+    """
+    log = []
+    conn = DummyConn(DummyCursor(log, years=(2024, 2025)))
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: conn)
+
+    assert ld.migrate_to_partitioned() == 3
+    assert not any("DROP MATERIALIZED VIEW IF EXISTS applicants_summary" in stmt for stmt in log)
+    assert not any("applicant_cube" in stmt for stmt in log[:-1])  # Reads the rollup, not the old table
+    assert log[1] == "DROP INDEX IF EXISTS applicants_browse;"
+    assert log[2] == "ALTER TABLE applicants RENAME TO applicants_unpartitioned;"
+    assert "PARTITION BY RANGE" in log[3]
+    assert "TRUNCATE applicant_rollups" in log[4]          # rollup rebuilt for the new table
+    assert any("CREATE INDEX IF NOT EXISTS applicants_browse" in stmt for stmt in log[5:])
+    assert any("applicants_y2025" in s for s in log)
+    drop = log.index("DROP TABLE applicants_unpartitioned;")
+    assert log[drop - 1].startswith("INSERT INTO applicants (p_id")
+    assert "REFRESH MATERIALIZED VIEW CONCURRENTLY applicants_summary" in log[-2]   # summary rebuilt on the new table
+    assert log[-1] == "REFRESH MATERIALIZED VIEW CONCURRENTLY applicant_cube;"
+    assert conn.commits == 2
+    assert "Migrated 3 rows" in capsys.readouterr().out
+
+    for relkind in (("p",), None):
+        log.clear()
+        conn = DummyConn(DummyCursor(log, relkind=relkind))
+        monkeypatch.setattr(ld, "connect", lambda dsn=None: conn)
+        assert ld.migrate_to_partitioned("fake_dsn") == 0
+        assert len(log) == 1
+
+
+@pytest.mark.db
+def test_rollup_fed_by_statement_trigger():
+    """
+    Verify the rollup is maintained from the inserted rows only.
+
+    - The trigger is statement-level and reads the ``NEW TABLE`` transition table.
+    - A full rebuild from ``applicants`` only happens when the trigger is first attached.
+    - Every rollup measure keeps a count, a sum and a sum of squares.
+    """
+    sql = ld.CREATE_ROLLUP_SQL
+    assert "REFERENCING NEW TABLE AS new_rows" in sql and "FOR EACH STATEMENT" in sql
+    assert "FROM new_rows" in sql.split("DO $$")[0]
+    rebuild = sql.split("DO $$")[1]
+    assert "FROM applicants\n" in rebuild and rebuild.index("TRUNCATE") < rebuild.index("CREATE TRIGGER")
+    assert ld.rollup_measure_cols[:3] == ["gpa_n", "gpa_sum", "gpa_sumsq"]
+    assert "gre_aw_sumsq = applicant_rollups.gre_aw_sumsq + EXCLUDED.gre_aw_sumsq" in sql
+    assert ld.SKIP_IF_DEFERRED in sql.split("DO $$")[0]           # Skipped during parallel loads
+    assert list(ld.DEFERRED_ROLLUPS)[0] == "applicant_rollups"   # Rebuilt before the summary reads it
+
+
+@pytest.mark.db
+def test_weekly_rollup_fed_by_statement_trigger():
+    """
+    Verify the weekly trend rollup is keyed by week start and fed from the inserted rows.
+
+    - Each decision column counts its status substring.
+    - Undated rows are left out.
+    - A full rebuild only happens when the trigger is first attached, or
+      after a parallel load deferred the trigger.
+    """
+    sql = ld.CREATE_WEEKLY_ROLLUP_SQL
+    incremental, rebuild = sql.split("DO $$")
+    assert "FROM new_rows" in incremental and "REFERENCING NEW TABLE AS new_rows" in rebuild
+    assert "date_trunc('week', date_added)::date" in incremental and "WHERE date_added IS NOT NULL" in incremental
+    assert ld.SKIP_IF_DEFERRED in incremental.split("BEGIN")[1]      # Skipped during parallel loads
+    assert ld.DEFERRED_ROLLUPS["applicant_weekly"].strip().endswith("waitlisted = applicant_weekly.waitlisted + EXCLUDED.waitlisted;")
+    assert "COUNT(*) FILTER (WHERE status ILIKE '%wait%')" in incremental
+    assert "PRIMARY KEY (week, degree, llm_generated_university)" in incremental
+    assert "FROM applicants\n" in rebuild and rebuild.index("TRUNCATE") < rebuild.index("CREATE TRIGGER")
+    assert "waitlisted = applicant_weekly.waitlisted + EXCLUDED.waitlisted" in sql
+
+
+@pytest.mark.db
+def test_cube_rebuilt_after_load_not_per_insert():
+    """
+    Verify the cube is a materialized view over every grouping of university,
+    program and degree, summed from the rollup buckets rather than
+    ``applicants``, and that no insert trigger feeds it.
+
+    - ``GROUPING(...)`` is part of the unique key, so a summed-over dimension
+      and a missing value (both stored as ``''``) stay apart.
+    """
+    sql = ld.CREATE_CUBE_SQL
+    assert "CREATE MATERIALIZED VIEW IF NOT EXISTS applicant_cube AS" in sql
+    assert "FROM applicant_rollups\nGROUP BY CUBE (llm_generated_university, llm_generated_program, degree)" in sql
+    assert "SELECT GROUPING(llm_generated_university, llm_generated_program, degree) AS grouping_id" in sql
+    assert "COALESCE(SUM(n) FILTER (WHERE status ILIKE '%accept%'), 0)::bigint AS accepted" in sql
+    assert ("UNIQUE INDEX IF NOT EXISTS applicant_cube_key ON applicant_cube "
+            "(grouping_id, llm_generated_university, llm_generated_program, degree)") in sql
+    assert "applicants" not in sql.replace("applicant_rollups", "")
+    assert "CREATE TRIGGER" not in sql and "DROP" not in sql
+
+
+@pytest.mark.db
+def test_ensure_filter_indexes(monkeypatch, capsys):
+    """
+    Verify :func:`ld.ensure_filter_indexes` indexes every structured filter column.
+    """
+    log = []
+    conn = DummyConn(DummyCursor(log))
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: conn)
+
+    ld.ensure_filter_indexes()
+    assert conn.commits == 1
+    assert log[0].startswith("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for column in ld.query_data.FILTER_COLUMNS.values():
+        assert f"USING gin ({column} gin_trgm_ops)" in log[0]
+    assert "ON applicants (date_added)" in log[0]
+    assert "Filter indexes are in place." in capsys.readouterr().out
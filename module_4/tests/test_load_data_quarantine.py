@@ -0,0 +1,127 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import src.load_data as ld
+
+
+class DummyCursor:
+    def __init__(self, inserted):
+        self.inserted = inserted
+    def execute(self, sql, params=None): pass
+    def executemany(self, sql, rows): self.inserted.extend(rows)
+    def fetchone(self): return None
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+class DummyConn:
+    def __init__(self, inserted):
+        self.inserted = inserted
+    def cursor(self, *a, **k): return DummyCursor(self.inserted)
+    def commit(self): pass
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    """
+    Patch :func:`ld.connect` so inserted rows are collected in a list.
+
+    :param monkeypatch: Pytest fixture for patching dependencies.
+    :type monkeypatch: _pytest.monkeypatch.MonkeyPatch
+    :return: List that receives every inserted row.
+    :rtype: list[tuple]
+    """
+    rows = []
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn(rows))
+    monkeypatch.setattr(ld, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return rows
+
+
+@pytest.fixture
+def messy_file(tmp_path):
+    """
+    JSON-lines file with one truncated line and one record that
+    :func:`ld.extract_data` cannot handle (non-numeric ``p_id``).
+    """
+    p = tmp_path / "LLM_messy.jsonl"
+    p.write_text(
+        '{"url": "http://site/1"}\n'
+        '{"url": "http://site/2", "program": "trunc\n'
+        '{"url": "http://site/x", "p_id": "abc"}\n'
+        '{"url": "http://site/4"}\n',
+        encoding="utf-8",
+    )
+    return p
+
+
+def _rejects(path):
+    return [json.loads(l) for l in open(f"{path}.rejects.jsonl", encoding="utf-8")]
+
+
+@pytest.mark.db
+def test_read_items_quarantines_bad_lines(messy_file):
+    """
+    Verify :func:`ld.read_items` only raises on bad lines without a quarantine.
+
+    - Without a quarantine the malformed line still raises.
+    - With one, the good lines are returned and the bad line is recorded
+      with its line number and reason.
+    """
+    with pytest.raises(json.JSONDecodeError):
+        ld.read_items(str(messy_file))
+
+    q = ld.Quarantine(ld.dead_letter_path(str(messy_file)))
+    items = ld.read_items(str(messy_file), q)
+    q.close()
+
+    assert len(items) == 3
+    assert q.counts == {"unparseable": 1, "extract_failed": 0}
+    rejects = _rejects(messy_file)
+    assert rejects[0]["line"] == 2 and rejects[0]["kind"] == "unparseable"
+    assert "trunc" in rejects[0]["record"]
+
+
+@pytest.mark.db
+@pytest.mark.integration
+def test_main_loads_good_rows_and_quarantines_bad(messy_file, inserted, capsys):
+    """
+    Verify :func:`ld.main` loads the good rows and reports quarantined ones.
+    """
+    ld.main(str(messy_file))
+    out = capsys.readouterr().out
+
+    assert sorted(r[0] for r in inserted) == [1, 4]
+    assert "Pushed 2 rows into applicants." in out
+    assert "Quarantined 2 records (1 unparseable, 1 failed extract_data)" in out
+    kinds = sorted(r["kind"] for r in _rejects(messy_file))
+    assert kinds == ["extract_failed", "unparseable"]
+
+
+@pytest.mark.db
+def test_streaming_and_parallel_quarantine(messy_file, inserted, tmp_path, capsys):
+    """
+    Verify the streaming and parallel loaders quarantine instead of failing.
+    """
+    dl = tmp_path / "dead.jsonl"
+    assert ld.load_streaming(str(messy_file), dead_letter=str(dl)) == 2
+    assert "Quarantined 2 records" in capsys.readouterr().out
+    assert [json.loads(l)["line"] for l in dl.read_text().splitlines()] == [2, 3]
+
+    inserted.clear()
+    ld.main(str(messy_file), workers=2, dead_letter=str(tmp_path / "par.jsonl"))
+    out = capsys.readouterr().out
+    assert sorted(r[0] for r in inserted) == [1, 4]
+    assert "Quarantined 2 records" in out
+
+
+@pytest.mark.db
+def test_load_partition_all_rejected(inserted):
+    """
+    Verify a partition whose records all fail still returns a summary.
+    """
+    summary = ld.load_partition([(1, "not a dict")])
+    assert summary["rows"] == 0 and summary["min_p_id"] is None
+    assert summary["rejects"][0][0] == 1
+    assert "AttributeError" in summary["rejects"][0][1]
@@ -0,0 +1,192 @@
+import json
+import pytest
+import src.load_data as ld
+
+
+class FakeDB:
+    """
+    In-memory stand-in for the ``applicants`` and ``load_checkpoints`` tables.
+
+    - Stores inserted rows keyed by ``p_id``.
+    - Keeps one checkpoint per source file.
+    - Optionally raises after a given number of commits to simulate a crash.
+    """
+    def __init__(self, fail_after_commits=None):
+        self.rows = {}
+        self.checkpoints = {}
+        self.commits = 0
+        self.fail_after_commits = fail_after_commits
+        self.pending = []
+
+
+class DummyCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+    def execute(self, sql, params=None):
+        s = sql.lower()
+        if "select line_offset, prefix_hash from load_checkpoints" in s:
+            self.result = self.db.checkpoints.get(params[0])
+        elif "delete from load_checkpoints" in s:
+            self.db.pending.append(("drop", params))
+        elif "insert into load_checkpoints" in s:
+            self.db.pending.append(("checkpoint", params))
+    def executemany(self, sql, rows):
+        self.db.pending.append(("rows", list(rows)))
+    def fetchone(self):
+        return self.result
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+class DummyConn:
+    def __init__(self, db):
+        self.db = db
+    def cursor(self, *a, **k): return DummyCursor(self.db)
+    def commit(self):
+        if self.db.fail_after_commits is not None and self.db.commits >= self.db.fail_after_commits:
+            raise RuntimeError("connection lost")
+        for kind, payload in self.db.pending:
+            if kind == "rows":
+                for r in payload:
+                    self.db.rows.setdefault(r[0], r)
+            elif kind == "drop":
+                self.db.checkpoints.pop(payload[0], None)
+            else:
+                source, offset, prefix_hash, _n = payload
+                self.db.checkpoints[source] = (offset, prefix_hash)
+        self.db.pending = []
+        self.db.commits += 1
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+def _write_jsonl(path, n, start=1):
+    path.write_text("\n".join(json.dumps({"url": f"http://site/{i}"}) for i in range(start, start + n)),
+                    encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.db
+def test_iter_items_streams_and_skips(tmp_path):
+    """
+    Verify :func:`ld.iter_items` yields line numbers and honours ``start_line``.
+
+    - Blank lines are skipped but still counted.
+    - Whole-document JSON falls back to item positions.
+    - Empty files yield nothing.
+    """
+    p = tmp_path / "data.jsonl"
+    p.write_text('{"a": 1}\n\n{"b": 2}\n{"c": 3}\n', encoding="utf-8")
+    assert list(ld.iter_items(str(p))) == [(1, {"a": 1}), (3, {"b": 2}), (4, {"c": 3})]
+    assert list(ld.iter_items(str(p), start_line=3)) == [(4, {"c": 3})]
+
+    doc = tmp_path / "doc.json"
+    doc.write_text(json.dumps({"items": [{"x": 1}, {"y": 2}]}), encoding="utf-8")
+    assert list(ld.iter_items(str(doc), start_line=1)) == [(2, {"y": 2})]
+
+    pretty = tmp_path / "pretty.json"
+    pretty.write_text(json.dumps([{"x": 1}], indent=2), encoding="utf-8")
+    assert list(ld.iter_items(str(pretty))) == [(1, {"x": 1})]
+
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("", encoding="utf-8")
+    assert list(ld.iter_items(str(empty))) == []
+
+
+@pytest.mark.db
+def test_load_streaming_commits_in_batches(tmp_path, monkeypatch, capsys):
+    """
+    Verify :func:`ld.load_streaming` commits each batch with its checkpoint.
+
+    - Seven rows with ``batch_size=3`` give three data commits.
+    - The checkpoint ends at the last line of the file.
+    - Progress with rows/sec is printed for full batches.
+    """
+    db = FakeDB()
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn(db))
+    path = _write_jsonl(tmp_path / "data.jsonl", 7)
+
+    assert ld.load_streaming(path, batch_size=3) == 7
+    out = capsys.readouterr().out
+
+    assert sorted(db.rows) == list(range(1, 8))
+    assert db.checkpoints[path][0] == 7
+    assert db.commits == 1 + 3 + 1      # schema commit + three batches + summary refresh
+    assert "committed 3 rows (through line 3)" in out
+    assert "rows/sec" in out
+    assert "Pushed 7 rows into applicants" in out
+
+
+@pytest.mark.db
+@pytest.mark.integration
+def test_load_streaming_resumes_after_failure(tmp_path, monkeypatch, capsys):
+    """
+    Verify a crashed streaming load resumes from the last committed line.
+
+    - The first run fails while committing its second batch.
+    - Only the first batch and its checkpoint survive.
+    - The second run skips the committed lines and loads the rest.
+    - ``resume=False`` starts again from line 1.
+    """
+    db = FakeDB(fail_after_commits=2)
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn(db))
+    path = _write_jsonl(tmp_path / "data.jsonl", 5)
+
+    with pytest.raises(RuntimeError):
+        ld.load_streaming(path, batch_size=2)
+    assert sorted(db.rows) == [1, 2]
+    assert db.checkpoints[path][0] == 2
+
+    db.fail_after_commits = None
+    db.pending = []
+    assert ld.load_streaming(path, batch_size=2) == 3
+    assert "Resuming" in capsys.readouterr().out
+    assert sorted(db.rows) == [1, 2, 3, 4, 5]
+    assert db.checkpoints[path][0] == 5
+
+    assert ld.load_streaming(path, batch_size=10, resume=False) == 5
+
+
+@pytest.mark.db
+def test_load_streaming_uses_selected_backend(tmp_path, monkeypatch):
+    """
+    Verify :func:`ld.load_streaming` hands each batch to the chosen backend.
+    """
+    db = FakeDB()
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn(db))
+    seen = []
+    monkeypatch.setitem(ld.INSERT_BACKENDS, "copy", lambda cur, rows: seen.append(len(rows)))
+    path = _write_jsonl(tmp_path / "data.jsonl", 5)
+
+    assert ld.load_streaming(path, batch_size=2, backend="copy") == 5
+    assert seen == [2, 2, 1]
+    assert db.checkpoints[path][0] == 5
+
+
+@pytest.mark.db
+def test_load_streaming_reloads_rewritten_file(tmp_path, monkeypatch, capsys):
+    """
+    Verify a checkpoint only applies to the file contents it was taken from.
+
+    - A file regenerated under the same path (new, shorter contents) is
+      loaded from line 1 instead of being skipped.
+    - A file that was only appended to resumes after the checkpoint.
+    """
+    db = FakeDB()
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: DummyConn(db))
+    path = _write_jsonl(tmp_path / "data.jsonl", 5)
+    assert ld.load_streaming(path, batch_size=2) == 5
+
+    _write_jsonl(tmp_path / "data.jsonl", 3, start=101)
+    assert ld.load_streaming(path, batch_size=2) == 3
+    assert "changed since its checkpoint" in capsys.readouterr().out
+    assert sorted(db.rows) == [1, 2, 3, 4, 5, 101, 102, 103]
+    assert db.checkpoints[path][0] == 3
+
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write("\n" + json.dumps({"url": "http://site/106"}))
+    assert ld.load_streaming(path, batch_size=2) == 1
+    assert "Resuming" in capsys.readouterr().out
+    assert 106 in db.rows
+    assert db.checkpoints[path][0] == 4
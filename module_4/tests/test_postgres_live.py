@@ -0,0 +1,318 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import types
+import uuid
+import psycopg
+import pytest
+from psycopg.conninfo import make_conninfo
+import db
+import src.load_data as ld
+import src.query_data as qd
+import src.scrape as scrape
+
+# These tests run against a real PostgreSQL server, each in a scratch schema that is
+# dropped afterwards, e.g. TEST_DATABASE_URL="host=localhost dbname=applicants_test user=postgres".
+# They are skipped when the variable is not set.
+LIVE_DSN = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = [pytest.mark.db, pytest.mark.skipif(not LIVE_DSN, reason="TEST_DATABASE_URL is not set")]
+
+
+@pytest.fixture
+def live_dsn(monkeypatch):
+    """
+    Point the loader and both copies of :mod:`query_data` at a fresh schema.
+
+    :return: Connection string whose ``search_path`` is the scratch schema.
+    :rtype: str
+    """
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    with psycopg.connect(LIVE_DSN, autocommit=True) as conn:
+        conn.execute(f"CREATE SCHEMA {schema}")
+    dsn = make_conninfo(LIVE_DSN, options=f"-c search_path={schema}")
+    for mod in (ld, qd, ld.query_data):
+        monkeypatch.setattr(mod, "DSN", dsn)
+    yield dsn
+    db.close_pools()
+    with psycopg.connect(LIVE_DSN, autocommit=True) as conn:
+        conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+def write_items(path, count, start=1):
+    """
+    Write ``count`` synthetic applicants spread over many rollup buckets.
+    """
+    rnd = random.Random(start)
+    with open(path, "w", encoding="utf-8") as fh:
+        for p_id in range(start, start + count):
+            fh.write(json.dumps({
+                "p_id": p_id, "url": f"https://www.thegradcafe.com/result/{p_id}",
+                "term": rnd.choice(["Fall 2024", "Fall 2025", "Spring 2025"]),
+                "status": rnd.choice(["Accepted", "Rejected", "Wait listed"]),
+                "US/International": rnd.choice(["American", "International"]),
+                "gpa": f"{rnd.uniform(2.5, 4.0):.2f}",
+                "Degree": rnd.choice(["Masters", "PhD"]),
+                "llm_generated_program": rnd.choice(["Computer Science", "Physics", "History", "Biology"]),
+                "llm_generated_university": rnd.choice(["MIT", "Stanford", "Johns Hopkins", "Georgetown", "Yale"]),
+                "date_added": f"{rnd.randint(1, 12):02d}/{rnd.randint(1, 28):02d}/2024",
+            }) + "\n")
+
+
+def totals(dsn):
+    """
+    Row count of ``applicants`` next to the totals its rollups and cube hold.
+    """
+    with psycopg.connect(dsn) as conn:
+        return conn.execute("""
+            SELECT (SELECT COUNT(*) FROM applicants),
+                   (SELECT SUM(n) FROM applicant_rollups),
+                   (SELECT SUM(n) FROM applicant_weekly),
+                   (SELECT n FROM applicant_cube WHERE grouping_id = 7)
+        """).fetchone()
+
+
+@pytest.mark.integration
+def test_parallel_load_keeps_rollups_exact(live_dsn, tmp_path, capsys):
+    """
+    Verify a four-worker load into shared rollup buckets completes without
+    deadlocks and leaves every rollup equal to the table.
+
+    - The workers defer the rollup triggers; the rollups are rebuilt once.
+    - The deferral is transaction-local: a later serial load is counted by the triggers.
+    - Every cube cell, refreshed from the rollup, matches a cube of the table.
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 3000)
+    summaries = ld.load_parallel(str(path), workers=4, batch_size=50)
+    assert sum(s["rows"] for s in summaries) == 3000
+    assert totals(live_dsn) == (3000, 3000, 3000, 3000)
+
+    write_items(path, 5, start=3001)
+    ld.main(str(path))
+    assert totals(live_dsn) == (3005, 3005, 3005, 3005)
+    assert "Pushed 5 rows" in capsys.readouterr().out
+
+    cells = """
+        SELECT GROUPING(llm_generated_university, llm_generated_program, degree),
+               COALESCE(llm_generated_university, ''), COALESCE(llm_generated_program, ''),
+               COALESCE(degree, ''), COUNT(*), COUNT(*) FILTER (WHERE status ILIKE '%accept%')
+        FROM applicants GROUP BY CUBE (llm_generated_university, llm_generated_program, degree)
+        ORDER BY 1, 2, 3, 4"""
+    with psycopg.connect(live_dsn) as conn:               # Cube summed from the rollup == cube of the table
+        assert conn.execute(f"SELECT {', '.join(ld.CUBE_KEYS)}, n, accepted FROM applicant_cube "
+                            "ORDER BY 1, 2, 3, 4").fetchall() == conn.execute(cells).fetchall()
+
+
+@pytest.mark.integration
+def test_copy_backend_skips_duplicates(live_dsn, tmp_path):
+    """
+    Verify the COPY backend on a real server: streamed batches go through the
+    staging table, reloading the same rows inserts nothing, and the
+    trigger-fed rollups still match the table.
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 120)
+    assert ld.load_streaming(str(path), batch_size=50, backend="copy") == 120
+    ld.main(str(path), backend="copy")
+    assert totals(live_dsn) == (120, 120, 120, 120)
+
+
+@pytest.mark.integration
+def test_partitioned_layout_keeps_p_id_unique_and_prunes(live_dsn, tmp_path, monkeypatch):
+    """
+    Verify the partitioned layout on a real server.
+
+    - Reloading the same p_ids under other dates (so other partitions) adds
+      no rows, with every insert backend, after migrating a plain table.
+    - A date-filtered metrics query scans only the matching year's partition.
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 50)
+    ld.main(str(path))
+    monkeypatch.setattr(ld, "PARTITIONED", True)
+    assert ld.migrate_to_partitioned() == 50
+    assert qd.read_results()["total"] == 50             # summary view kept and refreshed
+
+    path.write_text(path.read_text(encoding="utf-8").replace("/2024", "/2025"), encoding="utf-8")
+    for backend in ("executemany", "copy"):
+        ld.main(str(path), backend=backend)
+    ld.load_parallel(str(path), workers=2)
+    assert totals(live_dsn) == (50, 50, 50, 50)
+
+    sql, params = qd.compile_metrics({"date_from": "2024-01-01", "date_to": "2025-01-01"})
+    with psycopg.connect(live_dsn) as conn:
+        assert conn.execute("SELECT COUNT(DISTINCT p_id) FROM applicants").fetchone() == (50,)
+        plan = "\n".join(row[0] for row in conn.execute("EXPLAIN " + sql, params))
+    assert "applicants_y2024" in plan
+    assert "applicants_y2025" not in plan and "applicants_undated" not in plan
+
+
+@pytest.mark.integration
+def test_approximate_intervals_calibrated_on_real_pages(live_dsn, tmp_path):
+    """
+    Verify the sampled metrics' 95% intervals cover the exact values for
+    most seeds when rows from the same load sit together on disk, so
+    ``TABLESAMPLE SYSTEM`` keeps or skips them together.
+    """
+    rnd = random.Random(3)
+    path = tmp_path / "clustered.jsonl"
+    with open(path, "w", encoding="utf-8") as fh:
+        for block in range(50):                         # 50 loads of 200 alike rows
+            share, gpa = rnd.choice([0.05, 0.5, 0.95]), rnd.uniform(2.8, 3.9)
+            for i in range(200):
+                p_id = block * 200 + i + 1
+                fh.write(json.dumps({
+                    "url": f"https://www.thegradcafe.com/result/{p_id}",
+                    "US/International": "International" if rnd.random() < share else "American",
+                    "gpa": f"{gpa + rnd.gauss(0, 0.05):.2f}",
+                }) + "\n")
+    ld.main(str(path), backend="copy")
+    exact = qd.query_metrics(source="applicants", parallel=False)
+
+    names = ("total", "pct_international", "avg_gpa_4")
+    covered = dict.fromkeys(names, 0)
+    for seed in range(100):
+        approx = qd.approximate_metrics(sample_pct=20, seed=seed, parallel=False)
+        for name in names:
+            low, high = approx["intervals"][name]
+            covered[name] += low <= float(exact[name]) <= high
+    assert all(hits >= 85 for hits in covered.values()), covered
+
+
+@pytest.mark.integration
+def test_cached_results_read_through_replica_check(live_dsn, tmp_path, monkeypatch):
+    """
+    Verify the version-cached dashboard results and distributions run the
+    read-your-writes check on a real server and read from the configured
+    replica (here the same server, which counts as caught up).
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 30)
+    ld.main(str(path))
+    monkeypatch.setattr(qd, "REPLICA", qd.ReplicaRouter(make_conninfo(live_dsn, application_name="replica")))
+
+    with psycopg.connect(live_dsn) as conn:
+        lsn = qd._fetch_value(conn, qd.PRIMARY_LSN_SQL)
+        assert qd._fetch_value(conn, qd.REPLICA_CAUGHT_UP_SQL, (lsn,)) is True
+    assert qd.read_results()["total"] == 30
+    assert qd.compute_results()["total"] == 30
+    assert qd.get_distributions()
+    assert qd.REPLICA.stats()["healthy"] is True
+
+
+@pytest.mark.integration
+def test_sqlite_snapshot_then_streaming_load_keeps_rows(live_dsn, tmp_path, monkeypatch):
+    """
+    Verify a snapshot taken from PostgreSQL becomes the SQLite store: a
+    streaming load on the SQLite backend appends to it without losing the
+    copied rows, and leaves PostgreSQL untouched.
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 200)
+    ld.load_parallel(str(path), workers=2, batch_size=50)
+    sqlite_path = str(tmp_path / "applicants.sqlite3")
+    assert ld.snapshot_sqlite(sqlite_path) == 200
+
+    for mod in (qd, ld.query_data):
+        monkeypatch.setattr(mod, "ANALYTICS_BACKEND", "sqlite")
+        monkeypatch.setattr(mod, "SQLITE_PATH", sqlite_path)
+        monkeypatch.setattr(mod, "SQLITE", mod.SQLiteBackend(sqlite_path))
+    write_items(path, 30, start=201)
+    assert ld.load_streaming(str(path), batch_size=10) == 30
+    assert qd.SQLITE.query_metrics()["total"] == 230
+    assert qd.SQLITE.url_exists("https://www.thegradcafe.com/result/1")
+    assert totals(live_dsn)[0] == 200
+
+
+@pytest.mark.integration
+def test_hot_statements_prepared_by_psycopg(live_dsn, tmp_path, capsys):
+    """
+    Verify the hot statements bind their parameters on a real server and
+    that psycopg prepares the duplicate check on its own.
+
+    - The duplicate check, the cached dashboard results and the unfiltered
+      metrics bind text, number and date parameters.
+    - Once the duplicate check has run ``prepare_threshold`` times on a
+      connection, it is a server-side prepared statement there.
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 40)
+    ld.main(str(path))
+    assert "Pushed 40 rows" in capsys.readouterr().out
+
+    assert qd.url_exists_in_db("https://www.thegradcafe.com/result/7")
+    assert not qd.url_exists_in_db("https://www.thegradcafe.com/result/41")
+    assert qd.compute_results()["total"] == 40
+    assert qd.query_metrics(parallel=False)["total"] == 40
+    assert qd.query_metrics(source="applicants")["total"] == 40
+
+    with psycopg.connect(live_dsn) as conn:
+        prepared = "SELECT statement FROM pg_prepared_statements;"
+        assert qd.sql_query(qd.URL_EXISTS_SQL, "https://www.thegradcafe.com/result/1", conn=conn)
+        assert qd.sql_query(prepared, conn=conn) == []
+        for n in range(2, 2 + conn.prepare_threshold):
+            assert qd.sql_query(qd.URL_EXISTS_SQL, f"https://www.thegradcafe.com/result/{n}", conn=conn)
+        assert [row["statement"] for row in qd.sql_query(prepared, conn=conn)] == [
+            "SELECT 1 FROM applicants WHERE url = $1 LIMIT 1;"]
+
+
+@pytest.mark.integration
+def test_scraper_duplicate_check_on_real_server(live_dsn, tmp_path, monkeypatch):
+    """
+    Verify :func:`qd.urls_existing` answers a batch with ``url = ANY(%s)`` on a
+    real server, and that the scraper's per-page check stops at the first
+    page URL already loaded.
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 20)
+    ld.main(str(path))
+
+    urls = [f"https://www.thegradcafe.com/result/{n}" for n in (3, 19, 21, 500)]
+    assert qd.urls_existing(urls + [urls[0], ""]) == set(urls[:2])
+    assert qd.urls_existing(urls[2:]) == set()
+
+    page = """<html><body><table>
+      <tr><td>New U</td><td><span>CS</span><span>PhD</span></td><td>2025-08-01</td><td>Accepted</td>
+          <td><a href="https://www.thegradcafe.com/result/900" data-ext-page-id="1">link</a></td></tr>
+      <tr><td>Old U</td><td><span>EE</span><span>MS</span></td><td>2025-08-02</td><td>Accepted</td>
+          <td><a href="https://www.thegradcafe.com/result/7" data-ext-page-id="1">link</a></td></tr>
+    </table></body></html>"""
+    http = types.SimpleNamespace(request=lambda method, url: types.SimpleNamespace(data=page))
+    monkeypatch.setattr(scrape.urllib3, "PoolManager", lambda: http)
+    monkeypatch.setattr(scrape.time, "sleep", lambda s: None)
+    results = scrape.scrape_data(max_applicants=5)
+    assert [r["applicant_URL"] for r in results] == ["https://www.thegradcafe.com/result/900"]
+
+
+@pytest.mark.integration
+def test_query_cli_on_real_server(live_dsn, tmp_path, capsys):
+    """
+    Smoke-test the query CLI against a real server: metrics, per-metric
+    timing and the benchmark, unfiltered and filtered, in every format.
+    """
+    path = tmp_path / "data.jsonl"
+    write_items(path, 60)
+    ld.main(str(path))
+    capsys.readouterr()
+
+    script = os.path.join(os.path.dirname(__file__), "..", "src", "query_data.py")
+    out = subprocess.run([sys.executable, script, "--dsn", live_dsn, "--format", "json",
+                          "--timing", "--repeat", "2"], capture_output=True, text=True, check=True).stdout
+    report = json.loads(out)
+    assert report["metrics"]["total"] == 60
+    assert set(report["timings_ms"]) == set(qd.DASHBOARD_METRICS) | {"grouped_counts"}
+    assert report["benchmark"]["metrics"]["runs"] == report["benchmark"]["dashboard"]["runs"] == 2
+
+    out = subprocess.run([sys.executable, script, "--dsn", live_dsn, "--format", "csv", "--source", "rollup",
+                          "--filter", "degree=phd", "--repeat", "1"], capture_output=True, text=True,
+                         check=True).stdout
+    assert "benchmark_metrics,runs,1" in out and "benchmark_dashboard,runs,1" in out
+
+    filtered = qd.main({"degree": "phd"}, fmt="csv", timing=True, repeat=1, source="rollup")
+    assert 0 < filtered["metrics"]["total"] < 60 and filtered["benchmark"]["metrics"]["runs"] == 1
+    assert capsys.readouterr().out.startswith("section,name,value")
+    qd.main(fmt="text")
+    assert capsys.readouterr().out
@@ -1,4 +1,13 @@
+import csv
+import io
+import json
+import random
+import re
+from datetime import date
+from decimal import Decimal
 import pytest
+from psycopg import errors
+import src.load_data as ld
 import src.query_data as qd
 
 class DummyCursor:
@@ -9,16 +18,24 @@ class DummyCursor:
     - Returns canned results for specific queries
       (e.g., JHU Masters in CS, Georgetown PhD, applicant counts).
     - Used to simulate PostgreSQL behavior without a real DB.
+    - ``summary`` holds the row of the ``applicants_summary`` view, or
+      ``None`` when the view does not exist.
+    - ``caught_up`` answers the replica's read-your-writes check.
     """
+    summary = None
+    caught_up = True
 
-    def __init__(self):
+    def __init__(self, connection=None):
         """
         Store history of sql commands (self.executed) and current results being fetched (self.results)
         """
+        self.connection = connection or self            # Prepared statements are tracked per connection
         self.executed = []
+        self.prepared = []
         self.results = []
+        self.summary = DummyCursor.summary
 
-    def execute(self, sql, params=None):
+    def execute(self, sql, params=None, prepare=None):
         """
         This simulates running an sql query
         It accepts sql string and parameters
@@ -27,6 +44,7 @@ class DummyCursor:
         # Strip whitespace and make command lowercase
         s = (sql or "").strip().lower()
         self.executed.append((s, params))
+        self.prepared.append(prepare)
 
         # Standardize params
         if params is None:
@@ -38,8 +56,35 @@ class DummyCursor:
 
         # This section returns sql results based on the input patterns
 
+        # Summary view: not created yet unless a test provides a row
+        if "from applicants_summary" in s:
+            if self.summary is None:
+                raise errors.UndefinedTable('relation "applicants_summary" does not exist')
+            self.results = [dict(self.summary)]
+
+        # Single-scan scalar metrics query used by get_results
+        elif "as georgetown_cs_phd" in s and "filter (where" in s:
+            self.results = [{
+                "total": 50, "fall_2025": 12, "pct_international": 33.3,
+                "avg_gpa_4": 3.700, "avg_gre_q": 160.000,
+                "avg_gre_v": 155.000, "avg_gre_aw": 4.500,
+                "avg_gpa_us_fall25": 3.600, "pct_accept_fall25": 75.00,
+                "avg_gpa_accept_fall25": 3.800,
+                "jhu_masters_cs": 7, "georgetown_cs_phd": 2,
+            }]
+
+        # Degree / university counts from one grouping sets scan
+        elif "grouping sets" in s:
+            self.results = [
+                {"g_degree": 0, "degree": "MS", "llm_generated_university": None, "n": 10},
+                {"g_degree": 1, "degree": None, "llm_generated_university": "Test U", "n": 8},
+                {"g_degree": 1, "degree": None, "llm_generated_university": None, "n": 7},
+                {"g_degree": 1, "degree": None, "llm_generated_university": "Cool College", "n": 6},
+                {"g_degree": 0, "degree": "PhD", "llm_generated_university": None, "n": 5},
+            ]
+
         # JHU masters in computer science query
-        if ("llm_generated_university ilike" in s and
+        elif ("llm_generated_university ilike" in s and
             "llm_generated_program ilike" in s and
             "degree ilike" in s and
             "johns hopkins" in pl_join and
@@ -110,6 +155,12 @@ class DummyCursor:
             ]
 
 
+        # Read-your-writes check: the primary's WAL position, then whether the replica replayed it
+        elif "pg_current_wal_lsn" in s:
+            self.results = [("0/3000060",)]
+        elif "pg_last_wal_replay_lsn" in s:
+            self.results = [(DummyCursor.caught_up,)]
+
         elif "select 1 from applicants where url" in s:
             # Default empty
             self.results = []
@@ -136,7 +187,9 @@ class DummyConn:
     - Implements context manager protocol.
     """
     def cursor(self, *a, **k): 
-        return DummyCursor()
+        return DummyCursor(self)
+    def rollback(self):
+        pass
     def __enter__(self): 
         return self
     def __exit__(self, *a): 
@@ -222,6 +275,39 @@ def test_url_exists_in_db_true_false(monkeypatch):
     monkeypatch.setattr(qd, "sql_query", lambda *_a, **_k: [{"dummy": 1}])
     assert qd.url_exists_in_db("http://exists") is True
 
+@pytest.mark.db
+def test_urls_existing_batches_and_caches(monkeypatch):
+    """
+    Verify :func:`qd.urls_existing` resolves a batch in one query and caches the answers.
+
+    - Repeated and empty URLs are dropped; only uncached URLs are sent.
+    - A load drops the cached misses but keeps the hits.
+    - The least recently used URL is evicted past ``max_entries``.
+    """
+    table = {"http://a"}
+    calls = []
+    def fake_sql_query(sql, urls, **_k):
+        calls.append(list(urls))
+        return [{"url": u} for u in urls if u in table]
+    monkeypatch.setattr(qd, "sql_query", fake_sql_query)
+
+    assert qd.urls_existing(["http://a", "http://b", "http://a", ""]) == {"http://a"}
+    assert qd.urls_existing(["http://b", "http://a"]) == {"http://a"}
+    assert qd.urls_existing([]) == set()
+    assert calls == [["http://a", "http://b"]]
+    assert qd.URL_CACHE.stats() == {"entries": 2, "hits": 2, "misses": 2}
+
+    table.add("http://b")
+    qd.RESULTS_CACHE.bump()
+    assert qd.urls_existing(["http://a", "http://b"]) == {"http://a", "http://b"}
+    assert calls[-1] == ["http://b"]
+
+    cache = qd.UrlCache(max_entries=2)
+    cache.store({"x": True, "y": False}, 0)
+    cache.lookup(["x"], 0)
+    cache.store({"z": True}, 0)
+    assert list(cache._entries) == ["x", "z"]
+
 @pytest.mark.db
 @pytest.mark.analysis
 def test_main_prints(capsys):
@@ -252,3 +338,877 @@ def test_main_prints(capsys):
     assert "50" in out                       # total
     assert "12" in out                       # fall_2025
     assert "75.0%" in out or "75.00%" in out # pct_accept_fall25 via pct()
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_get_results_single_checkout(monkeypatch):
+    """
+    Verify :func:`qd.get_results` borrows one pooled connection for all
+    queries in sequential mode, and one per live statement otherwise.
+    """
+    checkouts = []
+    def fake_connect(dsn=None):
+        checkouts.append(dsn)
+        return DummyConn()
+    monkeypatch.setattr(qd, "connect", fake_connect)
+
+    monkeypatch.setattr(qd, "PARALLEL_METRICS", False)
+    sequential = qd.read_results()
+    assert len(checkouts) == 1
+
+    checkouts.clear()
+    monkeypatch.setattr(qd, "PARALLEL_METRICS", True)
+    assert qd.read_results() == sequential
+    assert len(checkouts) == 1 + 2              # summary lookup, then both statements at once
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_query_metrics_runs_statements_concurrently(monkeypatch):
+    """
+    Verify the two metric statements overlap in parallel mode and run one
+    after the other with ``parallel=False``.
+
+    - Each statement waits at a barrier that only opens when both are running.
+    - A missing rollup falls back to ``applicants`` in either mode.
+    """
+    class MeetingCursor(DummyCursor):
+        barrier = qd.threading.Barrier(2, timeout=5)
+        def execute(self, sql, params=None, prepare=None):
+            if "from applicant_rollups" in sql.lower():
+                raise errors.UndefinedTable('relation "applicant_rollups" does not exist')
+            self.barrier.wait()
+            super().execute(sql, params, prepare)
+    class MeetingConn(DummyConn):
+        def cursor(self, *a, **k): return MeetingCursor()
+        def rollback(self): pass
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: MeetingConn())
+
+    results = qd.query_metrics({"term": "Fall 2025"}, parallel=True)
+    assert results["total"] == 50 and results["degree_counts"][0]["degree"] == "MS"
+
+    MeetingCursor.barrier = qd.threading.Barrier(2, timeout=0.05)
+    with pytest.raises(qd.threading.BrokenBarrierError):   # A lone statement never meets the other
+        qd.query_metrics({"term": "Fall 2025"}, parallel=False)
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_get_results_two_statements(monkeypatch):
+    """
+    Verify :func:`qd.get_results` issues exactly two statements.
+
+    - Both run with ``prepare=True``.
+    - One scalar scan with a parameter for every dashboard filter.
+    - One grouped scan, split into degree counts and top universities
+      (the ``NULL`` university group is left out).
+    """
+    cursors = []
+    class RecordingConn(DummyConn):
+        def cursor(self, *a, **k):
+            cursors.append(DummyCursor())
+            return cursors[-1]
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: RecordingConn())
+
+    results = qd.get_results()
+    assert len(cursors) == 3                    # summary lookup (missing) + two live statements
+    scalar, grouped = cursors[1:]
+    assert scalar.executed == [(qd.SCALAR_METRICS_SQL.strip().lower(), qd.DASHBOARD_PARAMS)]
+    assert grouped.executed == [(qd.GROUPED_COUNTS_SQL.strip().lower(), {})]
+    assert scalar.prepared == grouped.prepared == [True]
+    assert results["degree_counts"] == [{"degree": "MS", "n": 10}, {"degree": "PhD", "n": 5}]
+    assert [u["llm_generated_university"] for u in results["top_universities"]] == ["Test U", "Cool College"]
+
+@pytest.mark.analysis
+def test_split_grouped_counts_top_n():
+    """
+    Verify :func:`qd.split_grouped_counts` keeps only ``top_n`` universities.
+    """
+    rows = [{"g_degree": 1, "degree": None, "llm_generated_university": f"U{i}", "n": 20 - i}
+            for i in range(12)]
+    _, top = qd.split_grouped_counts(rows)
+    assert len(top) == 10 and top[0] == {"llm_generated_university": "U0", "n": 20}
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_get_results_reads_summary_view(monkeypatch):
+    """
+    Verify :func:`qd.get_results` answers from the summary view when it exists.
+
+    - Only the single-row view lookup is executed.
+    - The view's ``id`` column is not exposed.
+    """
+    summary = {"id": 1, "total": 99, "fall_2025": 4, "degree_counts": [],
+               "top_universities": [], "refreshed_at": "2025-09-01 12:00"}
+    monkeypatch.setattr(DummyCursor, "summary", summary)
+    cursors = []
+    class RecordingConn(DummyConn):
+        def cursor(self, *a, **k):
+            cursors.append(DummyCursor())
+            return cursors[-1]
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: RecordingConn())
+
+    results = qd.get_results()
+    assert results["total"] == 99 and "id" not in results
+    assert results["refreshed_at"] == "2025-09-01 12:00"
+    assert len(cursors) == 1
+
+@pytest.mark.db
+def test_refresh_summary_sql():
+    """
+    Verify :func:`qd.refresh_summary` creates the view with inlined filter
+    values and refreshes it concurrently.
+    """
+    cur = DummyCursor()
+    qd.refresh_summary(cur)
+    create, refresh = (sql for sql, _ in cur.executed)
+    assert "create materialized view if not exists applicants_summary" in create
+    assert "'%fall 2025%'" in create and "%(" not in create
+    assert "create unique index if not exists applicants_summary_id" in create
+    assert refresh == "refresh materialized view concurrently applicants_summary;"
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_get_results_is_cached_until_version_bump(monkeypatch):
+    """
+    Verify :func:`qd.get_results` only hits the database on a cache miss.
+
+    - A repeat call is served from the cache without a connection.
+    - Bumping the data version or invalidating forces a re-read.
+    """
+    calls = []
+    monkeypatch.setattr(qd, "read_results", lambda: calls.append(1) or {"total": len(calls)})
+
+    assert qd.get_results() == {"total": 1}
+    assert qd.get_results() == {"total": 1}
+    assert qd.RESULTS_CACHE.bump() == 1
+    assert qd.get_results() == {"total": 2}
+    qd.RESULTS_CACHE.invalidate()
+    assert qd.get_results() == {"total": 3}
+
+    stats = qd.RESULTS_CACHE.stats()
+    assert (stats["version"], stats["hits"], stats["misses"]) == (1, 1, 3)
+    assert stats["age_seconds"] >= 0
+
+@pytest.mark.analysis
+def test_results_cache_shared_on_disk(tmp_path, monkeypatch):
+    """
+    Verify two caches sharing a directory share the version and the entry,
+    as a CLI load and a web worker would.
+
+    - Entries are stored as JSON; ``numeric`` values come back as floats.
+    - Writing an entry removes the files of older versions.
+    """
+    web, loader = qd.ResultsCache(str(tmp_path)), qd.ResultsCache(str(tmp_path))
+    assert web.version == 0
+    assert web.get(lambda: {"total": 1}) == {"total": 1}
+    assert loader.get(lambda: {"total": 99}) == {"total": 1}      # read from disk
+
+    assert [f.name for f in tmp_path.glob("results_v*")] == ["results_v0.json"]
+    web.get(lambda: {"keyed": 1}, key="degree")
+
+    loader.bump()
+    assert web.version == 1
+    assert web.get(lambda: {"total": 2, "avg": Decimal("3.25"), "day": date(2025, 1, 2)})["total"] == 2
+    assert [f.name for f in tmp_path.glob("results_v*")] == ["results_v1.json"]      # older versions pruned
+    assert loader.get(lambda: {}) == {"total": 2, "avg": 3.25, "day": "2025-01-02"}
+    with pytest.raises(TypeError):
+        loader._encode(object())
+    (tmp_path / "results_v0_stale.json").write_text("{}")
+    with monkeypatch.context() as m:
+        m.setattr(qd.os, "remove", lambda path: (_ for _ in ()).throw(FileNotFoundError(path)))
+        web._prune(1)                                              # Already removed by another process
+
+    (tmp_path / "data_version").write_text("garbage")
+    assert web.version == 0
+    web.invalidate()
+    assert not list(tmp_path.glob("results_v*"))
+    assert web.stats()["shared"] is True
+
+@pytest.mark.analysis
+def test_rollup_metrics_cover_every_scalar_metric():
+    """
+    Verify the rollup-based metrics mirror :data:`qd.SCALAR_METRICS_SELECT`.
+
+    - Both queries produce the same metric names.
+    - Every column the dashboard filters on is a rollup bucket key.
+    - The summary view is built from the rollup, not from ``applicants``.
+    """
+    aliases = lambda q: set(re.findall(r"\bAS (\w+),?\n", q))
+    assert aliases(qd.ROLLUP_METRICS_SELECT) == aliases(qd.SCALAR_METRICS_SELECT)
+    assert len(aliases(qd.SCALAR_METRICS_SELECT)) == 12
+
+    filtered = set(re.findall(r"(\w+) ILIKE", qd.SCALAR_METRICS_SELECT))
+    assert filtered <= set(ld.ROLLUP_KEYS)
+
+    assert "FROM applicant_rollups" in qd.CREATE_SUMMARY_SQL
+    assert "FROM applicants\n" not in qd.CREATE_SUMMARY_SQL
+
+@pytest.mark.analysis
+def test_compile_filters_binds_every_value():
+    """
+    Verify :func:`qd.compile_filters` only emits placeholders.
+
+    - Text filters become escaped ``ILIKE`` substring patterns.
+    - Date filters are parsed and bound as dates.
+    - Repeated values share one parameter.
+    - Unknown filters and malformed dates raise ``ValueError``.
+    """
+    params = {}
+    preds = qd.compile_filters({"university": "50%_off", "date_from": "2025-01-01",
+                                "program": "50%_off"}, params)
+    assert preds == ["llm_generated_university ILIKE %(p0)s", "date_added >= %(p1)s",
+                     "llm_generated_program ILIKE %(p0)s"]
+    assert params == {"p0": r"%50\%\_off%", "p1": date(2025, 1, 1)}
+
+    with pytest.raises(ValueError, match="Unknown filter 'colour'"):
+        qd.compile_filters({"colour": "red"}, {})
+    with pytest.raises(ValueError):
+        qd.compile_filters({"date_to": "next tuesday"}, {})
+
+@pytest.mark.analysis
+def test_compile_metrics_applies_filters_once():
+    """
+    Verify :func:`qd.compile_metrics` adds the query filters as one ``WHERE``
+    clause on top of the per-metric ``FILTER`` clauses.
+    """
+    query, params = qd.compile_metrics({"university": "stanford", "date_to": "2025-07-01"})
+    assert query.endswith("FROM applicants\nWHERE llm_generated_university ILIKE %(p0)s "
+                          "AND date_added < %(p1)s\n")
+    assert query.count("%(p0)s") == 1 and params["p0"] == "%stanford%"
+    assert query.count(" AS ") == len(qd.DASHBOARD_METRICS)
+
+    with pytest.raises(ValueError, match="rollup has no date_added"):
+        qd.compile_grouped({"date_from": "2025-01-01"}, source="rollup")
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_query_metrics_chooses_source(monkeypatch):
+    """
+    Verify :func:`qd.query_metrics` picks its source and prepares its statements.
+
+    - Without date filters the rollup is read, falling back to
+      ``applicants`` when the rollup does not exist.
+    - Date filters always read ``applicants``.
+    """
+    cursors = []
+    class RecordingCursor(DummyCursor):
+        rollup_exists = True
+        def execute(self, sql, params=None, prepare=None):
+            if "from applicant_rollups" in sql.lower() and not self.rollup_exists:
+                raise errors.UndefinedTable('relation "applicant_rollups" does not exist')
+            super().execute(sql, params, prepare)
+    class RecordingConn(DummyConn):
+        def cursor(self, *a, **k):
+            cursors.append(RecordingCursor())
+            return cursors[-1]
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: RecordingConn())
+    sources = lambda: [("rollup" if "applicant_rollups" in sql else "applicants")
+                       for c in cursors for sql, _ in c.executed]
+
+    results = qd.query_metrics({"term": "Fall 2025"})
+    assert results["georgetown_cs_phd"] == 2 and results["degree_counts"][0]["degree"] == "MS"
+    assert sources() == ["rollup", "rollup"]
+    assert all(p is True for c in cursors for p in c.prepared)
+
+    cursors.clear()
+    RecordingCursor.rollup_exists = False
+    qd.query_metrics({"term": "Fall 2025"})
+    assert sources() == ["applicants", "applicants"]
+
+    cursors.clear()
+    qd.query_metrics({"date_from": "2025-01-01"})
+    assert sources() == ["applicants", "applicants"]
+
+@pytest.mark.db
+def test_sql_query_borrows_connection():
+    """
+    Verify :func:`qd.sql_query` borrows a pooled connection when none is given.
+    """
+    assert qd.sql_query("SELECT 1 FROM applicants WHERE url = %s LIMIT 1;", "http://x") == []
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_main_passes_filters(monkeypatch, capsys):
+    """
+    Verify :func:`qd.main` prints the metrics for the given filters.
+    """
+    seen = []
+    real = qd.query_metrics
+    monkeypatch.setattr(qd, "query_metrics", lambda filters=None, **k: seen.append(filters) or real(filters, **k))
+    qd.main({"university": "georgetown"})
+    assert seen[0] == {"university": "georgetown"}
+    assert "8) 2025 cs phd acceptances to georgetown: 2" in capsys.readouterr().out.lower()
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_main_formats_timing_and_benchmark(monkeypatch, capsys):
+    """
+    Verify the CLI report in JSON and CSV, with per-metric timing and a benchmark.
+
+    - Every dashboard metric is timed as its own statement, plus the grouped counts.
+    - ``--repeat`` runs the metric set once more than requested (warm-up),
+      on the chosen source, and the dashboard's uncached read as well.
+    """
+    calls, reads = [], []
+    real = qd.query_metrics
+    def counting_query_metrics(filters=None, source=None, **k):
+        if not k:                                       # Not the rollup/fallback recursion
+            calls.append((filters, source))
+        return real(filters, source=source, **k)
+    monkeypatch.setattr(qd, "query_metrics", counting_query_metrics)
+    real_read = qd.read_results
+    monkeypatch.setattr(qd, "read_results", lambda: reads.append(1) or real_read())
+
+    report = qd.main({"degree": "phd"}, fmt="json", timing=True, repeat=3, source="rollup")
+    assert json.loads(capsys.readouterr().out)["metrics"]["total"] == 50
+    assert list(report["timings_ms"]) == [*qd.DASHBOARD_METRICS, "grouped_counts"]
+    assert report["benchmark"]["metrics"]["runs"] == 3 and len(calls) == 1 + 1 + 3
+    assert calls[1:] == [({"degree": "phd"}, "rollup")] * 4 and len(reads) == 1 + 3
+    for b in report["benchmark"].values():
+        assert b["min_ms"] <= b["p50_ms"] <= b["p95_ms"] <= b["max_ms"]
+
+    qd.main(fmt="csv", repeat=1)
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == ["section", "name", "value"] and rows[1] == ["metric", "total", "50"]
+    assert ["degree_counts", "MS", "10"] in rows and ["benchmark_metrics", "runs", "1"] in rows
+    assert rows[-1][:2] == ["benchmark_dashboard", "max_ms"]
+
+    qd.main(timing=True, repeat=2)
+    out = capsys.readouterr().out
+    assert "Per-metric timing (ms):\n   total: " in out and "Benchmark over 2 runs (ms):\n   metrics: min " in out
+    assert "\n   dashboard: min " in out
+
+    for bad in ({"fmt": "xml"}, {"repeat": -1}):
+        with pytest.raises(ValueError):
+            qd.main(**bad)
+
+@pytest.mark.db
+def test_search_ranks_and_paginates(monkeypatch):
+    """
+    Verify :func:`qd.search` binds its inputs and pages through ranked hits.
+
+    - One extra row is fetched to tell whether another page exists.
+    - Structured filters are appended to the full-text predicate.
+    - Empty queries and out-of-range pages are rejected.
+    """
+    calls = []
+    def fake_sql_query(query, params, conn=None, prepare=None):
+        calls.append((query, params, prepare))
+        return [{"p_id": i, "rank": 1.0 / i} for i in range(1, params["limit"] + 1)][:3]
+    monkeypatch.setattr(qd, "sql_query", fake_sql_query)
+
+    page = qd.search("machine learning", page=2, page_size=2, filters={"degree": "phd"})
+    query, params, prepare = calls[0]
+    assert page["has_more"] is True and [h["p_id"] for h in page["hits"]] == [1, 2]
+    assert params == {"p0": "%phd%", "q": "machine learning", "limit": 3, "offset": 2}
+    assert "WHERE search_tsv @@ query AND degree ILIKE %(p0)s" in query
+    assert "websearch_to_tsquery('english', %(q)s)" in query and prepare is True
+
+    assert qd.search("robotics", page_size=5)["has_more"] is False
+    for bad in ({"q": " "}, {"q": "x", "page": 0}, {"q": "x", "page_size": 500}):
+        with pytest.raises(ValueError):
+            qd.search(**bad)
+
+@pytest.mark.db
+def test_browse_applicants_keyset_pages(monkeypatch):
+    """
+    Verify :func:`qd.browse_applicants` seeks from the previous page's last key.
+
+    - The first page has no seek predicate; the ``next`` token encodes the
+      last row's ``(date_added, p_id)``.
+    - The following page binds that key instead of using ``OFFSET``.
+    - Undated rows get a ``-infinity`` key so they sort last.
+    - ``p_id`` and ``date_added`` are always selected; other fields are projected.
+    """
+    table = [{"p_id": 9, "date_added": date(2025, 3, 1)}, {"p_id": 7, "date_added": date(2025, 3, 1)},
+             {"p_id": 8, "date_added": date(2025, 2, 1)}, {"p_id": 3, "date_added": None},
+             {"p_id": 1, "date_added": None}]
+    calls = []
+    def fake_sql_query(query, params, conn=None, prepare=None):
+        calls.append((query, params))
+        start = 0 if "after_id" not in params else next(
+            i + 1 for i, r in enumerate(table) if r["p_id"] == params["after_id"])
+        return table[start:start + params["limit"]]
+    monkeypatch.setattr(qd, "sql_query", fake_sql_query)
+
+    first = qd.browse_applicants(limit=2, fields=["program", "p_id"], filters={"degree": "phd"})
+    query, params = calls[-1]
+    assert query.startswith("\nSELECT p_id, date_added, program\nFROM applicants\nWHERE TRUE AND degree ILIKE %(p0)s")
+    assert "OFFSET" not in query and params["limit"] == 3
+    assert qd.decode_cursor(first["next"]) == ("2025-03-01", 7)
+
+    second = qd.browse_applicants(after=first["next"], limit=2)
+    query, params = calls[-1]
+    assert "(COALESCE(date_added, '-infinity'::date), p_id) < (%(after_date)s::date, %(after_id)s)" in query
+    assert [r["p_id"] for r in second["rows"]] == [8, 3]
+    assert qd.decode_cursor(second["next"]) == ("-infinity", 3)
+
+    last = qd.browse_applicants(after=second["next"], limit=2)
+    assert [r["p_id"] for r in last["rows"]] == [1] and last["next"] is None
+
+@pytest.mark.analysis
+def test_browse_applicants_rejects_bad_input():
+    """
+    Verify bad limits, unknown fields and malformed cursors raise ``ValueError``.
+    """
+    with pytest.raises(ValueError, match="limit"):
+        qd.browse_applicants(limit=0)
+    with pytest.raises(ValueError, match="Unknown fields"):
+        qd.browse_applicants(fields=["password"])
+    for token in ("not-base64!", qd.base64.urlsafe_b64encode(b'["yesterday", 1]').decode()):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            qd.decode_cursor(token)
+
+@pytest.mark.analysis
+def test_fingerprint_normalizes_literals():
+    """
+    Verify literals and placeholders collapse to ``?`` but identifiers keep their digits.
+    """
+    sql = "SELECT  *\n  FROM applicants_y2025 WHERE a = 'it''s' AND b > 3.5 AND c = %(p0)s OR d = %s"
+    assert qd.fingerprint(sql) == "select * from applicants_y2025 where a = ? and b > ? and c = ? or d = ?"
+
+@pytest.mark.db
+def test_sql_query_records_timings(monkeypatch):
+    """
+    Verify every :func:`qd.sql_query` call is timed under its fingerprint.
+
+    - Calls differing only in parameter values share one entry.
+    - Percentiles come from the rolling window and are ordered.
+    """
+    stats = qd.QueryStats(slow_ms=10_000, window=2)
+    monkeypatch.setattr(qd, "QUERY_STATS", stats)
+    for url in ("http://a", "http://b", "http://c"):
+        qd.url_exists_in_db(url)
+    qd.query_metrics({"term": "Fall 2025"}, source="applicants")
+
+    snap = stats.snapshot()
+    assert len(snap) == 3
+    entry = next(e for e in snap if e["fingerprint"] == "select ? from applicants where url = ? limit ?;")
+    assert (entry["calls"], entry["rows"], entry["slow"], entry["plan"]) == (3, 0, 0, None)
+    assert len(stats._entries[entry["id"]]["durations"]) == 2
+    assert entry["p50_ms"] <= entry["p99_ms"] <= entry["max_ms"]
+    assert snap == sorted(snap, key=lambda e: e["total_ms"], reverse=True)
+
+    stats.reset()
+    assert stats.snapshot() == []
+
+class PlanCursor:
+    """
+    Cursor answering ``EXPLAIN`` with a canned plan and anything else with one row.
+    """
+    def __init__(self, log):
+        self.log = log
+    def execute(self, sql, params=None, prepare=None):
+        self.log.append((sql, params))
+    def fetchall(self):
+        if self.log[-1][0].startswith("EXPLAIN"):
+            return [("Seq Scan on applicants",), ("Buffers: shared hit=4",)]
+        return [{"n": 1}]
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+class PlanConn:
+    def __init__(self, log): self.log = log
+    def cursor(self, *a, **k): return PlanCursor(self.log)
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+@pytest.mark.db
+def test_slow_queries_logged_and_explained(monkeypatch, caplog):
+    """
+    Verify slow queries are logged and their plans captured.
+
+    - The log line names the parameter types, never their values.
+    - With ``explain_slow`` the estimated plan is captured on a separate
+      pooled connection, never on the caller's; ``analyze`` captures
+      ``EXPLAIN (ANALYZE, BUFFERS)`` instead.
+    - A database error while explaining is logged, not raised to the caller.
+    - Other statements are logged but never re-run under ``EXPLAIN ANALYZE``.
+    - :meth:`qd.QueryStats.explain` re-captures a plan on demand.
+    """
+    log, pooled = [], []
+    stats = qd.QueryStats(slow_ms=0, explain_slow=True)
+    monkeypatch.setattr(qd, "QUERY_STATS", stats)
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: PlanConn(pooled))
+
+    qd.sql_query("SELECT n FROM applicants WHERE term = %s;", "Fall 2025", conn=PlanConn(log))
+    assert log == [("SELECT n FROM applicants WHERE term = %s;", ("Fall 2025",))]
+    assert pooled == [("EXPLAIN SELECT n FROM applicants WHERE term = %s", ("Fall 2025",))]
+    (entry,) = stats.snapshot()
+    assert entry["slow"] == 1 and entry["plan"] == ["Seq Scan on applicants", "Buffers: shared hit=4"]
+    assert "Slow query " + entry["id"] in caplog.text
+    assert "params=(str)" in caplog.text and "Fall 2025" not in caplog.text
+
+    qd.sql_query("SELECT n FROM applicants WHERE term = %(t)s AND gpa > %(g)s;", {"t": "secret", "g": 3.5},
+                 conn=PlanConn(log))
+    assert "params={t: str, g: float}" in caplog.text and "secret" not in caplog.text
+
+    def broken(dsn=None):
+        raise errors.OperationalError("connection refused")
+    monkeypatch.setattr(qd, "connect", broken)
+    qd.sql_query("SELECT n FROM applicants WHERE term = %s;", "Fall 2024", conn=PlanConn(log))
+    assert "Could not explain slow query " + entry["id"] in caplog.text
+
+    log.clear()
+    pooled.clear()
+    qd.sql_query("DELETE FROM applicants WHERE p_id = %s RETURNING p_id;", 1, conn=PlanConn(log))
+    assert len(log) == 1 and pooled == []
+    delete = next(e["id"] for e in stats.snapshot() if e["fingerprint"].startswith("delete"))
+    with pytest.raises(ValueError):
+        stats.explain(delete)
+    with pytest.raises(KeyError):
+        stats.explain("unknown")
+
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: PlanConn(log))
+    assert stats.explain(entry["id"])[0] == "Seq Scan on applicants"
+    assert log[-1][0].startswith("EXPLAIN SELECT")
+    stats.explain(entry["id"], analyze=True)
+    assert log[-1][0].startswith("EXPLAIN (ANALYZE, BUFFERS) SELECT")
+    assert qd.QueryStats(analyze=True).analyze and not qd.QueryStats().analyze
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_approximate_metrics_scales_sample(monkeypatch):
+    """
+    Verify :func:`qd.approximate_metrics` reads a repeatable table sample
+    and turns the per-page sample sums into estimates with intervals.
+
+    - Statistics are taken per sampled page, then summed.
+    - Counts are scaled by the sampling fraction, grouped counts in SQL.
+    - Percentages and averages are ratios of the sums; their intervals
+      come from the residuals between pages.
+    - Metrics with too few sampled rows or pages have no estimate or no interval.
+    """
+    # Ten sampled pages of ten rows: 1 or 5 international rows, GPA sums of 30 or 40
+    raw = {name: {"count": [50, 500], "pct": [30, 100, 130, 300, 1000, 10],
+                  "avg": [350, 100, 12500, 3500, 1000, 10]}[m.kind]
+           for name, m in qd.DASHBOARD_METRICS.items()}
+    raw.update(pct_accept_fall25=[0, 0, 0, 0, 0, 0], avg_gpa_us_fall25=[None] * 5 + [0],
+               avg_gpa_accept_fall25=[3.9, 1, 15.21, 3.9, 1, 1])
+    calls = []
+    def fake_sql_query(query, params, conn=None, prepare=None):
+        calls.append((query, params))
+        if "grouping sets" in query.lower():
+            return [{"g_degree": 0, "degree": "PhD", "llm_generated_university": None, "n": 40}]
+        return [raw]
+    monkeypatch.setattr(qd, "sql_query", fake_sql_query)
+
+    results = qd.approximate_metrics({"term": "Fall 2025"}, sample_pct=10, seed=7)
+    for query, params in calls:
+        assert "FROM applicants TABLESAMPLE SYSTEM (%(sample_pct)s) REPEATABLE (%(sample_seed)s)" in query
+        assert params["sample_pct"] == 10 and params["sample_seed"] == 7 and params["p0"] == "%Fall 2025%"
+    assert "GROUP BY tableoid, (ctid::text::point)[0]) AS pages" in calls[0][0]
+    assert "ARRAY[SUM(total), SUM(total * total)]::float8[] AS total" in calls[0][0]
+    assert "ROUND(COUNT(*) * 100.0 / %(sample_pct)s)::bigint AS n" in calls[1][0]
+
+    assert results["total"] == 500 and results["intervals"]["total"] == [84, 916]
+    assert results["pct_international"] == 30.0 and results["intervals"]["pct_international"] == [18.24, 41.76]
+    assert results["avg_gpa_4"] == 3.5 and results["intervals"]["avg_gpa_4"] == [3.206, 3.794]
+    assert results["pct_accept_fall25"] is None and results["intervals"]["pct_accept_fall25"] == [None, None]
+    assert results["avg_gpa_us_fall25"] is None
+    assert results["avg_gpa_accept_fall25"] == 3.9 and results["intervals"]["avg_gpa_accept_fall25"] == [None, None]
+    assert results["degree_counts"] == [{"degree": "PhD", "n": 40}]
+    assert results["sample"] == {"percent": 10, "seed": 7, "confidence": 0.95}
+
+    calls.clear()
+    assert qd.approximate_metrics(parallel=False)["sample"]["seed"] == calls[0][1]["sample_seed"]
+
+    for bad in ({"sample_pct": 0}, {"sample_pct": 101}, {"confidence": 1}):
+        with pytest.raises(ValueError):
+            qd.approximate_metrics(**bad)
+
+@pytest.mark.analysis
+def test_approximate_intervals_calibrated_under_page_sampling():
+    """
+    Verify the 95% intervals of :func:`qd._estimate` cover the true value
+    about 95% of the time when whole pages are sampled, as
+    ``TABLESAMPLE SYSTEM`` does, even though rows on a page are alike.
+
+    A per-row binomial interval for the same count covers far less often.
+    """
+    rnd = random.Random(42)
+    pages = []                                          # (rows, matching rows, sum of the matching rows' values)
+    for _ in range(400):
+        share = rnd.choice([0.02, 0.1, 0.5, 0.9])       # Rows from one load sit together
+        matching = sum(rnd.random() < share for _ in range(50))
+        pages.append((50, matching, matching * rnd.uniform(2.5, 4.0)))
+    rows, matching, value = (sum(col) for col in zip(*pages))
+    truth = {"count": matching, "pct": 100 * matching / rows, "avg": value / matching}
+
+    fraction, z, trials = 0.1, qd.statistics.NormalDist().inv_cdf(0.975), 2000
+    covered = {"count": 0, "pct": 0, "avg": 0, "per_row": 0}
+    for _ in range(trials):
+        sample = [p for p in pages if rnd.random() < fraction]
+        def ratio_sums(y, x):
+            return [sum(y(p) for p in sample), sum(x(p) for p in sample), sum(y(p) ** 2 for p in sample),
+                    sum(y(p) * x(p) for p in sample), sum(x(p) ** 2 for p in sample),
+                    sum(1 for p in sample if x(p) > 0)]
+        stats = {
+            "count": [sum(p[1] for p in sample), sum(p[1] ** 2 for p in sample)],
+            "pct": ratio_sums(lambda p: p[1], lambda p: p[0]),
+            "avg": ratio_sums(lambda p: p[2], lambda p: p[1]),
+        }
+        for kind, value in stats.items():
+            _, low, high = qd._estimate(kind, value, fraction, z)
+            covered[kind] += low <= truth[kind] <= high
+        k = stats["count"][0]
+        half = z * (k * (1 - fraction)) ** 0.5 / fraction
+        covered["per_row"] += k / fraction - half <= matching <= k / fraction + half
+
+    for kind in ("count", "pct", "avg"):
+        assert 0.92 <= covered[kind] / trials <= 0.97, (kind, covered[kind] / trials)
+    assert covered["per_row"] / trials < 0.6
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_trends_reads_weekly_rollup(monkeypatch):
+    """
+    Verify :func:`qd.trends` only reads the weekly rollup and binds its inputs.
+
+    - Text filters match substrings; date filters bound the week start.
+    - ``group_by`` adds the group column to the output and the ordering.
+    - Unknown intervals, groupings and filters raise ``ValueError``.
+    """
+    calls = []
+    def fake_sql_query(query, params, conn=None, prepare=None):
+        calls.append((query, params, prepare))
+        return [{"period": date(2025, 1, 1), "applications": 4}]
+    monkeypatch.setattr(qd, "sql_query", fake_sql_query)
+
+    assert qd.trends()[0]["applications"] == 4
+    query, params, prepare = calls[-1]
+    assert "FROM applicant_weekly\nGROUP BY 1\nORDER BY 1;" in query
+    assert params == {"interval": "week"} and prepare is True
+
+    qd.trends("month", {"degree": "phd", "date_from": "2024-01-01", "date_to": date(2025, 1, 1)}, group_by="university")
+    query, params, _ = calls[-1]
+    assert "NULLIF(llm_generated_university, '') AS university" in query
+    assert "WHERE degree ILIKE %(p0)s AND week >= %(date_from)s AND week < %(date_to)s" in query
+    assert "GROUP BY 1, 2" in query and "applications" in query and "FROM applicants" not in query
+    assert params == {"p0": "%phd%", "date_from": date(2024, 1, 1), "date_to": date(2025, 1, 1), "interval": "month"}
+
+    for bad in ({"interval": "day"}, {"group_by": "term"}, {"filters": {"term": "Fall 2025"}}):
+        with pytest.raises(ValueError):
+            qd.trends(**bad)
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_cube_reads_one_grouping(monkeypatch):
+    """
+    Verify :func:`qd.cube` reads the rows of a single grouping of the precomputed cube.
+
+    - Filtered dimensions are kept in the grouping so they can be matched.
+    - ``by`` adds the dimensions to the output, grouping and ordering.
+    - Bad dimensions, sorts and limits raise ``ValueError``.
+    """
+    calls = []
+    def fake_sql_query(query, params, conn=None, prepare=None):
+        calls.append((query, params))
+        return [{"n": 7}]
+    monkeypatch.setattr(qd, "sql_query", fake_sql_query)
+
+    assert qd.cube() == [{"n": 7}]
+    query, params = calls[-1]
+    assert "FROM applicant_cube\nWHERE grouping_id = %(grouping_id)s\nORDER BY n DESC" in query
+    assert params == {"grouping_id": 7, "limit": 50}
+
+    qd.cube(["program"], {"university": "hopkins"}, sort="acceptance_rate", limit=5)
+    query, params = calls[-1]
+    assert "NULLIF(llm_generated_program, '') AS program" in query
+    assert "AND llm_generated_university ILIKE %(p0)s\nGROUP BY 1" in query
+    assert "ORDER BY acceptance_rate DESC NULLS LAST, n DESC, 1" in query
+    assert params == {"p0": "%hopkins%", "grouping_id": 1, "limit": 5}
+    assert qd.cube_grouping_id(["university", "program", "degree"]) == 0
+
+    for bad in ({"by": ["term"]}, {"filters": {"term": "Fall"}}, {"by": ["degree", "degree"]},
+                {"sort": "gpa"}, {"limit": 0}, {"limit": qd.CUBE_MAX_LIMIT + 1}):
+        with pytest.raises(ValueError):
+            qd.cube(**bad)
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_distributions_binned_in_one_statement(monkeypatch):
+    """
+    Verify :func:`qd.distributions` bins and takes percentiles in SQL and
+    fills the gaps in Python.
+
+    - One statement reads ``applicants`` once, with ``width_bucket`` and ``percentile_cont``.
+    - Missing bins are zero; measures without scores keep unknown percentiles.
+    """
+    calls = []
+    def fake_sql_query(query, params, conn=None, prepare=None):
+        calls.append((query, params))
+        return [
+            {"segment": "PhD", "measure": "gpa", "bin": 16, "n": 3, "percentiles": None},
+            {"segment": "PhD", "measure": "gpa", "bin": None, "n": None,
+             "percentiles": [3.1, 3.4, 3.7, 3.9, 3.9999]},
+            {"segment": "PhD", "measure": "gre_q", "bin": None, "n": None, "percentiles": None},
+            {"segment": None, "measure": "gre_aw", "bin": 1, "n": 2, "percentiles": None},
+        ]
+    monkeypatch.setattr(qd, "sql_query", fake_sql_query)
+
+    out = qd.distributions("degree", {"term": "Fall 2025"})
+    (query, params), = calls
+    assert query.count("FROM applicants") == 1 and "AS MATERIALIZED" in query
+    assert "LEAST(GREATEST(width_bucket(gpa, 0, 4, 16), 1), 16)" in query
+    assert "percentile_cont(%(quantiles)s::float8[]) WITHIN GROUP (ORDER BY gre_aw)" in query
+    assert "SELECT degree AS segment" in query and "WHERE term ILIKE %(p0)s" in query
+    assert params == {"p0": "%Fall 2025%", "quantiles": [0.1, 0.25, 0.5, 0.75, 0.9]}
+
+    phd, unknown = out["segments"]
+    assert out["segment"] == "degree" and phd["segment"] == "PhD" and unknown["segment"] is None
+    gpa = phd["measures"]["gpa"]
+    assert gpa["histogram"][-1] == {"low": 3.75, "high": 4.0, "n": 3} and gpa["histogram"][0]["n"] == 0
+    assert gpa["percentiles"] == {"p10": 3.1, "p25": 3.4, "p50": 3.7, "p75": 3.9, "p90": 4.0}
+    assert phd["measures"]["gre_q"]["percentiles"]["p50"] is None
+    assert unknown["measures"]["gre_aw"]["histogram"][0] == {"low": 0.0, "high": 0.5, "n": 2}
+
+    assert "'all'::text AS segment" in qd.compile_distributions()[0]
+    with pytest.raises(ValueError, match="Unknown segment"):
+        qd.compile_distributions("shoe_size")
+
+@pytest.mark.analysis
+def test_get_distributions_cached_per_key(monkeypatch):
+    """
+    Verify distributions are cached per segment and filters until the data version changes,
+    and that the cache keeps a bounded number of keyed entries besides the dashboard's.
+    """
+    calls = []
+    monkeypatch.setattr(qd, "distributions", lambda segment, filters, conn=None: calls.append(segment) or {"segment": segment})
+
+    assert qd.get_distributions("degree", {"term": "Fall 2025"}) == {"segment": "degree"}
+    qd.get_distributions("degree", {"term": "Fall 2025"})
+    qd.get_distributions()
+    assert calls == ["degree", None]
+    qd.RESULTS_CACHE.bump()
+    qd.get_distributions("degree", {"term": "Fall 2025"})
+    assert calls == ["degree", None, "degree"]
+    with pytest.raises(ValueError):
+        qd.get_distributions("shoe_size")
+
+    cache = qd.ResultsCache(max_entries=2)
+    cache.get(lambda: {"total": 1})
+    for key in "abc":
+        cache.get(lambda: {}, key=key)
+    assert list(cache._entries) == [None, "c"] and cache.stats()["entries"] == 2
+
+
+class LagConn:
+    """
+    Dummy direct connection answering :data:`qd.REPLICA_LAG_SQL` with a fixed lag.
+    """
+    def __init__(self, lag): self.lag = lag
+    def execute(self, sql): return self
+    def fetchone(self): return (self.lag,)
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+@pytest.mark.db
+def test_replica_router_health_checks(monkeypatch):
+    """
+    Verify :class:`qd.ReplicaRouter` uses the replica only while it is
+    reachable and within the lag limit, and re-checks it on an interval.
+    """
+    state = {"lag": 1.5, "checks": 0}
+    def fake_connect(dsn, connect_timeout=None):
+        state["checks"] += 1
+        if state["lag"] is None:
+            raise qd.psycopg.OperationalError("connection refused")
+        return LagConn(state["lag"])
+    monkeypatch.setattr(qd.psycopg, "connect", fake_connect)
+
+    assert qd.ReplicaRouter(None).dsn() == qd.DSN and state["checks"] == 0
+
+    router = qd.ReplicaRouter("host=replica", max_lag=30, check_interval=3600)
+    assert router.dsn() == "host=replica" and router.dsn() == "host=replica"
+    assert state["checks"] == 1                         # Second call within the interval
+    assert router.stats()["lag_seconds"] == 1.5 and router.stats()["healthy"] is True
+
+    router.check_interval = 0
+    state["lag"] = 120.0
+    assert router.dsn() == qd.DSN
+    assert "120.0s behind" in router.stats()["error"]
+
+    state["lag"] = None
+    assert router.dsn() == qd.DSN
+    assert router.stats()["error"] == "OperationalError: connection refused"
+
+    state["lag"] = 0.0
+    assert router.dsn() == "host=replica" and router.stats()["error"] is None
+
+
+@pytest.mark.db
+def test_reads_routed_to_replica(monkeypatch):
+    """
+    Verify analytics reads borrow replica connections (with the short
+    replica checkout timeout) while dedup checks use the primary, that the
+    version-cached results use the replica only once it has replayed the
+    primary's WAL position, that a replica pool that cannot connect falls
+    back to the primary, and that a replica failing during the query is
+    marked down and the read retried on the primary.
+    """
+    router = qd.ReplicaRouter("host=replica", check_interval=3600)
+    router.healthy, router._checked_at = True, qd.time.monotonic()
+    monkeypatch.setattr(qd, "REPLICA", router)
+
+    borrowed = []
+    state = {"replica_up": True, "replica_drops": False}
+    class DroppingConn(DummyConn):
+        def cursor(self, *a, **k):
+            raise errors.OperationalError("server closed the connection unexpectedly")
+    def fake_connect(dsn=None, timeout=None):
+        borrowed.append((dsn, timeout))
+        if dsn == "host=replica" and not state["replica_up"]:
+            raise errors.OperationalError("pool timeout")
+        if dsn == "host=replica" and state["replica_drops"]:
+            return DroppingConn()
+        return DummyConn()
+    monkeypatch.setattr(qd, "connect", fake_connect)
+    replica, primary = ("host=replica", qd.REPLICA_CONNECT_TIMEOUT), (qd.DSN, None)
+
+    qd.trends()
+    qd.query_metrics(parallel=True)
+    assert borrowed == [replica] * 3
+
+    borrowed.clear()
+    qd.url_exists_in_db("http://x")
+    assert borrowed == [primary]
+
+    borrowed.clear()
+    assert qd.compute_results()["total"] == 50
+    monkeypatch.setattr(qd, "distributions", lambda segment, filters, conn: {"segments": []})
+    assert qd.get_distributions() == {"segments": []}
+    assert sorted(borrowed) == sorted([primary, replica] * 3)   # LSN from the primary, read on the replica
+
+    borrowed.clear()
+    monkeypatch.setattr(DummyCursor, "caught_up", False)
+    assert qd.read_results()["total"] == 50                     # summary missing: computed live
+    assert borrowed.count(replica) == 3 and borrowed.count(primary) == 6   # each read checked, then redone
+    assert router.stats()["healthy"] is True                    # behind for this read only
+    monkeypatch.setattr(DummyCursor, "caught_up", True)
+
+    borrowed.clear()
+    state["replica_drops"] = True
+    assert qd.read_query("SELECT n FROM applicants;", {}) == [{"n": 0}]
+    assert borrowed == [replica, primary]
+    assert router.stats()["healthy"] is False and "server closed" in router.stats()["error"]
+
+    borrowed.clear()
+    router.healthy, state["replica_drops"] = True, False
+    def cancelled(conn):
+        raise errors.QueryCanceled("canceling statement due to statement timeout")
+    with pytest.raises(errors.QueryCanceled):
+        qd.run_read(cancelled)
+    assert borrowed == [replica] and router.healthy
+
+    borrowed.clear()
+    state["replica_up"] = False
+    with qd.read_connection() as conn:
+        assert isinstance(conn, DummyConn)
+    assert borrowed == [replica, primary]
+    assert router.stats()["healthy"] is False and "pool timeout" in router.stats()["error"]
+
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: (_ for _ in ()).throw(errors.OperationalError("down")))
+    with pytest.raises(errors.OperationalError):
+        with qd.read_connection(primary=True):
+            pass
@@ -0,0 +1,175 @@
+import csv
+import gzip
+import io
+import json
+import sys
+import types
+from datetime import date
+import pytest
+import src.query_data as qd
+
+
+ROWS = [
+    {"p_id": 1, "program": "CS, \"AI\"", "date_added": date(2025, 3, 1), "gpa": 3.9},
+    {"p_id": 2, "program": "Physics", "date_added": None, "gpa": None},
+    {"p_id": 3, "program": "History", "date_added": date(2024, 9, 1), "gpa": 3.1},
+]
+
+
+class NamedCursor:
+    """
+    Dummy server-side cursor serving :data:`ROWS` through ``fetchmany``.
+    """
+    def __init__(self, log, name):
+        self.log = log
+        self.log["name"] = name
+        self.pos = 0
+        self.itersize = None
+    def execute(self, sql, params=None):
+        self.log["sql"], self.log["params"] = sql, params
+    def fetchmany(self, size):
+        self.log["fetches"].append(size)
+        batch = ROWS[self.pos:self.pos + size]
+        self.pos += size
+        return [{k: r.get(k) for k in ("p_id", "program", "date_added", "gpa")} for r in batch]
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+class DummyConn:
+    def __init__(self, log): self.log = log
+    def cursor(self, name=None, row_factory=None): return NamedCursor(self.log, name)
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+@pytest.fixture
+def log(monkeypatch):
+    """
+    Patch :func:`qd.connect` and return the log of cursor activity.
+    """
+    log = {"fetches": []}
+    monkeypatch.setattr(qd, "connect", lambda dsn=None: DummyConn(log))
+    return log
+
+
+FIELDS = ["p_id", "program", "date_added", "gpa"]
+
+
+@pytest.mark.db
+def test_export_csv_streams_batches(log):
+    """
+    Verify CSV export reads a named cursor in batches and quotes properly.
+
+    - Nothing touches the database until the generator is consumed.
+    - The header comes first; each batch becomes its own chunk.
+    - Filters are bound parameters.
+    """
+    stats = {}
+    chunks = qd.export_rows("csv", filters={"degree": "phd"}, fields=FIELDS, batch_size=2, stats=stats)
+    assert log == {"fetches": []}
+
+    chunks = list(chunks)
+    assert log["name"] == "applicants_export" and log["fetches"] == [2, 2, 2]
+    assert log["sql"].strip().endswith("WHERE TRUE AND degree ILIKE %(p0)s;")
+    assert log["params"] == {"p0": "%phd%"}
+    assert len(chunks) == 3 and stats["rows"] == 3
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == FIELDS
+    assert rows[1] == ["1", 'CS, "AI"', "2025-03-01", "3.9"]
+    assert rows[2] == ["2", "Physics", "", ""]
+
+
+@pytest.mark.db
+def test_export_ndjson_gzip(log):
+    """
+    Verify NDJSON export, gzip-compressed, decodes to one object per row.
+    """
+    data = gzip.decompress(b"".join(qd.export_rows("ndjson", fields=FIELDS, gzip=True)))
+    lines = [json.loads(l) for l in data.decode().splitlines()]
+    assert [l["p_id"] for l in lines] == [1, 2, 3]
+    assert lines[0]["date_added"] == "2025-03-01" and lines[1]["gpa"] is None
+
+
+@pytest.mark.db
+def test_export_rejects_bad_input(monkeypatch):
+    """
+    Verify unknown formats, fields and filters, and Parquet without
+    pyarrow, fail before any query runs.
+    """
+    with pytest.raises(ValueError, match="Unknown export format"):
+        qd.export_rows("xlsx")
+    with pytest.raises(ValueError, match="Unknown fields"):
+        qd.export_rows("csv", fields=["secret"])
+    with pytest.raises(ValueError, match="Unknown filter"):
+        qd.export_rows("csv", filters={"colour": "red"})
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ValueError, match="pyarrow"):
+        qd.export_rows("parquet")
+
+
+@pytest.fixture
+def fake_pyarrow(monkeypatch):
+    """
+    Minimal stand-in for ``pyarrow`` recording schema, row groups and codec.
+    """
+    calls = {"groups": []}
+    pa = types.ModuleType("pyarrow")
+    pq = types.ModuleType("pyarrow.parquet")
+    for t in ("int32", "date32", "float64", "string"):
+        setattr(pa, t, lambda t=t: t)
+    pa.schema = lambda fields: list(fields)
+    pa.Table = types.SimpleNamespace(from_pylist=lambda rows, schema: rows)
+
+    class ParquetWriter:
+        def __init__(self, sink, schema, compression):
+            self.sink = sink
+            calls["schema"], calls["compression"] = schema, compression
+            sink.write(b"PAR1")
+        def write_table(self, table):
+            calls["groups"].append(len(table))
+            self.sink.write(b"<group>")
+        def close(self):
+            self.sink.write(b"<footer>PAR1")
+    pq.ParquetWriter = ParquetWriter
+    pa.parquet = pq
+    monkeypatch.setitem(sys.modules, "pyarrow", pa)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", pq)
+    return calls
+
+
+@pytest.mark.db
+def test_export_parquet_row_groups(log, fake_pyarrow):
+    """
+    Verify Parquet export writes one row group per batch with typed columns
+    and drains the buffer as it goes.
+    """
+    chunks = list(qd.export_rows("parquet", fields=FIELDS, gzip=True, batch_size=2))
+    assert fake_pyarrow["groups"] == [2, 1]
+    assert fake_pyarrow["compression"] == "gzip"
+    assert fake_pyarrow["schema"] == [("p_id", "int32"), ("program", "string"),
+                                      ("date_added", "date32"), ("gpa", "float64")]
+    assert chunks == [b"PAR1<group>", b"<group>", b"<footer>PAR1"]
+
+
+@pytest.mark.db
+def test_export_to_file(log, tmp_path, capsys):
+    """
+    Verify :func:`qd.export_to_file` writes the stream and reports the row count.
+    """
+    out = tmp_path / "applicants.csv"
+    assert qd.export_to_file(str(out), "csv", fields=["p_id"]) == 3
+    assert out.read_text().splitlines() == ["p_id", "1", "2", "3"]
+    assert "Exported 3 rows" in capsys.readouterr().out
+
+
+@pytest.mark.analysis
+def test_parse_filters():
+    """
+    Verify ``name=value`` arguments become structured filters.
+    """
+    assert qd.parse_filters(["term = Fall 2025", "university=a=b"]) == {"term": "Fall 2025", "university": "a=b"}
+    assert qd.parse_filters(None) == {}
+    with pytest.raises(ValueError):
+        qd.parse_filters(["degree"])
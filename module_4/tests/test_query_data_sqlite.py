@@ -0,0 +1,209 @@
+import os
+import json
+import sqlite3
+from datetime import date
+import pytest
+import src.load_data as ld
+import src.query_data as qd
+
+
+def _item(p_id, term, status, citizenship, gpa, gre, degree, program, university, added):
+    gre_q, gre_v, gre_aw = gre or (None, None, None)
+    return {"p_id": p_id, "url": f"https://www.thegradcafe.com/result/{p_id}", "term": term,
+            "status": status, "US/International": citizenship, "gpa": gpa, "gre_q": gre_q,
+            "gre_v": gre_v, "gre_aw": gre_aw, "Degree": degree, "llm_generated_program": program,
+            "llm_generated_university": university, "date_added": added}
+
+
+ITEMS = [
+    _item(1, "Fall 2025", "Accepted", "International", "3.9", ("165", "160", "4.5"), "Masters",
+          "Computer Science", "Johns Hopkins University", "02/01/2025"),
+    _item(2, "Fall 2025", "Rejected", "American", "3.5", ("155", "150", "4.0"), "PhD",
+          "Computer Science", "Georgetown University", "03/01/2025"),
+    _item(3, "Fall 2025", "Accepted", "American", "3.7", None, "PhD",
+          "Computer Science", "Georgetown University", "03/15/2025"),
+    _item(4, "Spring 2025", "Accepted", "international", "3.2", ("160", "155", "3.5"), "Masters",
+          "Physics", "stanford university", "11/01/2024"),
+    _item(5, "Fall 2024", "Wait listed", "American", None, None, "Masters", "History", None, None),
+    _item(6, "Fall 2025", "Accepted", "American", "4.0", None, "Masters",
+          "Computer Science", "JOHNS HOPKINS UNIVERSITY", "04/01/2025"),
+]
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    """
+    Switch both copies of :mod:`query_data` to the SQLite backend on a
+    fresh file loaded with :data:`ITEMS`.
+
+    :return: Path of the SQLite file.
+    :rtype: str
+    """
+    path = str(tmp_path / "applicants.sqlite3")
+    for mod in (qd, ld.query_data):
+        monkeypatch.setattr(mod, "ANALYTICS_BACKEND", "sqlite")
+        monkeypatch.setattr(mod, "SQLITE_PATH", path)
+        monkeypatch.setattr(mod, "SQLITE", mod.SQLiteBackend(path))
+    monkeypatch.setattr(qd, "RESULTS_CACHE", ld.query_data.RESULTS_CACHE)    # Bumped by the loader
+    assert ld.load_sqlite([ld.extract_data(item, i) for i, item in enumerate(ITEMS)]) == len(ITEMS)
+    return path
+
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_sqlite_dashboard_metrics(sqlite_backend):
+    """
+    Verify :func:`qd.get_results` on the SQLite backend answers every
+    dashboard question from the compiled metric statements.
+
+    - Substring filters ignore case, as ``ILIKE`` does.
+    - Averages skip missing scores.
+    - The grouped counts come back in the ``GROUPING SETS`` shape.
+    """
+    results = qd.get_results()
+    assert results["total"] == 6 and results["fall_2025"] == 4
+    assert results["pct_international"] == pytest.approx(33.33)
+    assert results["avg_gpa_4"] == pytest.approx(3.66)
+    assert (results["avg_gre_q"], results["avg_gre_v"], results["avg_gre_aw"]) == (160.0, 155.0, 4.0)
+    assert results["avg_gpa_us_fall25"] == pytest.approx(3.733)
+    assert results["pct_accept_fall25"] == pytest.approx(75.0)
+    assert results["avg_gpa_accept_fall25"] == pytest.approx(3.867)
+    assert results["jhu_masters_cs"] == 2 and results["georgetown_cs_phd"] == 1
+    assert results["degree_counts"] == [{"degree": "Masters", "n": 4}, {"degree": "PhD", "n": 2}]
+    assert results["top_universities"][0] == {"llm_generated_university": "Georgetown University", "n": 2}
+    assert len(results["top_universities"]) == 3 + 1       # Case variants stay separate; NULL is left out
+
+    assert qd.get_results() is results                      # Cached until the next load
+    ld.load_sqlite([ld.extract_data(_item(7, "Fall 2025", "Accepted", "American", "3.0", None,
+                                          "PhD", "Physics", None, None), 7)])
+    assert qd.get_results()["total"] == 7
+
+
+@pytest.mark.db
+@pytest.mark.analysis
+def test_sqlite_filtered_metrics(sqlite_backend):
+    """
+    Verify :func:`qd.query_metrics` filters on the SQLite backend: dates
+    compare as ISO strings, ``date_to`` is exclusive, and ``%`` in a value
+    is matched literally. Per-metric timing runs on the SQLite copy too.
+    """
+    jhu = qd.query_metrics({"university": "johns hopkins", "date_from": "2025-01-01"})
+    assert jhu["total"] == 2 and jhu["avg_gpa_4"] == pytest.approx(3.95)
+    assert qd.query_metrics({"date_from": date(2025, 3, 1), "date_to": "2025-04-01"})["total"] == 2
+    assert qd.query_metrics({"program": "100%"})["total"] == 0
+    with pytest.raises(ValueError):
+        qd.query_metrics({"colour": "red"})
+    timings = qd.metric_timings({"degree": "phd"})
+    assert len(timings) == len(qd.DASHBOARD_METRICS) + 1 and all(ms >= 0 for ms in timings.values())
+
+
+@pytest.mark.db
+def test_sqlite_url_exists_and_duplicate_loads(sqlite_backend, monkeypatch):
+    """
+    Verify the scraper's duplicate checks, single and batched, read the
+    SQLite copy and that reloading the same rows inserts nothing.
+    """
+    assert qd.url_exists_in_db("https://www.thegradcafe.com/result/3") is True
+    assert qd.url_exists_in_db("https://www.thegradcafe.com/result/99") is False
+    assert ld.load_sqlite([ld.extract_data(ITEMS[0], 0)]) == 0
+    monkeypatch.setattr(qd, "SQLITE_MAX_VARIABLES", 2)
+    urls = [f"https://www.thegradcafe.com/result/{i}" for i in (1, 3, 6, 99)]
+    assert qd.urls_existing(urls) == set(urls[:3])
+
+
+@pytest.mark.db
+@pytest.mark.integration
+def test_main_loads_into_sqlite(sqlite_backend, tmp_path, capsys, monkeypatch):
+    """
+    Verify :func:`ld.main` writes to the SQLite copy and never connects to
+    PostgreSQL when the SQLite backend is configured.
+    """
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: pytest.fail("PostgreSQL used"))
+    p = tmp_path / "data.jsonl"
+    p.write_text('{"p_id": 8, "url": "http://site/8", "date_added": "02/03/2025"}\n'
+                 '{"p_id": 9, "url": "http://site/9"}\n', encoding="utf-8")
+    ld.main(str(p))
+    assert "Pushed 2 rows" in capsys.readouterr().out
+    assert qd.url_exists_in_db("http://site/8") and qd.get_results()["total"] == 8
+
+
+class SnapshotCursor:
+    """
+    Dummy server-side cursor serving applicant tuples through ``fetchmany``.
+    """
+    def __init__(self, rows, log):
+        self.rows, self.log = rows, log
+    def execute(self, sql):
+        self.log.append(sql)
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+class SnapshotConn:
+    def __init__(self, rows, log):
+        self.cur = SnapshotCursor(rows, log)
+    def cursor(self, name=None):
+        self.cur.log.append(name)
+        return self.cur
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+
+
+@pytest.mark.db
+def test_snapshot_sqlite_replaces_file(tmp_path, monkeypatch, capsys):
+    """
+    Verify :func:`ld.snapshot_sqlite` streams ``applicants`` in batches into
+    a new file that replaces the previous snapshot.
+    """
+    path = str(tmp_path / "snap.sqlite3")
+    ld.load_sqlite([ld.extract_data(ITEMS[0], 0)], path)    # Previous snapshot, to be replaced
+    open(f"{path}.tmp", "w").close()                        # Left over from an interrupted run
+
+    rows = [ld.extract_data(item, i) for i, item in enumerate(ITEMS[1:])]
+    log = []
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: SnapshotConn(rows, log))
+    version = ld.query_data.RESULTS_CACHE.version
+
+    assert ld.snapshot_sqlite(path, batch_size=2) == 5
+    assert log[0] == "applicants_snapshot" and log[1].startswith("SELECT p_id, program")
+    assert "Copied 5 rows" in capsys.readouterr().out
+    assert not os.path.exists(f"{path}.tmp")
+    assert ld.query_data.RESULTS_CACHE.version == version + 1
+
+    with sqlite3.connect(path) as conn:
+        assert [r[0] for r in conn.execute("SELECT p_id FROM applicants ORDER BY p_id")] == [2, 3, 4, 5, 6]
+        assert conn.execute("SELECT date_added FROM applicants WHERE p_id = 2").fetchone() == ("2025-03-01",)
+    assert qd.SQLiteBackend(path).query_metrics({"degree": "phd"})["total"] == 2
+
+
+@pytest.mark.db
+@pytest.mark.integration
+def test_main_then_streaming_load_keep_every_sqlite_row(sqlite_backend, tmp_path, capsys, monkeypatch):
+    """
+    Verify the SQLite copy is the one store on the SQLite backend: rows from
+    :func:`ld.main`, even with several workers, are still there after a
+    streaming load appends to the same file, and the streaming checkpoint
+    lives in that file too.
+    """
+    monkeypatch.setattr(ld, "connect", lambda dsn=None: pytest.fail("PostgreSQL used"))
+    p = tmp_path / "data.jsonl"
+    p.write_text("".join(json.dumps({"p_id": i, "url": f"http://site/{i}"}) + "\n"
+                         for i in range(101, 201)), encoding="utf-8")
+    ld.main(str(p), workers=2)
+    assert qd.get_results()["total"] == 106
+
+    stream = tmp_path / "stream.jsonl"
+    stream.write_text("".join(json.dumps({"p_id": i, "url": f"http://site/{i}"}) + "\n"
+                              for i in range(201, 211)), encoding="utf-8")
+    assert ld.load_streaming(str(stream), batch_size=4) == 10
+    assert qd.get_results()["total"] == 116                 # Cache bumped; main()'s rows kept
+    assert qd.url_exists_in_db("http://site/150") and qd.url_exists_in_db("http://site/210")
+
+    assert ld.load_streaming(str(stream), batch_size=4) == 0
+    assert "Resuming" in capsys.readouterr().out
+    with sqlite3.connect(sqlite_backend) as conn:
+        assert conn.execute("SELECT line_offset, rows_loaded FROM load_checkpoints").fetchall() == [(10, 10)]
+        assert conn.execute("SELECT COUNT(*) FROM applicants").fetchone() == (116,)
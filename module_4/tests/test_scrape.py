@@ -101,7 +101,7 @@ def patch_with_html(monkeypatch, html: str, stop_after_first: bool = False):
 
     - First page returns supplied HTML.
     - Subsequent pages return empty table.
-    - Simulates url_exists_in_db behavior.
+    - Simulates urls_existing behavior.
     """
 
     # Dummy urllib3 pool that returns fixed HTML
@@ -140,13 +140,9 @@ def patch_with_html(monkeypatch, html: str, stop_after_first: bool = False):
     monkeypatch.setattr(scrape, "BeautifulSoup", DummySoup)
 
     # Fake DB check (stop_after_first toggles early-stop behavior)
-    calls = {"n": 0}
-    def fake_exists(url):
-        calls["n"] += 1
-        if stop_after_first:
-            return calls["n"] > 1
-        return False
-    monkeypatch.setattr(scrape, "url_exists_in_db", fake_exists)
+    def fake_existing(urls):
+        return set(urls[1:]) if stop_after_first else set()
+    monkeypatch.setattr(scrape, "urls_existing", fake_existing)
 
 
 @pytest.mark.integration
@@ -247,7 +243,7 @@ def test_scrape_existing_url_stop(monkeypatch):
     Verify scraper halts on existing URL.
 
     - First URL is unique.
-    - Second URL triggers :func:`url_exists_in_db` and stops scraping.
+    - Second URL is reported by :func:`urls_existing` and stops scraping.
     """
     fake_html = """
     <html><body><table>
@@ -257,7 +253,7 @@ def test_scrape_existing_url_stop(monkeypatch):
         <td>2025-08-01</td><td>Accepted</td>
         <td><a href="http://fakeurl4a" data-ext-page-id="1">link</a></td>
       </tr>
-      <!-- Second applicant row-1: triggers append of the first, then hits True on url_exists_in_db -->
+      <!-- Second applicant row-1: triggers append of the first, then is found by urls_existing -->
       <tr>
         <td>Next U</td><td><span>EE</span><span>MS</span></td>
         <td>2025-08-02</td><td>Accepted</td>
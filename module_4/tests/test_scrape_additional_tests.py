@@ -41,7 +41,7 @@ def patch_dependencies(monkeypatch, pool_instance):
 
     - Replace PoolManager with dummy pool.
     - Use real BeautifulSoup parsing.
-    - Force :func:`url_exists_in_db` to always return False.
+    - Force :func:`urls_existing` to always find nothing.
 
     :param monkeypatch: Pytest monkeypatch fixture.
     :type monkeypatch: _pytest.monkeypatch.MonkeyPatch
@@ -59,8 +59,8 @@ def patch_dependencies(monkeypatch, pool_instance):
             return getattr(self.soup, name)
     monkeypatch.setattr(scrape, "BeautifulSoup", DummySoup)
 
-    # Force url_exists_in_db = false
-    monkeypatch.setattr(scrape, "url_exists_in_db", lambda url: False)
+    # Force urls_existing = nothing
+    monkeypatch.setattr(scrape, "urls_existing", lambda urls: set())
 
 @pytest.mark.integration
 def test_decision_with_on_split(monkeypatch):